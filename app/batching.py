@@ -0,0 +1,216 @@
+"""
+Micro-batching executor that coalesces concurrent ``calculate()`` calls.
+
+Producers submit single ``(operation, a, b)`` requests and receive a
+``concurrent.futures.Future``. A background thread collects requests and
+flushes them once ``max_batch_size`` requests are queued or the oldest queued
+request has waited ``max_latency_us`` microseconds. Each flush hands every
+operation group to its command's ``execute_batch`` hook (one vectorized NumPy
+call and one history append per group), autosaves the history once and then
+resolves the futures.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Type
+
+from app.calculator import Calculator
+from app.commands.arithmetic import AddCommand, DivideCommand, MultiplyCommand, SubtractCommand
+from app.commands.base import VectorizedCommand
+from app.commands.batch import execute_rows
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["BatchingExecutor"]
+
+DEFAULT_MAX_BATCH_SIZE = 256
+DEFAULT_MAX_LATENCY_US = 500
+
+DEFAULT_COMMANDS = {
+    command.operation: command
+    for command in (AddCommand, SubtractCommand, MultiplyCommand, DivideCommand)
+}
+
+
+class _Request:
+    """A queued calculation and the future its caller is waiting on."""
+
+    __slots__ = ("operation", "args", "future")
+
+    def __init__(self, operation: str, args: tuple, future: Future):
+        self.operation = operation
+        self.args = args
+        self.future = future
+
+
+class BatchingExecutor:
+    """
+    Queue single calculations and evaluate them in vectorized batches.
+
+    The executor can be used as a context manager; leaving the block flushes
+    any queued requests and stops the background thread.
+    """
+
+    def __init__(
+        self,
+        calculator: Optional[Calculator] = None,
+        max_batch_size: Optional[int] = None,
+        max_latency_us: Optional[float] = None,
+        commands: Optional[Dict[str, Type[VectorizedCommand]]] = None,
+    ):
+        """
+        Args:
+            calculator: The calculator to evaluate with (a new one by default)
+            max_batch_size: Flush once this many requests are queued
+                (``BATCH_MAX_SIZE`` environment variable by default)
+            max_latency_us: Flush once the oldest request has waited this many
+                microseconds (``BATCH_MAX_LATENCY_US`` environment variable by default)
+            commands: The v2 commands requests may name, by operation
+                (the four arithmetic commands by default)
+        """
+        if max_batch_size is None:
+            max_batch_size = int(os.getenv("BATCH_MAX_SIZE", str(DEFAULT_MAX_BATCH_SIZE)))
+        if max_latency_us is None:
+            max_latency_us = float(os.getenv("BATCH_MAX_LATENCY_US", str(DEFAULT_MAX_LATENCY_US)))
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if max_latency_us < 0:
+            raise ValueError("max_latency_us must not be negative")
+
+        self.calculator = calculator or Calculator()
+        self.commands = commands or DEFAULT_COMMANDS
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_us / 1_000_000
+
+        self._condition = threading.Condition()
+        self._pending: List[_Request] = []
+        self._first_enqueued = 0.0
+        self._running = True
+        self._worker = threading.Thread(
+            target=self._run, name="calculator-batching", daemon=True
+        )
+        self._worker.start()
+        logger.info(
+            "BatchingExecutor started (max_batch_size=%d, max_latency_us=%s)",
+            max_batch_size,
+            max_latency_us,
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    def submit(self, operation: str, *args) -> Future:
+        """
+        Queue a calculation.
+
+        Args:
+            operation: The operation to perform
+            *args: The arguments for the operation
+
+        Returns:
+            A future resolving to the result, or raising ``ValueError`` just
+            like ``Calculator.calculate`` would
+        """
+        future = Future()
+        with self._condition:
+            if not self._running:
+                raise RuntimeError("BatchingExecutor has been shut down")
+            if not self._pending:
+                self._first_enqueued = time.perf_counter()
+            self._pending.append(_Request(operation, args, future))
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch_size:
+                self._condition.notify()
+        return future
+
+    def calculate(self, operation: str, *args, timeout: Optional[float] = None) -> Any:
+        """Submit a calculation and wait for its result."""
+        return self.submit(operation, *args).result(timeout)
+
+    async def calculate_async(self, operation: str, *args) -> Any:
+        """Submit a calculation and await its result from an asyncio task."""
+        return await asyncio.wrap_future(self.submit(operation, *args))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop accepting requests and flush everything still queued.
+
+        Args:
+            wait: Whether to wait for the final flush to finish
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if wait:
+            self._worker.join()
+
+    def _run(self):
+        """Background loop: wait for a full batch or an expired deadline, then flush."""
+        while True:
+            with self._condition:
+                while self._running and not self._pending:
+                    self._condition.wait()
+                while self._running and len(self._pending) < self.max_batch_size:
+                    remaining = self._first_enqueued + self.max_latency - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                if not self._pending and not self._running:
+                    return
+                batch = self._pending[: self.max_batch_size]
+                self._pending = self._pending[self.max_batch_size :]
+                if self._pending:
+                    self._first_enqueued = time.perf_counter()
+
+            try:
+                self._flush(batch)
+            except Exception as e:
+                logger.error("Error flushing calculation batch: %s", str(e))
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(
+                            ValueError(f"Error in calculation: {str(e)}")
+                        )
+
+    def _flush(self, batch: List[_Request]) -> None:
+        """Evaluate a batch, record it in history and resolve its futures."""
+        groups: Dict[str, List[_Request]] = {}
+        for request in batch:
+            if not request.future.set_running_or_notify_cancel():
+                continue
+            command_class = self.commands.get(request.operation)
+            if command_class is None:
+                request.future.set_exception(
+                    ValueError(f"Invalid operation: {request.operation}")
+                )
+                continue
+            arity = len(command_class.arg_types)
+            if len(request.args) != arity:
+                request.future.set_exception(
+                    ValueError(
+                        f"Invalid number of arguments for {request.operation}: "
+                        f"expected {arity}, got {len(request.args)}"
+                    )
+                )
+                continue
+            groups.setdefault(request.operation, []).append(request)
+
+        resolved = []
+        # Autosave once for the whole flush rather than once per group
+        with self.calculator.history_manager.batch_updates():
+            for operation, requests in groups.items():
+                command = self.commands[operation](self.calculator)
+                rows = execute_rows(command, [request.args for request in requests])
+                resolved.extend(zip(requests, rows))
+
+        for request, (_, result, error) in resolved:
+            if error is not None:
+                request.future.set_exception(error)
+            else:
+                request.future.set_result(result)
+        logger.debug("Flushed batch of %d calculations", len(batch))
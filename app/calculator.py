@@ -3,23 +3,74 @@ Calculator module that provides basic arithmetic operations and calculation hist
 """
 import logging
 import operator
-from typing import Any, Dict, Callable
+import time
+from typing import TYPE_CHECKING, Any, Dict, Callable, List, Optional, Tuple
 
-from app.history_manager import HistoryManager
+from app.event_log import get_event_log
+from app.history_manager import DEFAULT_NAMESPACE, HistoryManager
+from app.metrics import REGISTRY
+from app.tracing import traced
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from app.variables import VariableGraph
 
 logger = logging.getLogger(__name__)
 
+OPERATION_SYMBOLS = {
+    'add': '+',
+    'subtract': '-',
+    'multiply': '*',
+    'divide': '/'
+}
+
+CALCULATION_SECONDS = REGISTRY.histogram(
+    "calculator_calculation_duration_seconds", "Time taken by successful calculations", ("operation",)
+)
+CALCULATION_ERRORS = REGISTRY.counter(
+    "calculator_calculation_errors_total", "Calculations that raised an error", ("operation",)
+)
+
 class Calculator:
     """
     Calculator class that performs basic arithmetic operations.
     This class implements the Facade pattern to provide a simplified interface
     for performing calculations and managing history.
     """
-    def __init__(self):
-        self.history_manager = HistoryManager()
+    def __init__(self, namespace: str = DEFAULT_NAMESPACE):
+        """
+        Args:
+            namespace: The history namespace this calculator records into
+        """
+        self.namespace = namespace
+        # The default namespace is the HistoryManager singleton and is bound
+        # once; other namespaces are looked up on every use (see history_manager)
+        self._history_manager = None
+        if namespace == DEFAULT_NAMESPACE:
+            self._history_manager = HistoryManager()
+        else:
+            from app.history_namespaces import validate_namespace
+
+            validate_namespace(namespace)
         self.operations = self._register_operations()
+        self._vector_operations = None
+        self._variables = None
         logger.info("Calculator initialized")
     
+    @property
+    def history_manager(self) -> HistoryManager:
+        """The history of this calculator's namespace."""
+        if self._history_manager is not None:
+            return self._history_manager
+        from app.history_namespaces import get_namespaces
+
+        return get_namespaces().get(self.namespace)
+
+    @history_manager.setter
+    def history_manager(self, history_manager: HistoryManager) -> None:
+        self._history_manager = history_manager
+
     def _register_operations(self) -> Dict[str, Callable]:
         """Register basic operations."""
         return {
@@ -28,7 +79,91 @@ class Calculator:
             'multiply': operator.mul,
             'divide': operator.truediv,
         }
+
+    @property
+    def vector_operations(self) -> Dict[str, Callable]:
+        """The NumPy ufuncs matching each basic operation, registered on first use."""
+        if self._vector_operations is None:
+            self._vector_operations = self._register_vector_operations()
+        return self._vector_operations
+
+    def _register_vector_operations(self) -> Dict[str, Callable]:
+        """Register the NumPy ufuncs matching each basic operation."""
+        import numpy as np
+
+        return {
+            'add': np.add,
+            'subtract': np.subtract,
+            'multiply': np.multiply,
+            'divide': np.true_divide,
+        }
     
+    @property
+    def variables(self) -> "VariableGraph":
+        """This calculator's named variables, created on first use."""
+        if self._variables is None:
+            from app.variables import VariableGraph
+
+            self._variables = VariableGraph(self._evaluate)
+        return self._variables
+
+    def resolve(self, operand: Any) -> Any:
+        """
+        Return the value of a variable if ``operand`` names one, else ``operand`` unchanged.
+
+        Raises:
+            ValueError: If the variable's formula failed
+        """
+        if self._variables is None:
+            return operand
+        return self._variables.resolve(operand)
+
+    def assign(self, name: str, operation: Optional[str], *args) -> Tuple[float, int]:
+        """
+        Assign a variable and recompute the variables that depend on it.
+
+        A formula's own calculation is recorded in the history like any
+        other; the recomputed dependents are not.
+
+        Args:
+            name: The variable
+            operation: The operation of the formula, or None to assign the
+                single argument as a constant
+            *args: The operands: numbers or names of existing variables
+
+        Returns:
+            The variable's value and the number of dependents recomputed
+
+        Raises:
+            ValueError: If the name, operation or operands are invalid, the
+                calculation fails, or the formula refers to the variable itself
+        """
+        from app.variables import validate_name
+
+        validate_name(name)
+        variables = self.variables
+        operands = tuple(variables.parse_operand(str(arg)) for arg in args)
+        if operation is None:
+            if len(operands) != 1 or isinstance(operands[0], str):
+                raise ValueError(f"Invalid value for {name}: {' '.join(map(str, args))}")
+            value, formula = operands[0], None
+        else:
+            if operation not in self.operations:
+                logger.error("Invalid operation: %s", operation)
+                raise ValueError(f"Invalid operation: {operation}")
+            value = self.calculate(operation, *(variables.resolve(op) for op in operands))
+            formula = (operation, operands)
+        recomputed = variables.define(name, formula, value)
+        logger.info("Assigned %s = %s (%d dependents recomputed)", name, value, recomputed)
+        return value, recomputed
+
+    def _evaluate(self, operation: str, *values: float) -> float:
+        """Evaluate a variable's formula without recording it in the history."""
+        if operation == 'divide' and values[1] == 0:
+            raise ValueError("Division by zero")
+        return self.operations[operation](*values)
+
+    @traced("Calculator.calculate")
     def calculate(self, operation: str, *args) -> Any:
         """
         Perform a calculation and add it to the history.
@@ -43,6 +178,19 @@ class Calculator:
         Raises:
             ValueError: If the operation is invalid or the arguments are invalid
         """
+        # Unknown operations share one label so user input cannot add metrics
+        label = operation if operation in self.operations else "invalid"
+        start = time.perf_counter()
+        try:
+            result = self._calculate(operation, *args)
+        except ValueError:
+            CALCULATION_ERRORS.labels(label).inc()
+            raise
+        CALCULATION_SECONDS.labels(label).observe(time.perf_counter() - start)
+        return result
+
+    def _calculate(self, operation: str, *args) -> Any:
+        """Validate, evaluate and record one calculation (see ``calculate``)."""
         if operation not in self.operations:
             logger.error("Invalid operation: %s", operation)
             raise ValueError(f"Invalid operation: {operation}")
@@ -76,13 +224,97 @@ class Calculator:
             # Add to history
             self.history_manager.add_entry(operation, expression, result)
             
-            logger.info("Calculated: %s = %s", expression, result)
-            return result
+            logger.debug("Calculated: %s = %s", expression, result)
             
         except Exception as e:
             logger.error("Error in calculation: %s", str(e))
             raise ValueError(f"Error in calculation: {str(e)}") from e
+
+        get_event_log().record("calculation", operation=operation, expression=expression, result=result)
+        return result
     
+    def evaluate_batch(self, operation: str, lhs: "np.ndarray", rhs: "np.ndarray") -> "np.ndarray":
+        """
+        Evaluate one binary operation over whole operand arrays.
+
+        Unlike ``calculate`` this neither validates divisors nor records
+        history; callers are expected to do both for the batch as a whole.
+
+        Args:
+            operation: The operation to perform
+            lhs: Left operands as a float64 array
+            rhs: Right operands as a float64 array
+
+        Returns:
+            A float64 array of results
+
+        Raises:
+            ValueError: If the operation is invalid
+        """
+        if operation not in self.vector_operations:
+            logger.error("Invalid operation: %s", operation)
+            raise ValueError(f"Invalid operation: {operation}")
+        return self.vector_operations[operation](lhs, rhs)
+
+    def calculate_batch(self, operation: str, lhs, rhs) -> "np.ndarray":
+        """
+        Perform one operation over whole operand arrays and add every
+        calculation to the history in a single append.
+
+        Args:
+            operation: The operation to perform
+            lhs: Left operands (anything convertible to a float64 array)
+            rhs: Right operands of the same length
+
+        Returns:
+            A float64 array of results
+
+        Raises:
+            ValueError: If the operation or any operand is invalid, or any
+                divisor is zero; nothing is recorded in that case
+        """
+        if operation not in self.vector_operations:
+            logger.error("Invalid operation: %s", operation)
+            raise ValueError(f"Invalid operation: {operation}")
+        import numpy as np
+
+        try:
+            lhs = np.asarray(lhs, dtype=np.float64)
+            rhs = np.asarray(rhs, dtype=np.float64)
+        except (TypeError, ValueError) as exc:
+            logger.error("Invalid arguments for %s batch", operation)
+            raise ValueError(f"Invalid arguments for {operation}") from exc
+        if lhs.shape != rhs.shape or lhs.ndim != 1:
+            raise ValueError(f"Operand arrays for {operation} must be 1-D and of equal length")
+        if operation == 'divide' and not rhs.all():
+            logger.error("Division by zero")
+            raise ValueError("Division by zero")
+
+        results = self.evaluate_batch(operation, lhs, rhs)
+        expressions = self.format_expressions(operation, lhs.tolist(), rhs.tolist())
+        self.history_manager.add_entries(
+            zip([operation] * len(expressions), expressions, results.tolist())
+        )
+        logger.debug("Calculated batch of %d %s operations", len(expressions), operation)
+        get_event_log().record("calculation_batch", operation=operation, count=len(expressions))
+        return results
+
+    def format_expressions(self, operation: str, lhs: List[float], rhs: List[float]) -> List[str]:
+        """
+        Format the expressions of a batch of binary operations.
+
+        Args:
+            operation: The operation performed
+            lhs: Left operands
+            rhs: Right operands
+
+        Returns:
+            One expression string per operand pair, as ``_format_expression`` would produce
+        """
+        symbol = OPERATION_SYMBOLS.get(operation, operation)
+        return [f"{a} {symbol} {b}" for a, b in zip(lhs, rhs)]
+
+    @traced("Calculator._format_expression")
     def _format_expression(self, operation: str, args) -> str:
         """
         Format the expression for display in the history.
@@ -94,14 +326,7 @@ class Calculator:
         Returns:
             A string representation of the expression
         """
-        operation_symbols = {
-            'add': '+',
-            'subtract': '-',
-            'multiply': '*',
-            'divide': '/'
-        }
-        
-        symbol = operation_symbols.get(operation, operation)
+        symbol = OPERATION_SYMBOLS.get(operation, operation)
         
         # For binary operations
         if len(args) == 2:
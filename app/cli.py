@@ -0,0 +1,127 @@
+# app/cli.py
+"""
+One-shot command execution, e.g. ``python main.py add 2 3``.
+
+Runs exactly one command and exits, for use from shell scripts and cron
+jobs. Unlike the interactive REPL it prints no banner, resolves built-in
+commands without loading any plugin (the cached plugin manifest is only
+read for other names), and does not load ``HISTORY_FILE`` for commands that
+only add entries to the history: those are appended to the file instead.
+``HISTORY_NAMESPACE`` selects the history namespace, as for the REPL.
+CPU-bound commands run in-process, since a worker pool cannot pay for itself
+within a single command.
+
+Exit status:
+    0: the command succeeded
+    1: the command failed (its error is printed to stderr)
+    2: usage error, e.g. an unknown command
+"""
+import logging
+import os
+import sys
+import time
+from typing import List, Optional, TextIO, Type
+
+from app.calculator import Calculator
+from app.commands.base import Command, as_vectorized
+from app.commands.batch import execute_rows
+from app.event_log import get_event_log
+from app.history_manager import DEFAULT_NAMESPACE, HistoryManager
+from app.plugins.plugin_loader import PluginLoader
+from app.repl import BUILTIN_COMMANDS
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["EXIT_FAILURE", "EXIT_OK", "EXIT_USAGE", "resolve_command", "run_command"]
+
+EXIT_OK = 0
+EXIT_FAILURE = 1
+EXIT_USAGE = 2
+
+
+def resolve_command(command_name: str) -> Optional[Type[Command]]:
+    """
+    Find a command class, loading plugin commands only for non-built-in names.
+
+    Args:
+        command_name: The name of the command
+
+    Returns:
+        The command class (or lazy plugin stand-in) if found, otherwise None
+    """
+    command_name = command_name.lower()
+    command_class = BUILTIN_COMMANDS.get(command_name)
+    if command_class is None:
+        command_class = PluginLoader().load_plugins().get(command_name)
+    return command_class
+
+
+def run_command(
+    argv: List[str],
+    stdout: Optional[TextIO] = None,
+    stderr: Optional[TextIO] = None,
+) -> int:
+    """
+    Run one command given as ``[name, *args]`` and print its output.
+
+    Args:
+        argv: The command name followed by its arguments
+        stdout: Where to print the output (``sys.stdout`` by default)
+        stderr: Where to print errors (``sys.stderr`` by default)
+
+    Returns:
+        The exit status
+    """
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+    if not argv:
+        print("Usage: main.py [<command> [<args>...]]", file=stderr)
+        return EXIT_USAGE
+
+    command_name, args = argv[0], argv[1:]
+    command_class = resolve_command(command_name)
+    if command_class is None:
+        print(f"Unknown command: {command_name}", file=stderr)
+        return EXIT_USAGE
+
+    namespace = os.getenv("HISTORY_NAMESPACE") or DEFAULT_NAMESPACE
+    if namespace == DEFAULT_NAMESPACE and not getattr(command_class, "reads_history", True):
+        HistoryManager.append_only()
+    try:
+        calculator = Calculator(namespace)
+    except ValueError as e:
+        print(f"Error: {str(e)}", file=stderr)
+        return EXIT_USAGE
+    command = as_vectorized(command_class(calculator))
+
+    start = time.perf_counter()
+    status = _execute(command, args, stdout, stderr)
+    get_event_log().record(
+        "command",
+        command=command.name,
+        args=args,
+        ok=status == EXIT_OK,
+        duration_ms=round((time.perf_counter() - start) * 1000, 3),
+    )
+    return status
+
+
+def _execute(command, args: List[str], stdout: TextIO, stderr: TextIO) -> int:
+    """Run a v2 (or adapted v1) command, print its output and return the exit status."""
+    try:
+        values, result, error = execute_rows(command, [args])[0]
+    except Exception as e:
+        logger.error("Command %s failed: %s", command.name, str(e))
+        print(f"Error: {str(e)}", file=stderr)
+        return EXIT_FAILURE
+
+    if error is not None:
+        print(command.format_error(error), file=stderr)
+        return EXIT_FAILURE
+    output = command.format_result(result, *values)
+    # v1 commands report failure only through their output
+    if isinstance(output, str) and output.startswith("Error"):
+        print(output, file=stderr)
+        return EXIT_FAILURE
+    print(output, file=stdout)
+    return EXIT_OK
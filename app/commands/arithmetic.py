@@ -1,75 +1,64 @@
 # app/commands/arithmetic.py
 import logging
-from typing import List
+from typing import Any, List
 
-from app.commands.base import Command
+from app.commands.base import VectorizedCommand
 
 logger = logging.getLogger(__name__)
 
 
-class AddCommand(Command):
+class ArithmeticCommand(VectorizedCommand):
+    """
+    Base class for binary arithmetic commands.
+
+    Operands are passed to the calculator unconverted so that it validates
+    them and reports errors consistently; ``arg_types`` only describes the
+    columns ``execute_batch`` receives. Operands naming one of the
+    calculator's variables are replaced by its value.
+    """
+
+    operation = ""
+    arg_types = (float, float)
+    reads_history = False
+
+    def parse_args(self, args) -> tuple:
+        self.check_arity(args)
+        return tuple(self.calculator.resolve(arg) for arg in args)
+
+    def compute(self, *values) -> Any:
+        return self.calculator.calculate(self.operation, *values)
+
+    def execute_batch(self, lhs, rhs):
+        return self.calculator.calculate_batch(self.operation, lhs, rhs)
+
+
+class AddCommand(ArithmeticCommand):
     """Command to add two numbers."""
 
     name = "add"
     help = "Add two numbers (add <num1> <num2>)"
+    operation = "add"
 
-    def execute(self, *args) -> str:
-        if len(args) != 2:
-            return "Error: 'add' requires exactly two arguments"
-
-        try:
-            result = self.calculator.calculate("add", *args)
-            return f"Result: {result}"
-        except ValueError as e:
-            return f"Error: {str(e)}"
 
-
-class SubtractCommand(Command):
+class SubtractCommand(ArithmeticCommand):
     """Command to subtract two numbers."""
 
     name = "subtract"
     help = "Subtract two numbers (subtract <num1> <num2>)"
+    operation = "subtract"
 
-    def execute(self, *args) -> str:
-        if len(args) != 2:
-            return "Error: 'subtract' requires exactly two arguments"
-
-        try:
-            result = self.calculator.calculate("subtract", *args)
-            return f"Result: {result}"
-        except ValueError as e:
-            return f"Error: {str(e)}"
 
-
-class MultiplyCommand(Command):
+class MultiplyCommand(ArithmeticCommand):
     """Command to multiply two numbers."""
 
     name = "multiply"
     help = "Multiply two numbers (multiply <num1> <num2>)"
+    operation = "multiply"
 
-    def execute(self, *args) -> str:
-        if len(args) != 2:
-            return "Error: 'multiply' requires exactly two arguments"
-
-        try:
-            result = self.calculator.calculate("multiply", *args)
-            return f"Result: {result}"
-        except ValueError as e:
-            return f"Error: {str(e)}"
 
-
-class DivideCommand(Command):
+class DivideCommand(ArithmeticCommand):
     """Command to divide two numbers."""
 
     name = "divide"
     help = "Divide two numbers (divide <num1> <num2>)"
-
-    def execute(self, *args) -> str:
-        if len(args) != 2:
-            return "Error: 'divide' requires exactly two arguments"
-
-        try:
-            result = self.calculator.calculate("divide", *args)
-            return f"Result: {result}"
-        except ValueError as e:
-            return f"Error: {str(e)}"
+    operation = "divide"
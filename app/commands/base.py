@@ -1,7 +1,10 @@
 # app/commands/base.py
 import logging
 from abc import ABC, abstractmethod
-from typing import Any, List
+from typing import TYPE_CHECKING, Any, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -15,8 +18,20 @@ class Command(ABC):
     name = ""
     help = ""
 
+    # CPU-bound commands are dispatched to a worker process (see
+    # app.process_runner) instead of running on the REPL thread.
+    cpu_bound = False
+    # Seconds a worker-process run may take before it is cancelled (None: no limit)
+    timeout = None
+    # Whether the command reads or replaces the stored history. Commands that
+    # only add entries set this to False, so one-shot runs (see app.cli) can
+    # append to HISTORY_FILE without loading it first.
+    reads_history = True
+
     def __init__(self, calculator=None):
         self.calculator = calculator
+        # The REPL that created this command, if any
+        self.repl = None
 
     @abstractmethod
     def execute(self, *args) -> str:
@@ -30,3 +45,133 @@ class Command(ABC):
             A string with the result of the command
         """
         pass
+
+
+_ARITY_WORDS = {0: "no", 1: "one", 2: "two", 3: "three", 4: "four"}
+
+
+class VectorizedCommand(Command):
+    """
+    Version 2 of the command interface.
+
+    A v2 command declares the type of each argument in ``arg_types`` (whose
+    length is its arity) and separates computation from presentation:
+    ``compute`` evaluates one set of parsed arguments, ``execute_batch``
+    optionally evaluates whole columns of arguments as NumPy arrays, and
+    ``format_result`` turns a result into the text shown to the user.
+    ``execute`` implements the v1 contract on top of these, so v2 commands
+    work everywhere v1 commands do.
+    """
+
+    # Type of each argument, e.g. (float, float); None means variadic
+    arg_types: Optional[Tuple[type, ...]] = ()
+
+    @property
+    def arity(self) -> Optional[int]:
+        """Number of arguments the command takes, or None if variadic."""
+        return None if self.arg_types is None else len(self.arg_types)
+
+    @classmethod
+    def supports_batch(cls) -> bool:
+        """Whether the command implements ``execute_batch``."""
+        return cls.execute_batch is not VectorizedCommand.execute_batch
+
+    def check_arity(self, args: Sequence[Any]) -> None:
+        """
+        Check the number of arguments.
+
+        Raises:
+            ValueError: If the number of arguments does not match ``arg_types``
+        """
+        if self.arity is not None and len(args) != self.arity:
+            word = _ARITY_WORDS.get(self.arity, str(self.arity))
+            plural = "" if self.arity == 1 else "s"
+            raise ValueError(f"'{self.name}' requires exactly {word} argument{plural}")
+
+    def parse_args(self, args: Sequence[Any]) -> tuple:
+        """
+        Check and convert raw arguments according to ``arg_types``.
+
+        Args:
+            args: The raw arguments, usually strings
+
+        Returns:
+            The converted arguments
+
+        Raises:
+            ValueError: If the arguments are invalid
+        """
+        self.check_arity(args)
+        if self.arg_types is None:
+            return tuple(args)
+        return tuple(arg_type(arg) for arg_type, arg in zip(self.arg_types, args))
+
+    @abstractmethod
+    def compute(self, *values) -> Any:
+        """
+        Compute the result for one set of parsed arguments.
+
+        Raises:
+            ValueError: If the computation fails
+        """
+
+    def execute_batch(self, *columns: "np.ndarray") -> Optional["np.ndarray"]:
+        """
+        Compute results for many sets of arguments at once.
+
+        Optional: the default returns None, and callers then compute each
+        row with ``compute``.
+
+        Args:
+            *columns: One array per argument, all of the same length
+
+        Returns:
+            An array with one result per row, or None without a vectorized
+            implementation
+
+        Raises:
+            ValueError: If any row fails; callers then fall back to ``compute``
+                row by row to report each error individually
+        """
+        return None
+
+    def format_result(self, result: Any, *values) -> str:
+        """Format a result (computed from ``values``) for display."""
+        return f"Result: {result}"
+
+    def format_error(self, error: Exception) -> str:
+        """Format an error for display."""
+        return f"Error: {str(error)}"
+
+    def execute(self, *args) -> str:
+        try:
+            values = self.parse_args(args)
+            return self.format_result(self.compute(*values), *values)
+        except ValueError as e:
+            return self.format_error(e)
+
+
+class LegacyCommandAdapter(VectorizedCommand):
+    """Presents a v1 ``Command`` through the v2 interface."""
+
+    arg_types = None
+
+    def __init__(self, command: Command):
+        super().__init__(command.calculator)
+        self.command = command
+        self.name = command.name
+        self.help = command.help
+        self.repl = command.repl
+
+    def compute(self, *values) -> str:
+        return self.command.execute(*values)
+
+    def format_result(self, result: Any, *values) -> str:
+        return result
+
+
+def as_vectorized(command: Command) -> VectorizedCommand:
+    """Return ``command`` itself if it implements the v2 interface, else an adapter."""
+    if isinstance(command, VectorizedCommand):
+        return command
+    return LegacyCommandAdapter(command)
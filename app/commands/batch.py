@@ -0,0 +1,140 @@
+# app/commands/batch.py
+"""
+Batch execution runtime.
+
+Runs many invocations of one command at once. Commands that implement the v2
+``execute_batch`` hook are evaluated column-wise in a single vectorized call;
+if that call rejects the batch, or the command only implements the v1
+interface, each row is computed on its own so that every error is reported
+against the row that caused it.
+"""
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.commands.base import Command, as_vectorized
+
+logger = logging.getLogger(__name__)
+
+# (parsed values, result, error) for one row
+RowResult = Tuple[tuple, Any, Optional[Exception]]
+
+
+def execute_rows(command: Command, rows: Sequence[Sequence[Any]]) -> List[RowResult]:
+    """
+    Compute results for many argument rows of one command.
+
+    Args:
+        command: The command to run (v1 commands are adapted)
+        rows: Raw arguments, one sequence per invocation
+
+    Returns:
+        One ``(values, result, error)`` tuple per row, in order; exactly one
+        of ``result`` and ``error`` is meaningful
+    """
+    command = as_vectorized(command)
+    # Row index -> result, filled in as each row is parsed or computed
+    results: Dict[int, RowResult] = {}
+    parsed = []
+    for index, row in enumerate(rows):
+        try:
+            parsed.append((index, command.parse_args(row)))
+        except ValueError as e:
+            results[index] = (tuple(row), None, e)
+
+    if len(parsed) > 1 and command.supports_batch():
+        import numpy as np
+
+        try:
+            columns = [
+                np.asarray([values[position] for _, values in parsed], dtype=arg_type)
+                for position, arg_type in enumerate(command.arg_types)
+            ]
+            batch = command.execute_batch(*columns)
+            if batch is not None:
+                for (index, values), result in zip(parsed, np.asarray(batch).tolist()):
+                    results[index] = (values, result, None)
+                return [results[index] for index in range(len(rows))]
+        except (TypeError, ValueError) as e:
+            logger.debug(
+                "Batch execution of %s rejected (%s); computing row by row", command.name, str(e)
+            )
+
+    for index, values in parsed:
+        try:
+            results[index] = (values, command.compute(*values), None)
+        except ValueError as e:
+            results[index] = (values, None, e)
+    return [results[index] for index in range(len(rows))]
+
+
+def run_batch(command: Command, rows: Sequence[Sequence[Any]]) -> List[str]:
+    """
+    Run many invocations of one command and format their output.
+
+    Args:
+        command: The command to run
+        rows: Raw arguments, one sequence per invocation
+
+    Returns:
+        The formatted output of each invocation, in order
+    """
+    command = as_vectorized(command)
+    outputs = []
+    for values, result, error in execute_rows(command, rows):
+        if error is not None:
+            outputs.append(command.format_error(error))
+        else:
+            outputs.append(command.format_result(result, *values))
+    return outputs
+
+
+class BatchCommand(Command):
+    """Command to run every command listed in a file."""
+
+    name = "batch"
+    help = "Run the commands in a file, one per line (batch <filename>)"
+
+    def execute(self, *args) -> str:
+        from app.repl import REPL
+
+        if len(args) != 1:
+            return "Error: 'batch' requires exactly one argument"
+
+        filename = args[0]
+        try:
+            with open(filename, "r", encoding="utf-8") as f:
+                lines = [line.strip() for line in f]
+        except OSError as err:
+            logger.error("Failed to read batch file: %s", str(err))
+            return f"Error reading batch file: {str(err)}"
+
+        repl = self.repl or REPL()
+        invocations = []
+        for line in lines:
+            if line and not line.startswith("#"):
+                invocations.append(repl.parse_input(line))
+        if not invocations:
+            return f"No commands in {filename}"
+
+        # Group consecutive invocations of the same command into one batch
+        groups = []
+        for command_name, command_args in invocations:
+            if groups and groups[-1][0] == command_name:
+                groups[-1][1].append(command_args)
+            else:
+                groups.append((command_name, [command_args]))
+
+        outputs = []
+        with self.calculator.history_manager.batch_updates():
+            for command_name, rows in groups:
+                command = repl.get_command(command_name)
+                if command is None:
+                    outputs.extend(f"Unknown command: {command_name}" for _ in rows)
+                    continue
+                outputs.extend(run_batch(command, rows))
+
+        logger.info("Ran %d commands from %s", len(invocations), filename)
+        return "\n".join(
+            f"{' '.join([name] + list(row))}: {output}"
+            for (name, row), output in zip(invocations, outputs)
+        )
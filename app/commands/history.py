@@ -1,11 +1,17 @@
 # app/commands/history.py
 import logging
+import time
+from datetime import datetime, timezone
 from typing import List
 
 from app.commands.base import Command
 
 logger = logging.getLogger(__name__)
 
+# Rollups with more buckets are refused rather than printed
+MAX_ROLLUP_BUCKETS = 1000
+ROLLUP_USAGE = "Usage: rollup <bucket, e.g. 30s, 5m, 1h> [--last DURATION]"
+
 
 class HistoryCommand(Command):
     """Command to display calculation history."""
@@ -56,3 +62,101 @@ class DeleteCommand(Command):
                 return f"Error: No history entry at index {index}"
         except ValueError:
             return f"Error: Invalid index '{args[0]}'"
+
+
+class UndoCommand(Command):
+    """Command to revert the most recent history change."""
+
+    name = "undo"
+    help = "Undo the most recent history change (add, delete, clear, import_csv)"
+
+    def execute(self, *args) -> str:
+        history_manager = self.calculator.history_manager
+        try:
+            label = history_manager.undo()
+        except ValueError as e:
+            return f"Error: {str(e)}"
+        if label is None:
+            return "Nothing to undo"
+        return f"Undid {label} ({history_manager.undo_counts()[0]} more to undo)"
+
+
+class RedoCommand(Command):
+    """Command to make again the most recently undone history change."""
+
+    name = "redo"
+    help = "Redo the most recently undone history change"
+
+    def execute(self, *args) -> str:
+        history_manager = self.calculator.history_manager
+        try:
+            label = history_manager.redo()
+        except ValueError as e:
+            return f"Error: {str(e)}"
+        if label is None:
+            return "Nothing to redo"
+        return f"Redid {label} ({history_manager.undo_counts()[1]} more to redo)"
+
+
+class RollupCommand(Command):
+    """Command to downsample the history into fixed time buckets."""
+
+    name = "rollup"
+    help = (
+        "Count entries per time bucket, with the mean, min and max of their numeric results "
+        "(rollup <bucket, e.g. 1m> [--last DURATION, e.g. 1h])"
+    )
+
+    def execute(self, *args) -> str:
+        import numpy as np
+        import pandas as pd
+
+        from app.time_index import NANOSECONDS, parse_duration
+
+        args = list(args)
+        last = None
+        if "--last" in args:
+            position = args.index("--last")
+            if position + 1 >= len(args):
+                return ROLLUP_USAGE
+            last = args.pop(position + 1)
+            args.pop(position)
+        if len(args) != 1:
+            return ROLLUP_USAGE
+        try:
+            width = parse_duration(args[0])
+            now = time.time_ns()
+            # Timestamp 0 (unknown) is outside every window
+            start = now - parse_duration(last) if last is not None else 1
+        except ValueError as e:
+            return f"Error: {str(e)}"
+
+        entries = self.calculator.history_manager.entries_between(start)
+        if entries.empty:
+            return "No timestamped history entries" + (f" in the last {last}" if last is not None else "")
+
+        buckets = entries["timestamp"].to_numpy(dtype="int64") // width
+        first = start // width if last is not None else int(buckets.min())
+        count = (now // width if last is not None else int(buckets.max())) - first + 1
+        if count > MAX_ROLLUP_BUCKETS:
+            return f"Error: {count} buckets is more than {MAX_ROLLUP_BUCKETS}; use longer buckets or --last"
+        bucket_ids = buckets - first
+        counts = np.bincount(bucket_ids, minlength=count)
+        results = pd.to_numeric(entries["result"], errors="coerce").to_numpy(dtype="float64")
+        numeric = np.isfinite(results)
+        stats = (
+            pd.Series(results[numeric])
+            .groupby(bucket_ids[numeric])
+            .agg(["mean", "min", "max"])
+            .reindex(range(count))
+        )
+
+        time_format = "%Y-%m-%d %H:%M:%S" + ("" if width % NANOSECONDS["s"] == 0 else ".%f")
+        lines = [f"Rollup of {len(entries)} entries in {args[0]} buckets (UTC):"]
+        for bucket, (mean, low, high) in enumerate(stats.itertuples(index=False, name=None)):
+            moment = datetime.fromtimestamp((first + bucket) * width / NANOSECONDS["s"], tz=timezone.utc)
+            line = f"{moment.strftime(time_format)}  count={counts[bucket]}"
+            if not np.isnan(mean):
+                line += f"  mean={mean:g}  min={low:g}  max={high:g}"
+            lines.append(line)
+        return "\n".join(lines)
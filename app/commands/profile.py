@@ -0,0 +1,86 @@
+# app/commands/profile.py
+import logging
+from typing import List, Optional, Tuple
+
+from app.commands.base import Command
+
+logger = logging.getLogger(__name__)
+
+USAGE = "Usage: profile [--top N] [--save PREFIX] <command> [args...]"
+
+
+def _parse_options(args: List[str], top: int) -> Tuple[int, Optional[str], List[str]]:
+    """
+    Split the ``--top`` and ``--save`` options from the command to profile.
+
+    Args:
+        args: The command's arguments
+        top: The default number of functions and allocation sites
+
+    Returns:
+        The number to report, the save prefix (or None) and the command with
+        its arguments
+
+    Raises:
+        ValueError: With the message to show if the arguments are invalid
+    """
+    prefix = None
+    while args and args[0].startswith("--"):
+        option = args.pop(0)
+        if option not in ("--top", "--save") or not args:
+            raise ValueError(USAGE)
+        value = args.pop(0)
+        if option == "--save":
+            prefix = value
+            continue
+        try:
+            top = int(value)
+        except ValueError:
+            raise ValueError(f"Error: Invalid number '{value}'")
+        if top < 1:
+            raise ValueError("Error: --top must be at least 1")
+    if not args:
+        raise ValueError(USAGE)
+    return top, prefix, args
+
+
+class ProfileCommand(Command):
+    """Command to run another command under cProfile and tracemalloc."""
+
+    name = "profile"
+    help = "Profile a command's time and allocations (profile [--top N] [--save PREFIX] <command> [args...])"
+
+    def execute(self, *args) -> str:
+        from app.profiling import DEFAULT_TOP, Profiler
+        from app.repl import REPL
+
+        repl = self.repl or REPL()
+        try:
+            top, prefix, args = _parse_options(list(args), DEFAULT_TOP)
+        except ValueError as e:
+            return str(e)
+
+        command = repl.get_command(args[0])
+        if command is None:
+            return f"Error: Unknown command: {args[0]}"
+
+        profiler = Profiler(top)
+        try:
+            profiler.start()
+        except RuntimeError as e:
+            return f"Error: {str(e)}"
+        try:
+            # CPU-bound commands too run in-process, so their work is profiled
+            output = repl.execute_command(command, args[1:], in_process=True)
+        finally:
+            profiler.stop()
+
+        logger.info("Profiled command %s", command.name)
+        sections = [str(output), "", profiler.report()]
+        if prefix:
+            try:
+                sections.append("\nSaved " + ", ".join(profiler.save(prefix)))
+            except OSError as e:
+                logger.error("Failed to save profile to %s: %s", prefix, str(e))
+                sections.append(f"\nError: Could not save profile: {str(e)}")
+        return "\n".join(sections)
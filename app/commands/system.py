@@ -17,8 +17,8 @@ class ExitCommand(Command):
     def execute(self, *args) -> str:
         from app.repl import REPL
 
-        # Get the REPL instance
-        repl = REPL()
+        # Get the REPL that is running this command
+        repl = self.repl or REPL()
         repl.stop()
 
         return "Exiting application"
@@ -35,14 +35,14 @@ class HelpCommand(Command):
 
         logger.info("Displaying help information")
 
-        # Get the REPL instance
-        repl = REPL()
+        # Get the REPL that is running this command
+        repl = self.repl or REPL()
         commands = repl.get_command_list()
 
         # If a specific command is requested
         if args:
             cmd_name = args[0].lower()
-            cmd = repl.get_command(cmd_name)
+            cmd = repl.get_command_class(cmd_name)
             if cmd:
                 return f"{cmd_name}: {cmd.help}"
             else:
@@ -51,14 +51,14 @@ class HelpCommand(Command):
         # Otherwise list all commands
         result = "Available commands:\n"
 
-        # Get all command instances
-        command_instances = {name: repl.get_command(name) for name in commands}
+        # Get all command classes (without importing lazily loaded plugins)
+        command_instances = {name: repl.get_command_class(name) for name in commands}
 
         # Group commands by category
         categories = {
-            "Arithmetic": ["add", "subtract", "multiply", "divide"],
-            "History": ["history", "clear", "delete"],
-            "System": ["exit", "quit", "help", "menu"],
+            "Arithmetic": ["add", "subtract", "multiply", "divide", "vars"],
+            "History": ["history", "clear", "delete", "undo", "redo", "rollup", "verify"],
+            "System": ["exit", "quit", "help", "menu", "reload", "batch", "metrics", "profile"],
             "Plugins": [
                 cmd
                 for cmd in commands
@@ -68,13 +68,22 @@ class HelpCommand(Command):
                     "subtract",
                     "multiply",
                     "divide",
+                    "vars",
                     "history",
                     "clear",
                     "delete",
+                    "undo",
+                    "redo",
+                    "rollup",
+                    "verify",
                     "exit",
                     "quit",
                     "help",
                     "menu",
+                    "reload",
+                    "batch",
+                    "metrics",
+                    "profile",
                 ]
             ],
         }
@@ -99,11 +108,59 @@ class MenuCommand(Command):
     def execute(self, *args) -> str:
         from app.repl import REPL
 
-        # Get the REPL instance
-        repl = REPL()
+        # Get the REPL that is running this command
+        repl = self.repl or REPL()
         commands = repl.get_command_list()
 
         result = "Available commands:\n"
         result += ", ".join(sorted(commands))
 
         return result
+
+
+class ReloadCommand(Command):
+    """Command to hot-reload changed plugins."""
+
+    name = "reload"
+    help = "Reload changed plugins (reload | reload auto [seconds] | reload off)"
+
+    def execute(self, *args) -> str:
+        from app.repl import REPL
+
+        repl = self.repl or REPL()
+        watcher = repl.plugin_watcher
+
+        if not args:
+            return str(watcher.reload())
+
+        mode = args[0].lower()
+        if mode == "auto":
+            try:
+                interval = float(args[1]) if len(args) > 1 else 1.0
+            except ValueError:
+                return f"Error: Invalid interval '{args[1]}'"
+            if interval <= 0:
+                return "Error: Interval must be positive"
+            watcher.stop()
+            watcher.start(interval)
+            return f"Plugin auto-reload enabled (every {interval:g} seconds)"
+        if mode == "off":
+            watcher.stop()
+            return "Plugin auto-reload disabled"
+        return "Usage: reload | reload auto [seconds] | reload off"
+
+
+class MetricsCommand(Command):
+    """Command to display runtime metrics."""
+
+    name = "metrics"
+    help = "Show runtime metrics in Prometheus text format (metrics [name prefix])"
+
+    def execute(self, *args) -> str:
+        from app.metrics import REGISTRY
+
+        prefix = args[0] if args else ""
+        text = REGISTRY.render(prefix)
+        if not text:
+            return f"No metrics matching '{prefix}'"
+        return text.rstrip("\n")
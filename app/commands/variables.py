@@ -0,0 +1,26 @@
+# app/commands/variables.py
+import logging
+
+from app.calculator import OPERATION_SYMBOLS
+from app.commands.base import Command
+
+logger = logging.getLogger(__name__)
+
+
+class VariablesCommand(Command):
+    """Command to display the calculator's variables."""
+
+    name = "vars"
+    help = "Display variables with their formulas and values (vars [name...]); assign with x = add 2 3"
+    reads_history = False
+
+    def execute(self, *args) -> str:
+        variables = self.calculator.variables
+        names = list(args) or variables.names()
+        if not names:
+            return "No variables defined"
+
+        unknown = [name for name in names if name not in variables]
+        if unknown:
+            return f"Error: Unknown variable: {unknown[0]}"
+        return "\n".join(variables.describe(name, OPERATION_SYMBOLS) for name in names)
@@ -0,0 +1,46 @@
+# app/commands/verify.py
+import logging
+
+from app.commands.base import Command
+
+logger = logging.getLogger(__name__)
+
+USAGE = "Usage: verify <filename> [--workers N] [--limit N]"
+
+
+class VerifyCommand(Command):
+    """Command to check that every row of a history CSV evaluates to its result."""
+
+    name = "verify"
+    help = "Verify the results stored in a history CSV file (verify <filename> [--workers N] [--limit N])"
+    # Reads a file, never the live history
+    reads_history = False
+
+    def execute(self, *args) -> str:
+        from app.verify import DEFAULT_LIMIT, format_report, verify_file
+
+        args = list(args)
+        options = {"--workers": None, "--limit": DEFAULT_LIMIT}
+        positional = []
+        while args:
+            arg = args.pop(0)
+            if arg not in options:
+                positional.append(arg)
+                continue
+            if not args:
+                return USAGE
+            try:
+                options[arg] = int(args.pop(0))
+            except ValueError:
+                return f"Error: {arg} must be a whole number"
+            if options[arg] < 1:
+                return f"Error: {arg} must be at least 1"
+        if len(positional) != 1:
+            return USAGE
+
+        try:
+            report = verify_file(positional[0], workers=options["--workers"])
+        except (OSError, ValueError) as e:
+            logger.error("Failed to verify %s: %s", positional[0], str(e))
+            return f"Error: Could not verify {positional[0]}: {str(e)}"
+        return format_report(report, options["--limit"])
@@ -0,0 +1,264 @@
+# app/event_log.py
+"""
+Structured calculation event log.
+
+Per-calculation events (calculations, batches, executed commands) go to a
+JSON Lines file of their own instead of the diagnostic log, so they cannot
+rotate warnings and errors out of ``logs/``. To bound the I/O at high volume:
+
+* Each event is kept with probability ``EVENT_LOG_SAMPLE_RATE`` (default 1.0).
+* At most ``EVENT_LOG_RATE_LIMIT`` events are kept per second (default 1000,
+  0 for no limit).
+* Kept events are buffered and written in one block once
+  ``EVENT_LOG_BATCH_SIZE`` (default 256) are pending, or by a background
+  thread every ``EVENT_LOG_FLUSH_INTERVAL`` seconds (default 1.0), and at exit.
+* Nothing is dropped silently: every flush that follows dropped events also
+  writes a ``suppressed`` event with the number sampled out and rate limited.
+
+Events are written to ``EVENT_LOG_FILE`` (default ``logs/events.jsonl``);
+setting it to an empty string disables the event log.
+"""
+import atexit
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["EventLog", "EventLogConfig", "get_event_log"]
+
+DEFAULT_EVENT_LOG_FILE = os.path.join("logs", "events.jsonl")
+DEFAULT_SAMPLE_RATE = 1.0
+DEFAULT_RATE_LIMIT = 1000
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+
+# Environment variable and type of each setting
+_ENV_SETTINGS = {
+    "path": ("EVENT_LOG_FILE", str),
+    "sample_rate": ("EVENT_LOG_SAMPLE_RATE", float),
+    "rate_limit": ("EVENT_LOG_RATE_LIMIT", int),
+    "batch_size": ("EVENT_LOG_BATCH_SIZE", int),
+    "flush_interval": ("EVENT_LOG_FLUSH_INTERVAL", float),
+}
+
+
+@dataclass(frozen=True)
+class EventLogConfig:
+    """The settings of an ``EventLog`` (see the module docstring)."""
+
+    path: str = DEFAULT_EVENT_LOG_FILE
+    sample_rate: float = DEFAULT_SAMPLE_RATE
+    rate_limit: int = DEFAULT_RATE_LIMIT
+    batch_size: int = DEFAULT_BATCH_SIZE
+    flush_interval: float = DEFAULT_FLUSH_INTERVAL
+
+    def __post_init__(self):
+        if not 0 <= self.sample_rate <= 1:
+            raise ValueError("sample_rate must be between 0 and 1")
+        if self.rate_limit < 0:
+            raise ValueError("rate_limit must not be negative")
+        if self.batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+    @classmethod
+    def from_env(cls, **overrides: Any) -> "EventLogConfig":
+        """
+        Build the settings from the environment.
+
+        Args:
+            **overrides: Settings to use instead of the environment; None
+                values are ignored
+
+        Raises:
+            ValueError: If a setting is invalid
+        """
+        settings = {}
+        for name, (variable, convert) in _ENV_SETTINGS.items():
+            value = overrides.get(name)
+            settings[name] = convert(os.getenv(variable, str(getattr(cls, name)))) if value is None else value
+        return cls(**settings)
+
+
+class EventLog:
+    """A sampled, rate-limited JSON Lines event stream written in blocks."""
+
+    # The process-wide event log (see get_event_log)
+    _instance = None
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        *,
+        sample_rate: Optional[float] = None,
+        rate_limit: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            path: The JSON Lines file (``EVENT_LOG_FILE`` by default); an
+                empty string disables the log
+            sample_rate: Fraction of events kept (``EVENT_LOG_SAMPLE_RATE``)
+            rate_limit: Maximum events kept per second, 0 for no limit
+                (``EVENT_LOG_RATE_LIMIT``)
+            batch_size: Pending events that trigger a write (``EVENT_LOG_BATCH_SIZE``)
+            flush_interval: Seconds between background flushes, 0 to flush only
+                on full batches and at exit (``EVENT_LOG_FLUSH_INTERVAL``)
+            clock: Monotonic clock used for the rate limit
+        """
+        self.config = EventLogConfig.from_env(
+            path=path,
+            sample_rate=sample_rate,
+            rate_limit=rate_limit,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+        )
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._pending: List[str] = []
+        # The current second of the rate limit and the events kept in it
+        self._window = (None, 0)
+        # Events dropped since the last flush, by reason
+        self._dropped: Counter = Counter()
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether events are written at all."""
+        return bool(self.config.path)
+
+    def record(self, event: str, **fields: Any) -> bool:
+        """
+        Record an event, subject to sampling and the rate limit.
+
+        Args:
+            event: The event type, e.g. ``"calculation"``
+            **fields: JSON-serializable event data
+
+        Returns:
+            True if the event was kept
+        """
+        if not self.enabled:
+            return False
+        # Started even if this event is dropped, so that the ``suppressed``
+        # event is written without waiting for exit
+        if self.config.flush_interval > 0 and self._thread is None:
+            self._start_flusher()
+        if self.config.sample_rate < 1 and random.random() >= self.config.sample_rate:
+            with self._lock:
+                self._dropped["sampled_out"] += 1
+            return False
+
+        line = json.dumps({"ts": time.time(), "event": event, **fields}, default=str)
+        with self._lock:
+            if self.config.rate_limit:
+                window, count = self._window
+                second = int(self._clock())
+                if second != window:
+                    count = 0
+                if count >= self.config.rate_limit:
+                    self._dropped["rate_limited"] += 1
+                    return False
+                self._window = (second, count + 1)
+            self._pending.append(line)
+            full = len(self._pending) >= self.config.batch_size
+        if full:
+            self.flush()
+        return True
+
+    def flush(self) -> int:
+        """
+        Write pending events, then a ``suppressed`` event if any were dropped.
+
+        Returns:
+            The number of lines written
+        """
+        with self._lock:
+            lines, self._pending = self._pending, []
+            if self._dropped:
+                lines.append(
+                    json.dumps(
+                        {
+                            "ts": time.time(),
+                            "event": "suppressed",
+                            "sampled_out": self._dropped["sampled_out"],
+                            "rate_limited": self._dropped["rate_limited"],
+                        }
+                    )
+                )
+                self._dropped.clear()
+        if not lines:
+            return 0
+
+        try:
+            with self._write_lock:
+                directory = os.path.dirname(self.config.path)
+                if directory and not os.path.exists(directory):
+                    os.makedirs(directory)
+                with open(self.config.path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+        except OSError as e:
+            logger.error("Failed to write %d events to %s: %s", len(lines), self.config.path, str(e))
+            return 0
+        return len(lines)
+
+    def _start_flusher(self) -> None:
+        """Start the background flush thread once."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.config.flush_interval):
+            self.flush()
+
+    def close(self) -> None:
+        """Stop the background thread and write everything still pending."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        self._stop.clear()
+
+
+_event_log_lock = threading.Lock()
+
+
+def get_event_log() -> EventLog:
+    """
+    Return the process-wide event log, configured from the environment on first use.
+
+    Invalid ``EVENT_LOG_*`` settings are logged and replaced by the defaults,
+    so that they cannot make the calculations that record events fail.
+    """
+    if EventLog._instance is None:
+        with _event_log_lock:
+            if EventLog._instance is None:
+                try:
+                    event_log = EventLog()
+                except ValueError as e:
+                    logger.warning("Invalid event log settings, using the defaults: %s", str(e))
+                    event_log = EventLog(
+                        sample_rate=DEFAULT_SAMPLE_RATE,
+                        rate_limit=DEFAULT_RATE_LIMIT,
+                        batch_size=DEFAULT_BATCH_SIZE,
+                        flush_interval=DEFAULT_FLUSH_INTERVAL,
+                    )
+                atexit.register(event_log.close)
+                EventLog._instance = event_log
+    return EventLog._instance
@@ -1,14 +1,298 @@
 # app/history_manager.py
+"""
+Calculation history storage.
+
+Concurrency model
+-----------------
+``HistoryManager`` is a process-wide singleton that may be shared by many
+threads:
+
+* Singleton creation is double-checked under a class-level lock, so two
+  threads constructing ``HistoryManager()`` at the same time get the same,
+  fully initialized instance.
+* ``add_entry`` never touches the DataFrame. Each thread appends rows to its
+  own buffer, guarded by a per-buffer lock that is only contended while a
+  reader drains it, so concurrent writers do not serialize on each other.
+* Every read or structural mutation (``get_history``, ``delete_entry``,
+  ``set_history``, ``clear_history``, saving and loading) takes the instance
+  lock, merges all pending buffers into the DataFrame in append order and then
+  operates on the result. Readers therefore always see a consistent snapshot
+  that includes every entry whose ``add_entry`` call has returned.
+* Entries appended by a single thread keep their relative order. Entries from
+  different threads are ordered by the sequence number taken when they were
+  appended.
+
+pandas is imported on first read rather than at import time: entries added
+before then only live in the thread buffers, so commands that never look at
+the history do not pay for importing it. ``HistoryManager.append_only()``
+goes further for short-lived processes: it skips loading ``HISTORY_FILE`` and
+autosave appends new entries to the file with the ``csv`` module instead of
+rewriting it.
+
+``merge_history`` appends only the entries not already in the history:
+entries with the same content match unless both have (different)
+timestamps. It looks them up in a set of 64-bit hashes of the entries' content
+and timestamps (see ``_entry_hashes``) that is built on the first merge and
+then kept up to date
+as entries are added, so merging is linear in the size of the merged history
+rather than pairwise. Changes other than additions drop the set, to be
+rebuilt by the next merge.
+
+Every change records its inverse in an ``UndoLog`` (see ``app.undo_log``),
+which ``undo`` and ``redo`` apply. Undo memory grows with the size of the
+changes rather than of the history: a row count for additions, the deleted
+row for deletions, and a file the replaced history is spilled to for
+``clear``, ``set_history`` and ``load_history``. Undo and redo are changes
+like any other, so they are published and autosaved.
+
+With ``HISTORY_SHARED_FILE`` set, the singleton also publishes the numeric
+columns of the history to a shared memory-mapped file for other processes
+(see ``app.shared_history``). New entries are then drained from the thread
+buffers and published as they are added, which makes ``add_entry`` take the
+instance lock; they are staged until the next read merges them.
+
+The singleton is the ``default`` history namespace. ``HistoryManager.create``
+builds independent instances with their own autosave file for the other
+namespaces, which ``app.history_namespaces`` manages per session.
+"""
+import csv
+import itertools
 import logging
 import os
-from typing import Any
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Iterable, List, Optional, Tuple
 
-import pandas as pd
+from app.metrics import REGISTRY
+from app.time_index import TimeIndex
+from app.tracing import traced
+from app.undo_log import Insert, Truncate, UndoLog
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+    from app.shared_history import SharedHistoryPublisher
 
 logger = logging.getLogger(__name__)
 
 __all__ = ["HistoryManager"]
 
+HISTORY_COLUMNS = ["operation", "expression", "result"]
+# Nanoseconds since the Unix epoch, non-decreasing; 0 when unknown. Optional
+# in files and DataFrames given to the history, unlike HISTORY_COLUMNS.
+TIMESTAMP_COLUMN = "timestamp"
+DEFAULT_NAMESPACE = "default"
+
+HISTORY_MUTATIONS = REGISTRY.counter(
+    "calculator_history_mutations_total", "History entries added and other history changes", ("kind",)
+)
+ENTRIES_ADDED = HISTORY_MUTATIONS.labels("add")
+AUTOSAVE_SECONDS = REGISTRY.histogram(
+    "calculator_history_autosave_duration_seconds", "Time taken by history autosave writes", ("mode",)
+)
+AUTOSAVE_FAILURES = REGISTRY.counter(
+    "calculator_history_autosave_failures_total", "History autosave writes that failed", ("mode",)
+)
+
+
+def _entry_hashes(history: "pd.DataFrame") -> List[Tuple[int, int, int]]:
+    """
+    Return 64-bit hashes of every entry of a history DataFrame.
+
+    Each entry gets three hashes: of its content (the operation, expression
+    and result), of its content and timestamp, and of its content with an
+    unknown (0) timestamp. Numeric results are hashed as numbers, so ``5``,
+    ``"5"`` and ``"5.0"`` (an added entry, and the same entry read back from
+    CSV) hash the same. Two different entries share a hash with negligible
+    probability (about 1 in 10^7 for a million entries against another
+    million).
+    """
+    import pandas as pd
+
+    results = history["result"]
+    try:
+        numbers = results.astype("float64")
+    except (TypeError, ValueError):
+        numbers = pd.to_numeric(results, errors="coerce")
+    # NaN and non-numeric results are hashed by their text instead
+    texts = results.astype(object).where(numbers.isna(), "").map(str)
+    key = pd.DataFrame(
+        {
+            "operation": history["operation"].astype(object).map(str),
+            "expression": history["expression"].astype(object).map(str),
+            "number": numbers.to_numpy(dtype="float64"),
+            "text": texts,
+        }
+    )
+    contents = pd.util.hash_pandas_object(key, index=False).to_numpy()
+    timestamps = _with_timestamps(history)[TIMESTAMP_COLUMN].to_numpy()
+    timed = pd.util.hash_pandas_object(pd.DataFrame({"content": contents, "timestamp": timestamps}), index=False)
+    untimed = pd.util.hash_pandas_object(pd.DataFrame({"content": contents, "timestamp": 0}), index=False)
+    return list(zip(contents.tolist(), timed.tolist(), untimed.tolist()))
+
+
+def _empty_history() -> "pd.DataFrame":
+    """Return an empty history DataFrame."""
+    import pandas as pd
+
+    history = pd.DataFrame(columns=HISTORY_COLUMNS)
+    history[TIMESTAMP_COLUMN] = pd.Series(dtype="int64")
+    return history
+
+
+def _with_timestamps(history: "pd.DataFrame") -> "pd.DataFrame":
+    """Return a history with an int64 timestamp column, 0 where it is missing or invalid."""
+    import pandas as pd
+
+    if TIMESTAMP_COLUMN in history.columns and history[TIMESTAMP_COLUMN].dtype == "int64":
+        return history
+    history = history.copy()
+    if TIMESTAMP_COLUMN in history.columns:
+        timestamps = pd.to_numeric(history[TIMESTAMP_COLUMN], errors="coerce")
+        history[TIMESTAMP_COLUMN] = timestamps.fillna(0).astype("int64")
+    else:
+        history[TIMESTAMP_COLUMN] = 0
+        history[TIMESTAMP_COLUMN] = history[TIMESTAMP_COLUMN].astype("int64")
+    return history
+
+
+class _ThreadBuffer:
+    """Rows appended by one thread that have not been merged yet, and its ``batch_updates`` state."""
+
+    __slots__ = ("lock", "rows", "owner", "batch_depth", "autosave_pending")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rows = []
+        self.owner = threading.current_thread()
+        self.batch_depth = 0
+        self.autosave_pending = False
+
+
+class _ThreadBuffers:
+    """The append buffers of every thread, and the sequence numbers ordering their rows."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._sequence = itertools.count()
+        self._buffers: List[_ThreadBuffer] = []
+
+    def current(self) -> _ThreadBuffer:
+        """Return the calling thread's buffer, creating it on first use."""
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = _ThreadBuffer()
+            self._local.buffer = buffer
+            with self._lock:
+                self._buffers.append(buffer)
+        return buffer
+
+    def append(self, rows: Iterable[tuple]) -> None:
+        """Append rows to the calling thread's buffer, each prefixed with its sequence number."""
+        buffer = self.current()
+        with buffer.lock:
+            buffer.rows.extend((next(self._sequence),) + row for row in rows)
+
+    def peek(self) -> list:
+        """Return every buffered row without removing it, in no particular order."""
+        with self._lock:
+            buffers = list(self._buffers)
+        rows = []
+        for buffer in buffers:
+            with buffer.lock:
+                rows.extend(buffer.rows)
+        return rows
+
+    def drain(self) -> list:
+        """Remove and return every buffered row in append order."""
+        pending = []
+        with self._lock:
+            live_buffers = []
+            for buffer in self._buffers:
+                with buffer.lock:
+                    if buffer.rows:
+                        pending.extend(buffer.rows)
+                        buffer.rows = []
+                if buffer.owner.is_alive():
+                    live_buffers.append(buffer)
+            self._buffers = live_buffers
+        pending.sort(key=lambda row: row[0])
+        return pending
+
+
+class _AppendProgress:
+    """What append-only autosave has written to the history file."""
+
+    __slots__ = ("sequence", "unappended")
+
+    def __init__(self):
+        # Sequence number of the last row appended, and drained rows that
+        # have not been appended yet
+        self.sequence = -1
+        self.unappended = []
+
+
+class _EntryIndexes:
+    """
+    Lookup structures over the merged history, built on first use.
+
+    Appends keep them up to date; other changes drop them (``reset``).
+    """
+
+    def __init__(self):
+        # Hashes of every merged entry, see merge_history
+        self._hashes = None
+        # Window index over the timestamps, see entries_between
+        self._time_index = None
+
+    def hashes(self, history: "pd.DataFrame") -> set:
+        """Return the set of entry hashes of ``history``, building it if needed."""
+        if self._hashes is None:
+            self._hashes = set()
+            self._add_hashes(history)
+        return self._hashes
+
+    def time_index(self, timestamps: "np.ndarray") -> TimeIndex:
+        """Return the index over the ``timestamps`` column, building it if needed."""
+        if self._time_index is None:
+            self._time_index = TimeIndex(timestamps)
+        return self._time_index
+
+    def extend(self, history: "pd.DataFrame", new_entries: Optional["pd.DataFrame"] = None) -> None:
+        """
+        Take in entries appended to a history.
+
+        Args:
+            history: The history, including the new entries
+            new_entries: The new entries, if they were not hashed yet
+        """
+        if self._hashes is not None and new_entries is not None:
+            self._add_hashes(new_entries)
+        if self._time_index is not None:
+            self._time_index.extend(history[TIMESTAMP_COLUMN].to_numpy())
+
+    def _add_hashes(self, entries: "pd.DataFrame") -> None:
+        for content, timed, _ in _entry_hashes(entries):
+            self._hashes.update((content, timed))
+
+    def reset(self) -> None:
+        """Drop the indexes after a change other than an append."""
+        self._hashes = None
+        self._time_index = None
+
+
+class _Publication:
+    """Where the history is published, and rows published but not merged yet."""
+
+    __slots__ = ("publisher", "staged")
+
+    def __init__(self):
+        self.publisher: Optional["SharedHistoryPublisher"] = None
+        self.staged = []
+
 
 class HistoryManager:
     """
@@ -17,33 +301,217 @@ class HistoryManager:
     """
 
     _instance = None
-    _history = None
+    _instance_lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(HistoryManager, cls).__new__(cls)
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(HistoryManager, cls).__new__(cls)
+                    instance._initialize()
+
+                    # Try to load history from environment variable if specified
+                    instance._try_load_history_from_env()
+                    instance._undo.clear()
+                    instance._try_publish_from_env()
+
+                    # Publish only once the instance is fully initialized
+                    cls._instance = instance
+                    logger.info("HistoryManager initialized")
+        return cls._instance
 
-            # Initialize empty history DataFrame
-            cls._instance._history = pd.DataFrame(
-                columns=["operation", "expression", "result"]
-            )
+    @classmethod
+    def append_only(cls) -> "HistoryManager":
+        """
+        Create the singleton without loading ``HISTORY_FILE``.
 
-            # Try to load history from environment variable if specified
-            cls._instance._try_load_history_from_env()
+        Autosave then appends new entries to the file instead of rewriting
+        it, so adding entries needs neither the stored history nor pandas.
+        Changes other than new entries are not written in this mode. If the
+        singleton already exists it is returned unchanged.
 
-            logger.info("HistoryManager initialized")
+        Returns:
+            The HistoryManager instance
+        """
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(HistoryManager, cls).__new__(cls)
+                    instance._initialize()
+                    instance._appended = _AppendProgress()
+                    cls._instance = instance
+                    logger.info("HistoryManager initialized (append-only)")
         return cls._instance
 
+    @classmethod
+    def create(cls, namespace: str, history_file: str) -> "HistoryManager":
+        """
+        Create a standalone (non-singleton) history for a namespace.
+
+        Its history is loaded from and autosaved to ``history_file`` instead
+        of ``HISTORY_FILE``.
+
+        Args:
+            namespace: The namespace name
+            history_file: The namespace's CSV file
+
+        Returns:
+            A new HistoryManager instance
+        """
+        instance = super(HistoryManager, cls).__new__(cls)
+        instance._initialize()
+        instance.namespace = namespace
+        instance.history_file = history_file
+        instance._try_load_history_from_env()
+        instance._undo.clear()
+        logger.debug("HistoryManager created for namespace %s", namespace)
+        return instance
+
+    def _initialize(self):
+        """Initialize instance attributes."""
+        self.namespace = DEFAULT_NAMESPACE
+        # Autosave file of a standalone namespace; None means HISTORY_FILE
+        self.history_file = None
+        self._lock = threading.RLock()
+        # Created on first read, see the module docstring
+        self._frame = None
+        # Rows added and not merged yet, and each thread's batch_updates state
+        self._buffers = _ThreadBuffers()
+        # What autosave appended to HISTORY_FILE in append-only mode, else None
+        self._appended: Optional[_AppendProgress] = None
+        # Entry hashes and time index, see merge_history and entries_between
+        self._indexes = _EntryIndexes()
+        # Shared history publisher, and rows it drained that are not merged yet
+        self._publication = _Publication()
+        # Inverses of recent changes, see undo
+        self._undo = UndoLog()
+
+    def entry_count(self) -> int:
+        """Return the number of entries, including pending ones, without merging them."""
+        with self._lock:
+            pending = len(self._publication.staged) + len(self._buffers.peek())
+            return (0 if self._frame is None else len(self._frame)) + pending
+
+    @property
+    def _history(self) -> "pd.DataFrame":
+        """The merged history DataFrame, including all pending entries."""
+        with self._lock:
+            self._merge_pending()
+            if self._frame is None:
+                self._frame = _empty_history()
+            return self._frame
+
+    @_history.setter
+    def _history(self, history: "pd.DataFrame") -> None:
+        with self._lock:
+            self._drain_pending()
+            self._publication.staged = []
+            self._frame = history
+            self._indexes.reset()
+
+    def _drain_pending(self) -> list:
+        """Remove and return all buffered rows in append order.
+
+        Must be called with ``self._lock`` held.
+        """
+        pending = self._buffers.drain()
+        if self._appended is not None:
+            self._appended.unappended.extend(pending)
+        publisher = self._publication.publisher
+        if publisher is not None and pending:
+            try:
+                publisher.append([row[1:4] for row in pending])
+            except (OSError, ValueError) as e:
+                logger.error("Failed to publish history entries: %s", str(e))
+        return pending
+
+    def _merge_pending(self) -> None:
+        """Append all buffered rows to the DataFrame.
+
+        Must be called with ``self._lock`` held.
+        """
+        pending = self._publication.staged + self._drain_pending()
+        self._publication.staged = []
+        if not pending:
+            return
+
+        import numpy as np
+        import pandas as pd
+
+        new_entries = pd.DataFrame(
+            [row[1:] for row in pending], columns=HISTORY_COLUMNS + [TIMESTAMP_COLUMN]
+        )
+        # Keep timestamps non-decreasing across threads and clock adjustments
+        timestamps = new_entries[TIMESTAMP_COLUMN].to_numpy(dtype="int64")
+        if self._frame is not None and not self._frame.empty:
+            timestamps = np.maximum(timestamps, self._frame[TIMESTAMP_COLUMN].iat[-1])
+        new_entries[TIMESTAMP_COLUMN] = np.maximum.accumulate(timestamps)
+        if self._frame is None or self._frame.empty:
+            self._frame = new_entries
+        else:
+            self._frame = pd.concat([self._frame, new_entries], ignore_index=True)
+        self._indexes.extend(self._frame, new_entries)
+
+    def publish_to(self, publisher: Optional["SharedHistoryPublisher"]) -> None:
+        """
+        Publish the history, and every later change, to a shared history file.
+
+        Args:
+            publisher: The publisher, or None to stop publishing
+        """
+        with self._lock:
+            history = self._history
+            self._publication.publisher = publisher
+            if publisher is not None:
+                publisher.publish(history)
+
+    def _try_publish_from_env(self):
+        """Start publishing to ``HISTORY_SHARED_FILE``, if it is set."""
+        path = os.getenv("HISTORY_SHARED_FILE", "")
+        if path:
+            try:
+                from app.shared_history import SharedHistoryPublisher
+
+                self.publish_to(SharedHistoryPublisher(path))
+            except (OSError, ValueError) as e:
+                logger.error("Failed to publish history to %s: %s", path, str(e))
+
+    def _publish_new_entries(self) -> None:
+        """Publish the entries still in thread buffers, staging them for the next merge."""
+        with self._lock:
+            self._publication.staged.extend(self._drain_pending())
+
+    def _republish(self, start: int = 0) -> None:
+        """
+        Publish the DataFrame from ``start`` on after a change to it.
+
+        Must be called with ``self._lock`` held.
+        """
+        publisher = self._publication.publisher
+        if publisher is None:
+            return
+        try:
+            publisher.publish(self._frame if self._frame is not None else _empty_history(), start)
+        except (OSError, ValueError) as e:
+            logger.error("Failed to publish history: %s", str(e))
+
+    def autosave_file(self) -> str:
+        """Return the file autosave writes to, or an empty string if autosave is off."""
+        if self.history_file is not None:
+            return self.history_file
+        return os.getenv("HISTORY_FILE", "")
+
     def _try_load_history_from_env(self):
-        """Try to load history from a file specified in the environment variable."""
-        history_file = os.getenv("HISTORY_FILE", "")
+        """Try to load history from the autosave file, if it exists."""
+        history_file = self.autosave_file()
         if history_file and os.path.exists(history_file):
             try:
                 self.load_history(history_file)
-                logger.info(f"Loaded history from {history_file}")
+                logger.info("Loaded history from %s", history_file)
             except Exception as e:
-                logger.error(f"Failed to load history from {history_file}: {str(e)}")
+                logger.error("Failed to load history from %s: %s", history_file, str(e))
 
+    @traced("HistoryManager.add_entry")
     def add_entry(self, operation: str, expression: str, result: Any) -> None:
         """
         Add a new entry to the history.
@@ -57,35 +525,85 @@ class HistoryManager:
             # Convert result to string to ensure compatibility
             result_str = str(result)
 
-            new_entry = pd.DataFrame(
-                {
-                    "operation": [operation],
-                    "expression": [expression],
-                    "result": [result_str],
-                }
-            )
-
-            # Append the new entry
-            self._history = pd.concat([self._history, new_entry], ignore_index=True)
+            # Stage the entry in this thread's buffer; it is merged on read
+            self._buffers.append([(operation, expression, result_str, time.time_ns())])
+            self._undo.record("add", Truncate(1))
+            ENTRIES_ADDED.inc()
+            if self._publication.publisher is not None:
+                self._publish_new_entries()
 
             # Try to save history if environment variable is set
             self._try_save_history_to_env()
 
-            logger.info(f"Added history entry: {operation} {expression} = {result_str}")
+            logger.debug("Added history entry: %s %s = %s", operation, expression, result_str)
         except Exception as e:
-            logger.error(f"Error adding history entry: {str(e)}")
+            logger.error("Error adding history entry: %s", str(e))
             raise ValueError(f"Could not add history entry: {str(e)}")
 
-    def get_history(self) -> pd.DataFrame:
+    def add_entries(self, entries: Iterable[Tuple[str, str, Any]]) -> int:
+        """
+        Add several entries to the history in one append.
+
+        Args:
+            entries: (operation, expression, result) tuples in order
+
+        Returns:
+            The number of entries added
+        """
+        try:
+            now = time.time_ns()
+            rows = [
+                (operation, expression, str(result), now)
+                for operation, expression, result in entries
+            ]
+            if not rows:
+                return 0
+
+            self._buffers.append(rows)
+            self._undo.record("add", Truncate(len(rows)))
+            ENTRIES_ADDED.inc(len(rows))
+            if self._publication.publisher is not None:
+                self._publish_new_entries()
+
+            # Try to save history if environment variable is set
+            self._try_save_history_to_env()
+
+            logger.debug("Added %d history entries", len(rows))
+            return len(rows)
+        except Exception as e:
+            logger.error("Error adding history entries: %s", str(e))
+            raise ValueError(f"Could not add history entries: {str(e)}")
+
+    @contextmanager
+    def batch_updates(self):
+        """
+        Postpone autosave until the outermost ``batch_updates`` block exits.
+
+        Many small mutations made by the calling thread inside the block are
+        written to ``HISTORY_FILE`` once instead of once each.
+        """
+        buffer = self._buffers.current()
+        depth = buffer.batch_depth
+        buffer.batch_depth = depth + 1
+        try:
+            yield self
+        finally:
+            buffer.batch_depth = depth
+            if depth == 0 and buffer.autosave_pending:
+                buffer.autosave_pending = False
+                self._try_save_history_to_env()
+
+    def get_history(self) -> "pd.DataFrame":
         """
         Get the current history DataFrame.
 
         Returns:
-            The history DataFrame
+            A snapshot copy of the history DataFrame
         """
-        return self._history.copy()
+        with self._lock:
+            return self._history.copy()
 
-    def set_history(self, history: pd.DataFrame) -> None:
+    def set_history(self, history: "pd.DataFrame") -> None:
         """
         Set the history DataFrame.
 
@@ -93,25 +611,110 @@ class HistoryManager:
             history: The new history DataFrame
         """
         # Validate the DataFrame has required columns
-        required_columns = ["operation", "expression", "result"]
+        required_columns = HISTORY_COLUMNS
+        if not all(col in history.columns for col in required_columns):
+            raise ValueError(
+                f"History DataFrame must have columns: {', '.join(required_columns)}"
+            )
+
+        with self._lock:
+            self._undo.record_replacement("set", self._history, len(history))
+            self._history = _with_timestamps(history.copy())
+            self._republish()
+            HISTORY_MUTATIONS.labels("set").inc()
+            logger.info("Set history with %d entries", len(history))
+
+            # Try to save history if environment variable is set
+            self._try_save_history_to_env()
+
+    def merge_history(self, history: "pd.DataFrame") -> Tuple[int, int]:
+        """
+        Append the entries of a DataFrame that are not already in the history.
+
+        An entry is already present if one with the same operation,
+        expression and result is in the history or earlier in ``history``,
+        and either of the two has an unknown (0) timestamp or both have the
+        same timestamp.
+        New entries keep their order; columns the history lacks are dropped.
+
+        Args:
+            history: The entries to merge
+
+        Returns:
+            The numbers of new and of duplicate entries
+
+        Raises:
+            ValueError: If the DataFrame lacks a history column
+        """
+        required_columns = HISTORY_COLUMNS
         if not all(col in history.columns for col in required_columns):
             raise ValueError(
                 f"History DataFrame must have columns: {', '.join(required_columns)}"
             )
 
-        self._history = history.copy()
-        logger.info(f"Set history with {len(history)} entries")
+        import pandas as pd
+
+        with self._lock:
+            current = self._history
+            hashes = self._indexes.hashes(current)
+            is_new = []
+            for content, timed, untimed in _entry_hashes(history):
+                if timed == untimed:
+                    is_new.append(content not in hashes)
+                else:
+                    is_new.append(timed not in hashes and untimed not in hashes)
+                hashes.update((content, timed))
+
+            new_entries = _with_timestamps(history.loc[is_new]).reindex(columns=current.columns)
+            added = len(new_entries)
+            if added:
+                if current.empty:
+                    self._frame = new_entries.reset_index(drop=True)
+                else:
+                    self._frame = pd.concat([current, new_entries], ignore_index=True)
+                self._indexes.extend(self._frame)
+                self._republish(len(current))
+                self._undo.record("merge", Truncate(added))
+                HISTORY_MUTATIONS.labels("merge").inc()
+            logger.info("Merged history: %d new, %d duplicate entries", added, len(history) - added)
+
+            if added:
+                self._try_save_history_to_env()
+        return added, len(history) - added
+
+    def entries_between(self, start: Optional[int] = None, end: Optional[int] = None) -> "pd.DataFrame":
+        """
+        Get the entries timestamped in a time window.
+
+        The window is found by binary search over the timestamps, so only
+        the entries inside it are read.
+
+        Args:
+            start: Window start in nanoseconds since the epoch (inclusive),
+                or None for no lower bound
+            end: Window end in nanoseconds since the epoch (exclusive), or
+                None for no upper bound
 
-        # Try to save history if environment variable is set
-        self._try_save_history_to_env()
+        Returns:
+            A copy of the entries in the window, in history order
+        """
+        with self._lock:
+            history = self._history
+            timestamps = history[TIMESTAMP_COLUMN].to_numpy(dtype="int64")
+            positions = self._indexes.time_index(timestamps).positions(timestamps, start, end)
+            return history.iloc[positions].copy()
 
     def clear_history(self) -> None:
         """Clear the history."""
-        self._history = pd.DataFrame(columns=["operation", "expression", "result"])
-        logger.info("Cleared history")
-
-        # Try to save empty history if environment variable is set
-        self._try_save_history_to_env()
+        with self._lock:
+            self._undo.record_replacement("clear", self._history, 0)
+            self._history = _empty_history()
+            self._republish()
+            HISTORY_MUTATIONS.labels("clear").inc()
+            logger.info("Cleared history")
+
+            # Try to save empty history if environment variable is set
+            self._try_save_history_to_env()
 
     def delete_entry(self, index: int) -> bool:
         """
@@ -124,23 +727,88 @@ class HistoryManager:
             True if the entry was deleted, False otherwise
         """
         try:
-            # Check if index is valid
-            if index < 0 or index >= len(self._history):
-                logger.warning(f"Invalid history index: {index}")
-                return False
+            with self._lock:
+                history = self._history
 
-            # Delete the entry
-            self._history = self._history.drop(index).reset_index(drop=True)
-            logger.info(f"Deleted history entry at index {index}")
+                # Check if index is valid
+                if index < 0 or index >= len(history):
+                    logger.warning("Invalid history index: %s", index)
+                    return False
 
-            # Try to save history if environment variable is set
-            self._try_save_history_to_env()
+                # Delete the entry
+                self._undo.record("delete", Insert(index, history.iloc[index:index + 1]))
+                self._frame = history.drop(index).reset_index(drop=True)
+                self._indexes.reset()
+                self._republish()
+                HISTORY_MUTATIONS.labels("delete").inc()
+                logger.info("Deleted history entry at index %d", index)
+
+                # Try to save history if environment variable is set
+                self._try_save_history_to_env()
 
             return True
         except Exception as e:
-            logger.error(f"Error deleting history entry: {str(e)}")
+            logger.error("Error deleting history entry: %s", str(e))
             return False
 
+    def undo(self) -> Optional[str]:
+        """
+        Revert the most recent change to the history that has not been undone.
+
+        Returns:
+            What the change was (``add``, ``merge``, ``delete``, ``clear``,
+            ``set`` or ``load``), or None if there is nothing to undo
+
+        Raises:
+            ValueError: If the change could not be reverted; it stays undoable
+        """
+        return self._apply_inverse(self._undo.pop_undo, self._undo.push_redo, self._undo.push_undo, "undo")
+
+    def redo(self) -> Optional[str]:
+        """
+        Make again the most recently undone change.
+
+        Returns:
+            What the change was, or None if there is nothing to redo
+
+        Raises:
+            ValueError: If the change could not be made; it stays redoable
+        """
+        return self._apply_inverse(self._undo.pop_redo, self._undo.push_undo, self._undo.push_redo, "redo")
+
+    def undo_counts(self) -> Tuple[int, int]:
+        """Return the numbers of changes that can be undone and redone."""
+        return len(self._undo), self._undo.redo_count()
+
+    def clear_undo(self) -> None:
+        """Forget every change that could be undone or redone, deleting their spilled files."""
+        self._undo.clear()
+
+    def _apply_inverse(self, pop, push, put_back, kind: str) -> Optional[str]:
+        """Apply the inverse taken by ``pop`` and ``push`` its own inverse."""
+        with self._lock:
+            change = pop()
+            if change is None:
+                return None
+            label, inverse = change
+            current = self._history
+            try:
+                history, reverse, unchanged = inverse.apply(current, self._undo)
+            except (OSError, ValueError, IndexError) as e:
+                put_back(label, inverse)
+                logger.error("Failed to %s %s: %s", kind, label, str(e))
+                raise ValueError(f"Could not {kind} {label}: {str(e)}")
+            self._frame = history
+            self._indexes.reset()
+            push(label, reverse)
+            # Rows were removed or replaced unless only new ones follow the unchanged ones
+            self._republish(unchanged if unchanged == len(current) else 0)
+            HISTORY_MUTATIONS.labels(kind).inc()
+            logger.info("%s of %s: %d entries", kind.capitalize(), label, len(history))
+
+            self._try_save_history_to_env()
+        return label
+
     def save_history(self, filename: str) -> bool:
         """
         Save the history to a CSV file.
@@ -157,11 +825,12 @@ class HistoryManager:
             if directory and not os.path.exists(directory):
                 os.makedirs(directory)
 
-            self._history.to_csv(filename, index=False)
-            logger.info(f"Saved history to {filename}")
+            with self._lock:
+                self._history.to_csv(filename, index=False)
+            logger.info("Saved history to %s", filename)
             return True
         except Exception as e:
-            logger.error(f"Error saving history: {str(e)}")
+            logger.error("Error saving history: %s", str(e))
             return False
 
     def load_history(self, filename: str) -> bool:
@@ -176,13 +845,15 @@ class HistoryManager:
         """
         try:
             if not os.path.exists(filename):
-                logger.warning(f"History file not found: {filename}")
+                logger.warning("History file not found: %s", filename)
                 return False
 
+            import pandas as pd
+
             history = pd.read_csv(filename)
 
             # Validate the DataFrame has required columns
-            required_columns = ["operation", "expression", "result"]
+            required_columns = HISTORY_COLUMNS
             missing_columns = [
                 col for col in required_columns if col not in history.columns
             ]
@@ -192,19 +863,83 @@ class HistoryManager:
                 )
                 return False
 
-            self._history = history
-            logger.info(f"Loaded history from {filename} with {len(history)} entries")
+            history = _with_timestamps(history)
+            with self._lock:
+                self._undo.record_replacement("load", self._history, len(history))
+                self._history = history
+                self._republish()
+            HISTORY_MUTATIONS.labels("load").inc()
+            logger.info("Loaded history from %s with %d entries", filename, len(history))
             return True
         except Exception as e:
-            logger.error(f"Error loading history: {str(e)}")
+            logger.error("Error loading history: %s", str(e))
             return False
 
+    @traced("HistoryManager._try_save_history_to_env")
     def _try_save_history_to_env(self):
-        """Try to save history to a file specified in the environment variable."""
-        history_file = os.getenv("HISTORY_FILE", "")
+        """Try to save history to the autosave file, if there is one."""
+        history_file = self.autosave_file()
         if history_file:
-            try:
-                self.save_history(history_file)
-                logger.debug(f"Auto-saved history to {history_file}")
-            except Exception as e:
-                logger.error(f"Failed to auto-save history to {history_file}: {str(e)}")
+            buffer = self._buffers.current()
+            if buffer.batch_depth:
+                buffer.autosave_pending = True
+                return
+            mode = "append" if self._appended is not None else "rewrite"
+            start = time.perf_counter()
+            if self._appended is not None:
+                saved = self._append_new_entries(history_file)
+            else:
+                try:
+                    saved = self.save_history(history_file)
+                    logger.debug("Auto-saved history to %s", history_file)
+                except Exception as e:
+                    saved = False
+                    logger.error("Failed to auto-save history to %s: %s", history_file, str(e))
+            AUTOSAVE_SECONDS.labels(mode).observe(time.perf_counter() - start)
+            if not saved:
+                AUTOSAVE_FAILURES.labels(mode).inc()
+
+    def _append_new_entries(self, filename: str) -> bool:
+        """
+        Append the entries added since the last append to a CSV file.
+
+        Returns:
+            False if the file could not be written
+        """
+        try:
+            with self._lock:
+                progress = self._appended
+                rows = sorted(
+                    (row for row in progress.unappended + self._buffers.peek() if row[0] > progress.sequence),
+                    key=lambda row: row[0],
+                )
+                progress.unappended = []
+                if not rows:
+                    return True
+
+                directory = os.path.dirname(filename)
+                if directory and not os.path.exists(directory):
+                    os.makedirs(directory)
+                write_header = not os.path.exists(filename) or os.path.getsize(filename) == 0
+                columns = HISTORY_COLUMNS + [TIMESTAMP_COLUMN]
+                if not write_header:
+                    # Keep to the columns of a file written before timestamps were recorded
+                    with open(filename, newline="", encoding="utf-8") as f:
+                        columns = next(csv.reader(f), columns)
+                width = 4 if TIMESTAMP_COLUMN in columns else 3
+                with open(filename, "a", newline="", encoding="utf-8") as f:
+                    writer = csv.writer(f, lineterminator="\n")
+                    if write_header:
+                        writer.writerow(columns)
+                    writer.writerows(row[1:1 + width] for row in rows)
+                progress.sequence = rows[-1][0]
+            logger.debug("Appended %d history entries to %s", len(rows), filename)
+            return True
+        except OSError as e:
+            logger.error("Failed to append history to %s: %s", filename, str(e))
+            return False
+
+
+REGISTRY.gauge("calculator_history_entries", "Entries in the calculation history").set_function(
+    lambda: None if HistoryManager._instance is None else HistoryManager._instance.entry_count()
+)
@@ -0,0 +1,169 @@
+# app/history_namespaces.py
+"""
+Named history namespaces, one per session.
+
+Each namespace is an independent ``HistoryManager`` whose history is
+autosaved to ``<HISTORY_NAMESPACE_DIR>/<name>.csv`` (default directory
+``history``). The ``default`` namespace is the ``HistoryManager`` singleton
+and keeps its ``HISTORY_FILE`` behaviour.
+
+To bound memory, at most ``HISTORY_MAX_NAMESPACES`` (default 16) other
+namespaces are kept in memory. When another one is opened, the least
+recently used is saved to its file and dropped; it is loaded back from the
+file the next time it is used, by a new ``HistoryManager``, and its undo and
+redo steps are lost. Code bound to a namespace must therefore look its
+manager up on every use (as ``Calculator.history_manager`` does) rather than
+keep a reference to it: changes made through an evicted manager are not seen
+by the new one, and the two overwrite each other's file.
+"""
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+from app.history_manager import DEFAULT_NAMESPACE, HistoryManager
+from app.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["DEFAULT_NAMESPACE", "HistoryNamespaces", "get_namespaces", "validate_namespace"]
+
+DEFAULT_NAMESPACE_DIR = "history"
+DEFAULT_MAX_NAMESPACES = 16
+
+_VALID_NAME = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+NAMESPACE_EVICTIONS = REGISTRY.counter(
+    "calculator_history_namespace_evictions_total", "History namespaces saved to disk and dropped from memory"
+)
+
+
+def validate_namespace(namespace: str) -> str:
+    """
+    Check that a namespace name is safe to use as a file name.
+
+    Returns:
+        The name
+
+    Raises:
+        ValueError: If the name is not 1-64 letters, digits, ``_``, ``.`` or ``-``
+    """
+    if not _VALID_NAME.match(namespace) or namespace in (".", ".."):
+        raise ValueError(f"Invalid history namespace: {namespace!r}")
+    return namespace
+
+
+class HistoryNamespaces:
+    """An LRU-bounded set of named history namespaces backed by CSV files."""
+
+    # The process-wide namespaces (see get_namespaces)
+    _instance = None
+
+    def __init__(self, directory: Optional[str] = None, max_live: Optional[int] = None):
+        """
+        Args:
+            directory: Where namespace files live (``HISTORY_NAMESPACE_DIR`` by default)
+            max_live: Namespaces kept in memory besides the default one
+                (``HISTORY_MAX_NAMESPACES`` by default)
+        """
+        if directory is None:
+            directory = os.getenv("HISTORY_NAMESPACE_DIR", DEFAULT_NAMESPACE_DIR)
+        if max_live is None:
+            max_live = int(os.getenv("HISTORY_MAX_NAMESPACES", str(DEFAULT_MAX_NAMESPACES)))
+        if max_live < 1:
+            raise ValueError("max_live must be at least 1")
+        self.directory = directory
+        self.max_live = max_live
+        self._lock = threading.Lock()
+        self._live: "OrderedDict[str, HistoryManager]" = OrderedDict()
+
+    def path(self, namespace: str) -> str:
+        """
+        Return the CSV file of a namespace.
+
+        Raises:
+            ValueError: If the name is invalid (see ``validate_namespace``)
+        """
+        return os.path.join(self.directory, f"{validate_namespace(namespace)}.csv")
+
+    def get(self, namespace: str = DEFAULT_NAMESPACE) -> HistoryManager:
+        """
+        Return the history of a namespace, loading it from disk if needed.
+
+        Args:
+            namespace: The namespace name
+
+        Returns:
+            The namespace's HistoryManager
+
+        Raises:
+            ValueError: If the name is invalid
+        """
+        if namespace == DEFAULT_NAMESPACE:
+            return HistoryManager()
+        with self._lock:
+            manager = self._live.get(namespace)
+            if manager is not None:
+                self._live.move_to_end(namespace)
+                return manager
+            manager = HistoryManager.create(namespace, self.path(namespace))
+            self._live[namespace] = manager
+            while len(self._live) > self.max_live:
+                if not self._evict(next(iter(self._live))):
+                    break
+            return manager
+
+    def _evict(self, namespace: str) -> bool:
+        """
+        Save a namespace to its file and drop it from memory.
+
+        Must be called with ``self._lock`` held. A namespace that cannot be
+        saved stays in memory, over the limit, rather than lose its history.
+
+        Returns:
+            True if the namespace was evicted
+        """
+        manager = self._live[namespace]
+        if not manager.save_history(manager.history_file):
+            logger.error("Failed to evict history namespace %s; keeping it in memory", namespace)
+            return False
+        undo, redo = manager.undo_counts()
+        if undo or redo:
+            logger.warning(
+                "Evicting history namespace %s discards %d undo and %d redo steps", namespace, undo, redo
+            )
+        manager.clear_undo()
+        del self._live[namespace]
+        NAMESPACE_EVICTIONS.inc()
+        logger.info("Evicted history namespace %s to %s", namespace, manager.history_file)
+        return True
+
+    def live(self) -> List[str]:
+        """Return the names of the namespaces in memory, least recently used first."""
+        with self._lock:
+            return list(self._live)
+
+    def close(self) -> None:
+        """Save and drop every namespace in memory (except those that fail to save)."""
+        with self._lock:
+            for namespace in list(self._live):
+                self._evict(namespace)
+
+
+_namespaces_lock = threading.Lock()
+
+
+def get_namespaces() -> HistoryNamespaces:
+    """Return the process-wide namespaces, configured from the environment on first use."""
+    if HistoryNamespaces._instance is None:
+        with _namespaces_lock:
+            if HistoryNamespaces._instance is None:
+                HistoryNamespaces._instance = HistoryNamespaces()
+    return HistoryNamespaces._instance
+
+
+REGISTRY.gauge("calculator_history_namespaces_live", "History namespaces held in memory").set_function(
+    lambda: None if HistoryNamespaces._instance is None else len(HistoryNamespaces._instance._live)
+)
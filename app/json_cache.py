@@ -0,0 +1,33 @@
+"""Small JSON cache files that are safe to lose or find corrupted."""
+import json
+import logging
+import os
+import tempfile
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["read_json_cache", "write_json_cache"]
+
+
+def read_json_cache(path: str) -> Optional[Dict[str, Any]]:
+    """Read a JSON cache file, or return None if it is missing or unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json_cache(path: str, data: Dict[str, Any]) -> None:
+    """Atomically write a JSON cache file; failures only cost a rebuild next time."""
+    try:
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(temp_path, path)
+        logger.debug("Wrote cache %s", path)
+    except OSError as e:
+        logger.warning("Could not write cache %s: %s", path, str(e))
@@ -0,0 +1,235 @@
+# app/logging_config.py
+"""
+Logging configuration from ``logging.yaml`` and ``.env``.
+
+``configure_logging`` applies the YAML configuration, with ``${VAR}``
+references expanded from the environment, once per process. Parsing the two
+files needs PyYAML and python-dotenv, which are slow to import compared with
+the rest of startup, so their parsed contents are cached as JSON in
+``LOGGING_CONFIG_CACHE`` (default ``.cache/logging_config.json``) together
+with the size and modification time of each file. As long as neither file
+changes, startup reads the cache and imports neither library. Every
+``.env`` value is applied to the environment (like ``load_dotenv``), not only
+those the configuration references, so the cache holds them all.
+
+With ``async: true`` in ``logging.yaml`` (set from ``LOG_ASYNC`` in the
+environment or ``.env``) every configured handler is moved behind a
+``QueueHandler``: the logging call only enqueues the record, and a
+``QueueListener`` thread formats it and does all the file I/O, including
+rotation checks. ``stop_async_logging`` (also run at exit) drains the queue.
+"""
+import atexit
+import logging
+import logging.config
+import logging.handlers
+import os
+import queue
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.json_cache import read_json_cache, write_json_cache
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["configure_logging", "expand_env_vars", "load_config_files", "stop_async_logging"]
+
+CACHE_VERSION = 3
+DEFAULT_CONFIG_FILE = "logging.yaml"
+DEFAULT_ENV_FILE = ".env"
+DEFAULT_CACHE_FILE = os.path.join(".cache", "logging_config.json")
+
+_TRUE_VALUES = ("1", "true", "yes", "on")
+_ENV_REFERENCE = re.compile(r"\$\{(\w+)\}")
+
+# Set once logging is configured
+_configured = threading.Event()
+_configure_lock = threading.Lock()
+# Running listeners, with the loggers and handlers they replaced
+_queue_listeners: List[Tuple[logging.handlers.QueueListener, List[logging.Logger], list]] = []
+# Set once stop_async_logging is registered to run at exit
+_atexit_registered = threading.Event()
+
+
+def expand_env_vars(config):
+    """Recursively expand environment variables in the logging config."""
+    if isinstance(config, dict):
+        return {key: expand_env_vars(value) for key, value in config.items()}
+    elif isinstance(config, list):
+        return [expand_env_vars(item) for item in config]
+    elif isinstance(config, str):
+        # Replace ${VAR} with os.getenv(VAR, VAR) to use defaults if not set
+        return _ENV_REFERENCE.sub(
+            lambda match: os.getenv(match.group(1), match.group(0)),
+            config,
+        )
+    else:
+        return config
+
+
+class _ThreadQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler for a listener thread in the same process.
+
+    Unlike ``QueueHandler`` it does not format records before queuing them,
+    so merging the message with its arguments and rendering tracebacks also
+    happen on the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _is_enabled(value: Any) -> bool:
+    """Interpret a boolean config value that may come from an environment variable."""
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in _TRUE_VALUES
+
+
+def _start_async_logging(logger_names: List[str]) -> None:
+    """
+    Move the handlers of the root logger and ``logger_names`` behind queues.
+
+    Loggers that share the same handlers share one queue and listener thread.
+    """
+    groups: Dict[tuple, List[logging.Logger]] = {}
+    for target in [logging.getLogger()] + [logging.getLogger(name) for name in logger_names]:
+        if target.handlers:
+            groups.setdefault(tuple(target.handlers), []).append(target)
+
+    for handlers, targets in groups.items():
+        records = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+        queue_handler = _ThreadQueueHandler(records)
+        for target in targets:
+            target.handlers = [queue_handler]
+        listener.start()
+        _queue_listeners.append((listener, targets, list(handlers)))
+
+    if not _atexit_registered.is_set():
+        atexit.register(stop_async_logging)
+        _atexit_registered.set()
+
+
+def stop_async_logging() -> None:
+    """Flush queued records, stop the listener threads and reattach their handlers."""
+    while _queue_listeners:
+        listener, targets, handlers = _queue_listeners.pop()
+        listener.stop()
+        for target in targets:
+            target.handlers = list(handlers)
+
+
+def _file_key(path: str) -> Optional[list]:
+    """Return ``[size, mtime_ns]`` of a file, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def load_config_files(
+    config_file: str = DEFAULT_CONFIG_FILE,
+    env_file: str = DEFAULT_ENV_FILE,
+    cache_file: Optional[str] = None,
+) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Parse the logging configuration and ``.env`` file, using the cache when valid.
+
+    Args:
+        config_file: The YAML logging configuration
+        env_file: The dotenv file
+        cache_file: Where to cache the parsed files (``LOGGING_CONFIG_CACHE``
+            environment variable by default)
+
+    Returns:
+        The unexpanded logging configuration and the ``.env`` values
+    """
+    cache_file = cache_file or os.getenv("LOGGING_CONFIG_CACHE", DEFAULT_CACHE_FILE)
+    key = {"config": _file_key(config_file), "env": _file_key(env_file)}
+    cached = read_json_cache(cache_file)
+    if (
+        cached
+        and cached.get("version") == CACHE_VERSION
+        and cached.get("files") == [config_file, env_file]
+        and cached.get("key") == key
+    ):
+        return cached["config"], cached["env"]
+
+    import yaml
+    from dotenv import dotenv_values
+
+    with open(config_file, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    env = {}
+    if key["env"] is not None:
+        env = {name: value for name, value in dotenv_values(env_file).items() if value is not None}
+
+    write_json_cache(
+        cache_file,
+        {
+            "version": CACHE_VERSION,
+            "files": [config_file, env_file],
+            "key": key,
+            "config": config,
+            "env": env,
+        },
+    )
+    return config, env
+
+
+def configure_logging(
+    config_file: str = DEFAULT_CONFIG_FILE,
+    env_file: str = DEFAULT_ENV_FILE,
+    force: bool = False,
+) -> bool:
+    """
+    Configure logging using YAML configuration with expanded environment variables.
+
+    Handlers are moved to a background thread if the configuration sets
+    ``async`` (see the module docstring).
+
+    Args:
+        config_file: The YAML logging configuration
+        env_file: The dotenv file; its values are applied, never overriding
+            the environment
+        force: Configure again even if logging was already configured
+
+    Returns:
+        True if logging was configured by this call, False if it already was
+    """
+    with _configure_lock:
+        if _configured.is_set() and not force:
+            return False
+
+        stop_async_logging()
+        config, env = load_config_files(config_file, env_file)
+
+        # Load environment variables (like load_dotenv, without overriding)
+        for name, value in env.items():
+            os.environ.setdefault(name, value)
+
+        # Ensure logs directory exists
+        if not os.path.exists("logs"):
+            os.makedirs("logs")
+
+        config = expand_env_vars(config)
+        use_async = _is_enabled(config.pop("async", False))
+
+        # Convert numeric values explicitly
+        for handler in config.get("handlers", {}).values():
+            if "maxBytes" in handler:
+                handler["maxBytes"] = int(handler["maxBytes"])
+            if "backupCount" in handler:
+                handler["backupCount"] = int(handler["backupCount"])
+
+        # Configure logging
+        logging.config.dictConfig(config)
+        if use_async:
+            _start_async_logging(list(config.get("loggers", {})))
+        _configured.set()
+
+    logger.info("Logging configured from YAML file%s", " (async)" if use_async else "")
+    return True
@@ -0,0 +1,396 @@
+# app/metrics.py
+"""
+Runtime metrics: counters, gauges and fixed-bucket latency histograms.
+
+Metrics are registered once, at import time of the module they instrument,
+in the process-wide ``REGISTRY``. Updating one costs a dictionary lookup and
+a short critical section, so they can sit on the calculation hot path.
+Gauges can also be computed from a callback when metrics are collected,
+which suits values such as the history length or the process memory.
+
+The registry renders the Prometheus text exposition format. It is shown by
+the ``metrics`` command and, when ``METRICS_FILE`` is set, written to that
+file every ``METRICS_INTERVAL`` seconds (default 15) by
+``MetricsFileExporter``, for example for the node exporter's textfile
+collector.
+"""
+import bisect
+import logging
+import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["REGISTRY", "MetricsFileExporter", "MetricsRegistry", "process_memory_bytes"]
+
+# Latency buckets in seconds, from 100 microseconds to 10 seconds
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+DEFAULT_METRICS_INTERVAL = 15.0
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [
+        '%s="%s"' % (name, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _CounterValue:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increase the counter by ``amount``."""
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeValue:
+    __slots__ = ("_lock", "_value", "_function")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0.0
+        self._function = None
+
+    def set(self, value: float) -> None:
+        """Set the gauge."""
+        self._value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increase the gauge by ``amount``."""
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        """Decrease the gauge by ``amount``."""
+        self.inc(-amount)
+
+    def set_function(self, function: Callable[[], Optional[float]]) -> None:
+        """Compute the gauge with ``function`` whenever metrics are collected."""
+        self._function = function
+
+    @property
+    def value(self) -> Optional[float]:
+        if self._function is not None:
+            try:
+                return self._function()
+            except Exception as e:
+                logger.debug("Gauge callback failed: %s", str(e))
+                return None
+        return self._value
+
+
+class _HistogramValue:
+    __slots__ = ("_lock", "buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self._lock = threading.Lock()
+        self.buckets = buckets
+        # One count per bucket plus the +Inf overflow bucket (not cumulative)
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe the duration of the ``with`` block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class _Metric(ABC):
+    """A named metric and its children, one per combination of label values."""
+
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), **options):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._options = options
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if not self.labelnames:
+            self._default = self.labels()
+
+    @abstractmethod
+    def _new_child(self):
+        """Return the value of a new child, for one combination of label values."""
+
+    def labels(self, *values, **labels):
+        """
+        Return the child metric for one combination of label values.
+
+        Raises:
+            ValueError: If the label names do not match the metric's
+        """
+        if not labels:
+            # Fast path for label values that are already strings
+            child = self._children.get(values)
+            if child is not None:
+                return child
+        if labels:
+            if values or set(labels) != set(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {', '.join(self.labelnames)}")
+            values = tuple(str(labels[name]) for name in self.labelnames)
+        else:
+            values = tuple(str(value) for value in values)
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {', '.join(self.labelnames)}")
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def children(self) -> List[Tuple[Tuple[str, ...], object]]:
+        """Return ``(label values, child)`` pairs in a stable order."""
+        with self._lock:
+            return sorted(self._children.items())
+
+    def __getattr__(self, attribute):
+        # Unlabelled metrics forward inc/set/observe/... to their only child
+        if attribute != "_default" and "_default" in self.__dict__:
+            return getattr(self._default, attribute)
+        raise AttributeError(attribute)
+
+    def render(self) -> List[str]:
+        """Render the metric in the Prometheus text exposition format."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self.children():
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values, child) -> List[str]:
+        value = child.value
+        if value is None:
+            return []
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterValue()
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeValue()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def _new_child(self):
+        return _HistogramValue(self._options.get("buckets") or DEFAULT_BUCKETS)
+
+    def _render_child(self, values, child) -> List[str]:
+        with child._lock:
+            counts, total, count = list(child.counts), child.sum, child.count
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(child.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.labelnames, values, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """A set of uniquely named metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric_class, name: str, help_text: str, labelnames, **options) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(name)
+            if existing is not None:
+                # Re-registration, e.g. when a plugin module is reloaded
+                if not isinstance(existing, metric_class) or existing.labelnames != tuple(labelnames):
+                    raise ValueError(f"Metric {name} is already registered differently")
+                return existing
+            metric = metric_class(name, help_text, labelnames, **options)
+            self._metrics[name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Register (or return the existing) counter."""
+        return self._register(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Register (or return the existing) gauge."""
+        return self._register(Gauge, name, help_text, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Optional[Sequence[float]] = None,
+    ) -> Histogram:
+        """Register (or return the existing) histogram with fixed ``buckets`` in seconds."""
+        return self._register(
+            Histogram, name, help_text, labelnames, buckets=tuple(sorted(buckets)) if buckets else None
+        )
+
+    def get(self, name: str) -> Optional[_Metric]:
+        """Return a registered metric by name."""
+        return self._metrics.get(name)
+
+    def render(self, prefix: str = "") -> str:
+        """
+        Render metrics in the Prometheus text exposition format.
+
+        Args:
+            prefix: Only render metrics whose name starts with this
+
+        Returns:
+            The exposition text, ending with a newline
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        lines = []
+        for name, metric in metrics:
+            if name.startswith(prefix):
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def process_memory_bytes() -> Optional[float]:
+    """Return the resident memory of this process in bytes, if it can be read."""
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as f:
+            return float(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE"))
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Peak rather than current usage; kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return float(peak if os.uname().sysname == "Darwin" else peak * 1024)
+
+
+class MetricsFileExporter:
+    """Periodically writes a registry to a file in the Prometheus text format."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        interval: Optional[float] = None,
+        registry: Optional[MetricsRegistry] = None,
+    ):
+        """
+        Args:
+            path: The file to write (``METRICS_FILE`` by default)
+            interval: Seconds between writes (``METRICS_INTERVAL`` by default)
+            registry: The metrics to write (``REGISTRY`` by default)
+        """
+        self.path = path or os.getenv("METRICS_FILE", "")
+        if interval is None:
+            interval = float(os.getenv("METRICS_INTERVAL", str(DEFAULT_METRICS_INTERVAL)))
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.interval = interval
+        self.registry = registry or REGISTRY
+        self._thread = None
+        self._stop = threading.Event()
+
+    def write(self) -> bool:
+        """
+        Atomically replace the file with the current metrics.
+
+        Returns:
+            True if the file was written
+        """
+        try:
+            directory = os.path.dirname(self.path) or "."
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        except OSError as e:
+            logger.error("Failed to write metrics to %s: %s", self.path, str(e))
+            return False
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.registry.render())
+            os.replace(temp_path, self.path)
+            return True
+        except OSError as e:
+            logger.error("Failed to write metrics to %s: %s", self.path, str(e))
+            # Do not leave the partial file behind
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return False
+
+    def start(self) -> None:
+        """Start writing the file from a background thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-exporter", daemon=True)
+        self._thread.start()
+        logger.info("Writing metrics to %s every %s seconds", self.path, self.interval)
+
+    def stop(self) -> None:
+        """Stop the background thread and write the file a last time."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.write()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.write()
+
+
+REGISTRY = MetricsRegistry()
+
+REGISTRY.gauge(
+    "calculator_process_resident_memory_bytes", "Resident memory of the calculator process"
+).set_function(process_memory_bytes)
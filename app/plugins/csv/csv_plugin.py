@@ -4,7 +4,6 @@ import logging
 import os
 from pathlib import Path
 
-import pandas as pd
 from app.commands.base import Command
 from app.history_manager import HistoryManager
 
@@ -12,6 +11,13 @@ logger = logging.getLogger(__name__)
 file_dir = os.path.dirname(__file__)
 
 
+def _history_manager(command: Command) -> HistoryManager:
+    """Return the history of the command's calculator namespace."""
+    if command.calculator is not None:
+        return command.calculator.history_manager
+    return HistoryManager()
+
+
 class ExportCSVCommand(Command):
     """Command to export calculation history to a CSV file."""
 
@@ -30,7 +36,7 @@ class ExportCSVCommand(Command):
         data_dir = os.path.join(file_dir, "..", "Data")
         filename = os.path.join(data_dir, filename)
 
-        history_manager = HistoryManager()
+        history_manager = _history_manager(self)
         history = history_manager.get_history()
 
         if history.empty:
@@ -52,9 +58,14 @@ class ImportCSVCommand(Command):
     """Command to import calculation history from a CSV file."""
 
     name = "import_csv"
-    help = "Import calculation history from a CSV file (import_csv <filename>)"
+    help = (
+        "Import calculation history from a CSV file, replacing it or, with --merge, "
+        "adding only new entries (import_csv <filename> [--merge])"
+    )
 
     def execute(self, *args) -> str:
+        merge = "--merge" in args
+        args = [arg for arg in args if arg != "--merge"]
         if not args:
             return "Error: Please provide a filename to import"
 
@@ -66,6 +77,8 @@ class ImportCSVCommand(Command):
             return f"Error: File {filename} does not exist"
 
         try:
+            import pandas as pd
+
             data = pd.read_csv(filename)
             required_columns = ["operation", "expression", "result"]
 
@@ -76,7 +89,15 @@ class ImportCSVCommand(Command):
             if missing_columns:
                 return f"Error: CSV is missing required columns: {', '.join(missing_columns)}"
 
-            history_manager = HistoryManager()
+            history_manager = _history_manager(self)
+            if merge:
+                added, duplicates = history_manager.merge_history(data)
+                logger.info("Merged history from %s", filename)
+                return (
+                    f"History merged from {filename}: {added} new, "
+                    f"{duplicates} duplicate records"
+                )
+
             # Clear existing history and load the new one
             history_manager.set_history(data)
 
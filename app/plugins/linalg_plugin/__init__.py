@@ -0,0 +1,12 @@
+from .linalg_commands import (
+    ArrayCommand,
+    DotCommand,
+    MatmulCommand,
+    NormCommand,
+    SolveCommand,
+    TransposeCommand,
+    VectorAddCommand,
+    VectorDivideCommand,
+    VectorMultiplyCommand,
+    VectorSubtractCommand,
+)
@@ -0,0 +1,159 @@
+"""
+Named NumPy arrays kept in memory between commands.
+
+Operands of the linear algebra commands are resolved by ``ArrayStore.resolve``:
+
+* the name of a stored array (see the ``array`` command)
+* an inline JSON array without spaces, e.g. ``[1,2,3]`` or ``[[1,2],[3,4]]``
+* a ``.npy`` file, memory-mapped read-only rather than read into memory
+* a ``.csv`` file of numbers, parsed once and cached until it changes
+* a number
+
+Stored arrays and loaded files stay resident for the life of the process, so
+repeated commands on the same operands never reload them.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Arrays with more elements are shown as a summary instead of in full
+MAX_DISPLAY_SIZE = 100
+# Inline operands longer than this are labelled "inline" in the history
+MAX_LABEL_LENGTH = 32
+
+_VALID_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def checksum(array: np.ndarray) -> str:
+    """Return the CRC-32 of an array's data in C order, as 8 hex digits."""
+    return f"{zlib.crc32(np.ascontiguousarray(array).data) & 0xFFFFFFFF:08x}"
+
+
+def summarize(array: np.ndarray) -> str:
+    """Return a compact description of an array: shape, dtype and checksum."""
+    return f"ndarray(shape={array.shape}, dtype={array.dtype}, crc32={checksum(array)})"
+
+
+def format_array(array: np.ndarray) -> str:
+    """Format a result for display: scalars and small arrays in full, others summarized."""
+    if array.ndim == 0:
+        return str(array.item())
+    if array.size <= MAX_DISPLAY_SIZE:
+        return np.array2string(array, separator=", ")
+    return summarize(array)
+
+
+def history_result(array: np.ndarray) -> str:
+    """Return what the history records for a result: a scalar's value, else a summary."""
+    return str(array.item()) if array.ndim == 0 else summarize(array)
+
+
+class ArrayStore:
+    """Named arrays, and arrays loaded from files, resident between commands."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._arrays: Dict[str, np.ndarray] = {}
+        # Absolute path -> (modification time, size, array)
+        self._files: Dict[str, Tuple[int, int, np.ndarray]] = {}
+
+    def names(self) -> List[str]:
+        """Return the names of the stored arrays, sorted."""
+        with self._lock:
+            return sorted(self._arrays)
+
+    def get(self, name: str) -> Optional[np.ndarray]:
+        """Return a stored array, or None."""
+        with self._lock:
+            return self._arrays.get(name)
+
+    def put(self, name: str, array: np.ndarray) -> None:
+        """
+        Store an array under a name, replacing any array of that name.
+
+        Raises:
+            ValueError: If the name is not an identifier
+        """
+        if not _VALID_NAME.match(name):
+            raise ValueError(f"Invalid array name: {name!r}")
+        with self._lock:
+            self._arrays[name] = array
+        logger.debug("Stored array %s: %s", name, summarize(array))
+
+    def drop(self, name: str) -> bool:
+        """Forget a stored array; return whether it existed."""
+        with self._lock:
+            return self._arrays.pop(name, None) is not None
+
+    def load_file(self, path: str) -> np.ndarray:
+        """
+        Load a ``.npy`` (memory-mapped) or ``.csv`` file, reusing it while unchanged.
+
+        Raises:
+            OSError: If the file cannot be read
+            ValueError: If it does not hold a numeric array
+        """
+        key = os.path.abspath(path)
+        stat = os.stat(key)
+        with self._lock:
+            cached = self._files.get(key)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+
+        if key.endswith(".npy"):
+            array = np.load(key, mmap_mode="r", allow_pickle=False)
+            if not np.issubdtype(array.dtype, np.number):
+                raise ValueError(f"{path} does not hold a numeric array")
+        else:
+            array = np.loadtxt(key, delimiter=",", ndmin=1, dtype=np.float64)
+            array.flags.writeable = False
+        with self._lock:
+            self._files[key] = (stat.st_mtime_ns, stat.st_size, array)
+        logger.info("Loaded %s: %s", path, summarize(array))
+        return array
+
+    def resolve(self, operand: str) -> Tuple[np.ndarray, str]:
+        """
+        Resolve an operand (see the module docstring).
+
+        Returns:
+            The array and a short label for it (for the history)
+
+        Raises:
+            ValueError: If the operand is none of the supported forms, or a
+                file cannot be loaded
+        """
+        array = self.get(operand)
+        if array is not None:
+            return array, operand
+        if operand.startswith("["):
+            try:
+                array = np.asarray(json.loads(operand), dtype=np.float64)
+            except (ValueError, TypeError) as e:
+                raise ValueError(f"Invalid inline array {operand}: {str(e)}") from None
+            return array, operand if len(operand) <= MAX_LABEL_LENGTH else "inline"
+        if operand.endswith((".npy", ".csv")):
+            try:
+                return self.load_file(operand), os.path.basename(operand)
+            except OSError as e:
+                raise ValueError(f"Could not load {operand}: {str(e)}") from None
+        try:
+            return np.asarray(float(operand)), operand
+        except ValueError:
+            raise ValueError(f"Unknown array: {operand}") from None
+
+
+_store = ArrayStore()
+
+
+def get_store() -> ArrayStore:
+    """Return the process-wide array store."""
+    return _store
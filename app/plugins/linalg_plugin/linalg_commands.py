@@ -0,0 +1,220 @@
+"""Vector and matrix commands backed by NumPy."""
+
+import logging
+from abc import abstractmethod
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.commands.base import Command
+from app.plugins.linalg_plugin.arrays import ArrayStore, format_array, get_store, history_result, summarize
+
+logger = logging.getLogger(__name__)
+
+OPERANDS_HELP = "operands: array names, [1,2,3], .npy/.csv files or numbers; --as NAME keeps the result"
+
+
+def _split_target(args: Tuple[str, ...]) -> Tuple[List[str], Optional[str]]:
+    """Separate a trailing ``--as NAME`` from the other arguments."""
+    args = list(args)
+    if "--as" not in args:
+        return args, None
+    position = args.index("--as")
+    if position != len(args) - 2:
+        raise ValueError("--as must be followed by a name and come last")
+    return args[:position], args[position + 1]
+
+
+class ArrayOperationCommand(Command):
+    """
+    Base class of the commands applying a NumPy function to array operands.
+
+    The result is shown in full when small and summarized otherwise, and
+    the history records its shape, dtype and checksum rather than its data.
+    """
+
+    reads_history = False
+    # Names of the required operands, then of the optional parameters
+    operands: Tuple[str, ...] = ("a", "b")
+    parameters: Tuple[str, ...] = ()
+    symbol = ""
+
+    @abstractmethod
+    def apply(self, *arrays: np.ndarray, **parameters: str) -> np.ndarray:
+        """
+        Compute the result.
+
+        Args:
+            *arrays: The resolved operands, one per name in ``operands``
+            **parameters: The optional parameters given, by name
+
+        Returns:
+            The result array
+        """
+
+    def expression(self, labels: List[str]) -> str:
+        if self.symbol and len(labels) == 2:
+            return f"{labels[0]} {self.symbol} {labels[1]}"
+        return f"{self.name}({', '.join(labels)})"
+
+    def execute(self, *args) -> str:
+        try:
+            args, target = _split_target(args)
+            count = len(self.operands)
+            if not count <= len(args) <= count + len(self.parameters):
+                usage = " ".join(list(self.operands) + [f"[{name}]" for name in self.parameters])
+                return f"Error: Usage: {self.name} {usage} [--as NAME]"
+
+            store = get_store()
+            resolved = [store.resolve(arg) for arg in args[:count]]
+            parameters = dict(zip(self.parameters, args[count:]))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                result = np.asarray(self.apply(*(array for array, _ in resolved), **parameters))
+            if target is not None:
+                store.put(target, result)
+        except (ValueError, np.linalg.LinAlgError) as e:
+            logger.error("%s failed: %s", self.name, str(e))
+            return f"Error: {str(e)}"
+
+        labels = [label for _, label in resolved] + list(parameters.values())
+        if self.calculator is not None:
+            self.calculator.history_manager.add_entry(self.name, self.expression(labels), history_result(result))
+        logger.debug("%s -> %s", self.expression(labels), summarize(result))
+        if target is not None:
+            return f"Result: {target} = {format_array(result)}"
+        return f"Result: {format_array(result)}"
+
+
+class DotCommand(ArrayOperationCommand):
+    name = "dot"
+    help = f"Dot product of two arrays (dot <a> <b>; {OPERANDS_HELP})"
+
+    def apply(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return np.dot(a, b)
+
+
+class MatmulCommand(ArrayOperationCommand):
+    name = "matmul"
+    help = f"Matrix product of two arrays (matmul <a> <b>; {OPERANDS_HELP})"
+    symbol = "@"
+
+    def apply(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return np.matmul(a, b)
+
+
+class SolveCommand(ArrayOperationCommand):
+    name = "solve"
+    help = f"Solve the linear system a x = b (solve <a> <b>; {OPERANDS_HELP})"
+
+    def apply(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return np.linalg.solve(a, b)
+
+
+class VectorAddCommand(ArrayOperationCommand):
+    name = "vadd"
+    help = f"Elementwise sum of two arrays (vadd <a> <b>; {OPERANDS_HELP})"
+    symbol = "+"
+
+    def apply(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return np.add(a, b)
+
+
+class VectorSubtractCommand(ArrayOperationCommand):
+    name = "vsub"
+    help = f"Elementwise difference of two arrays (vsub <a> <b>; {OPERANDS_HELP})"
+    symbol = "-"
+
+    def apply(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return np.subtract(a, b)
+
+
+class VectorMultiplyCommand(ArrayOperationCommand):
+    name = "vmul"
+    help = f"Elementwise product of two arrays (vmul <a> <b>; {OPERANDS_HELP})"
+    symbol = "*"
+
+    def apply(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return np.multiply(a, b)
+
+
+class VectorDivideCommand(ArrayOperationCommand):
+    name = "vdiv"
+    help = f"Elementwise quotient of two arrays (vdiv <a> <b>; {OPERANDS_HELP})"
+    symbol = "/"
+
+    def apply(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return np.true_divide(a, b)
+
+
+class TransposeCommand(ArrayOperationCommand):
+    name = "transpose"
+    help = f"Transpose of an array (transpose <a>; {OPERANDS_HELP})"
+    operands = ("a",)
+
+    def apply(self, a: np.ndarray) -> np.ndarray:
+        return np.transpose(a)
+
+
+class NormCommand(ArrayOperationCommand):
+    name = "norm"
+    help = f"Norm of an array (norm <a> [fro|nuc|inf|-inf|1|2|...]; {OPERANDS_HELP})"
+    operands = ("a",)
+    parameters = ("order",)
+
+    def apply(self, a: np.ndarray, order: Optional[str] = None) -> np.ndarray:
+        if order is None or order in ("fro", "nuc"):
+            return np.linalg.norm(a, ord=order)
+        try:
+            return np.linalg.norm(a, ord=float(order))
+        except ValueError:
+            raise ValueError(f"Invalid norm order: {order}") from None
+
+
+class ArrayCommand(Command):
+    """Command to manage the named arrays kept between commands."""
+
+    name = "array"
+    help = (
+        "Manage named arrays: array let <name> <operand> (.npy files are memory-mapped), "
+        "array list, array show <name>, array drop <name>"
+    )
+    reads_history = False
+
+    # Method and number of arguments of each action
+    actions = {"list": ("_list", 0), "let": ("_let", 2), "show": ("_show", 1), "drop": ("_drop", 1)}
+
+    def execute(self, *args) -> str:
+        action, args = (args[0].lower(), args[1:]) if args else ("list", ())
+        method, arity = self.actions.get(action, (None, None))
+        if method is None or len(args) != arity:
+            return f"Error: Usage: {self.help}"
+        return getattr(self, method)(get_store(), *args)
+
+    @staticmethod
+    def _list(store: ArrayStore) -> str:
+        names = store.names()
+        if not names:
+            return "No arrays stored"
+        return "\n".join(f"{name}: {summarize(store.get(name))}" for name in names)
+
+    @staticmethod
+    def _let(store: ArrayStore, name: str, operand: str) -> str:
+        try:
+            array, _ = store.resolve(operand)
+            store.put(name, array)
+        except ValueError as e:
+            return f"Error: {str(e)}"
+        return f"{name} = {summarize(array)}"
+
+    @staticmethod
+    def _show(store: ArrayStore, name: str) -> str:
+        array = store.get(name)
+        if array is None:
+            return f"Error: Unknown array: {name}"
+        return f"{name} = {format_array(array)}"
+
+    @staticmethod
+    def _drop(store: ArrayStore, name: str) -> str:
+        if not store.drop(name):
+            return f"Error: Unknown array: {name}"
+        return f"Dropped {name}"
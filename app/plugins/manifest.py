@@ -0,0 +1,357 @@
+"""
+Cached manifests of the commands provided by plugins.
+
+Reading the manifest lets the application list plugin commands (name, help
+text, module path) without importing the plugins themselves. The manifest is
+cached as JSON on disk together with a fingerprint of every source file in the
+plugin packages (path, size and modification time), and is rebuilt, by
+importing the plugins once, whenever that fingerprint changes.
+
+Plugins installed as separate distributions are discovered through the
+``calculator.commands`` entry point group. Their manifest is built from
+distribution metadata alone and cached against the modification times of the
+``sys.path`` directories, so discovery does not rescan every installed
+distribution on each start.
+"""
+import hashlib
+import importlib
+import logging
+import os
+import pkgutil
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from app.json_cache import read_json_cache, write_json_cache
+from app.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["EntryPointManifest", "LazyCommand", "PluginManifest"]
+
+MANIFEST_VERSION = 2
+DEFAULT_MANIFEST_FILE = os.path.join(".cache", "plugin_manifest.json")
+DEFAULT_ENTRY_POINT_CACHE_FILE = os.path.join(".cache", "entry_points.json")
+ENTRY_POINT_GROUP = "calculator.commands"
+
+PLUGIN_IMPORT_SECONDS = REGISTRY.histogram(
+    "calculator_plugin_import_duration_seconds", "Time taken to import a lazily loaded plugin command"
+)
+PLUGIN_IMPORT_FAILURES = REGISTRY.counter(
+    "calculator_plugin_import_failures_total", "Plugin commands that failed to import"
+)
+
+
+class LazyCommand:
+    """
+    Stand-in for a plugin command class that imports it on first use.
+
+    Exposes the metadata recorded in the manifest (``name``, ``help``,
+    ``cpu_bound``, ``timeout``, ``reads_history``) as attributes. Calling it like a class imports
+    the plugin module and instantiates the real command.
+    """
+
+    def __init__(self, name: str, entry: Dict[str, Any]):
+        self.name = name
+        self._help = entry.get("help", "")
+        self.cpu_bound = entry.get("cpu_bound", False)
+        self.timeout = entry.get("timeout")
+        self.reads_history = entry.get("reads_history", True)
+        self.module = entry["module"]
+        self.class_name = entry["class"]
+        self.package = entry.get("package")
+        # Set for commands discovered through entry points
+        self.distribution = entry.get("distribution")
+        self._command_class = None
+
+    def __repr__(self):
+        return f"<LazyCommand {self.name} -> {self.module}.{self.class_name}>"
+
+    @property
+    def help(self) -> str:
+        """Help text of the real command once loaded, otherwise from the manifest."""
+        if self._command_class is not None:
+            return getattr(self._command_class, "help", self._help)
+        return self._help
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the plugin module has been imported."""
+        return self._command_class is not None
+
+    def load(self):
+        """
+        Import the plugin module and return the real command class.
+
+        Raises:
+            ImportError: If the module or class can no longer be found
+        """
+        if self._command_class is None:
+            start = time.perf_counter()
+            try:
+                target = importlib.import_module(self.module)
+                for attribute in self.class_name.split("."):
+                    target = getattr(target, attribute)
+                self._command_class = target
+                PLUGIN_IMPORT_SECONDS.observe(time.perf_counter() - start)
+            except (ImportError, AttributeError) as e:
+                PLUGIN_IMPORT_FAILURES.inc()
+                logger.error("Failed to load plugin command %s: %s", self.name, str(e))
+                raise ImportError(
+                    f"Could not load command '{self.name}' from {self.module}"
+                ) from e
+            logger.debug("Imported plugin command %s from %s", self.name, self.module)
+        return self._command_class
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+
+class PluginManifest:
+    """Builds, caches and reads the command manifest of a plugin package."""
+
+    def __init__(self, package_name: str = "app.plugins", cache_file: Optional[str] = None):
+        """
+        Args:
+            package_name: The package whose subpackages are plugins
+            cache_file: Where to cache the manifest (``PLUGIN_MANIFEST_FILE``
+                environment variable by default)
+        """
+        self.package_name = package_name
+        self.cache_file = cache_file or os.getenv("PLUGIN_MANIFEST_FILE", DEFAULT_MANIFEST_FILE)
+        # File snapshot taken by the last fingerprint, used to detect later changes
+        self.last_snapshot = {}
+
+    def plugin_packages(self) -> List[Dict[str, str]]:
+        """
+        List the plugin subpackages without importing them.
+
+        Returns:
+            One ``{"name": ..., "path": ...}`` dict per plugin package
+        """
+        package = importlib.import_module(self.package_name)
+        packages = []
+        for module_info in pkgutil.iter_modules(package.__path__, package.__name__ + "."):
+            if module_info.ispkg and not module_info.name.endswith("__pycache__"):
+                path = os.path.join(
+                    module_info.module_finder.path, module_info.name.rsplit(".", 1)[-1]
+                )
+                packages.append({"name": module_info.name, "path": path})
+        return packages
+
+    @staticmethod
+    def snapshot(packages: List[Dict[str, str]]) -> Dict[str, Dict[str, List[int]]]:
+        """
+        Record the size and modification time of every plugin source file.
+
+        Args:
+            packages: Result of ``plugin_packages``
+
+        Returns:
+            A mapping of package name to ``{relative path: [size, mtime_ns]}``
+        """
+        snapshot = {}
+        for package in packages:
+            files = {}
+            for root, dirs, filenames in os.walk(package["path"]):
+                dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+                for filename in sorted(filenames):
+                    if not filename.endswith(".py"):
+                        continue
+                    path = os.path.join(root, filename)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    relative = os.path.relpath(path, package["path"])
+                    files[relative] = [stat.st_size, stat.st_mtime_ns]
+            snapshot[package["name"]] = files
+        return snapshot
+
+    def fingerprint(self, packages: Optional[List[Dict[str, str]]] = None) -> str:
+        """
+        Fingerprint the source files of all plugin packages.
+
+        Args:
+            packages: Result of ``plugin_packages`` (computed if omitted)
+
+        Returns:
+            A hex digest that changes whenever a plugin file is added, removed
+            or modified
+        """
+        if packages is None:
+            packages = self.plugin_packages()
+        self.last_snapshot = self.snapshot(packages)
+        digest = hashlib.sha256()
+        for package_name, files in self.last_snapshot.items():
+            digest.update(package_name.encode())
+            for relative, (size, mtime) in files.items():
+                digest.update(f"{relative}:{size}:{mtime}".encode())
+        return digest.hexdigest()
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return the manifest, from the cache when it is still valid.
+
+        Returns:
+            A mapping of command name to ``help``, ``module``, ``class``,
+            ``package``, ``cpu_bound``, ``timeout`` and ``reads_history``
+        """
+        packages = self.plugin_packages()
+        fingerprint = self.fingerprint(packages)
+        cached = read_json_cache(self.cache_file)
+        if (
+            cached
+            and cached.get("version") == MANIFEST_VERSION
+            and cached.get("package") == self.package_name
+            and cached.get("fingerprint") == fingerprint
+        ):
+            logger.debug("Using cached plugin manifest %s", self.cache_file)
+            return cached["commands"]
+
+        logger.info("Rebuilding plugin manifest for %s", self.package_name)
+        commands = self.build(packages)
+        write_json_cache(
+            self.cache_file,
+            {
+                "version": MANIFEST_VERSION,
+                "package": self.package_name,
+                "fingerprint": fingerprint,
+                "commands": commands,
+            },
+        )
+        return commands
+
+    def build(self, packages: Optional[List[Dict[str, str]]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Build the manifest by importing every plugin package.
+
+        Args:
+            packages: Result of ``plugin_packages`` (computed if omitted)
+
+        Returns:
+            The command manifest
+        """
+        from app.plugins.plugin_loader import PluginLoader
+
+        commands = {}
+        for package in packages if packages is not None else self.plugin_packages():
+            try:
+                module = importlib.import_module(package["name"])
+            except ImportError as e:
+                logger.error("Failed to load plugin %s: %s", package["name"], str(e))
+                continue
+            for command_name, command_class in PluginLoader.find_commands(module).items():
+                commands[command_name] = {
+                    "help": getattr(command_class, "help", ""),
+                    "module": command_class.__module__,
+                    "class": command_class.__qualname__,
+                    "package": package["name"],
+                    "cpu_bound": bool(getattr(command_class, "cpu_bound", False)),
+                    "timeout": getattr(command_class, "timeout", None),
+                    "reads_history": bool(getattr(command_class, "reads_history", True)),
+                }
+        return commands
+
+
+class EntryPointManifest:
+    """Discovers and caches plugin commands published as entry points."""
+
+    def __init__(self, group: str = ENTRY_POINT_GROUP, cache_file: Optional[str] = None):
+        """
+        Args:
+            group: The entry point group to read
+            cache_file: Where to cache discovered entry points
+                (``PLUGIN_ENTRY_POINT_CACHE`` environment variable by default)
+        """
+        self.group = group
+        self.cache_file = cache_file or os.getenv(
+            "PLUGIN_ENTRY_POINT_CACHE", DEFAULT_ENTRY_POINT_CACHE_FILE
+        )
+
+    @staticmethod
+    def fingerprint() -> str:
+        """
+        Fingerprint the import path.
+
+        Installing or removing a distribution adds or removes its metadata
+        directory, which changes the modification time of the ``sys.path``
+        directory it lives in.
+
+        Returns:
+            A hex digest of every ``sys.path`` directory and its mtime
+        """
+        digest = hashlib.sha256()
+        for path in sys.path:
+            try:
+                mtime = os.stat(path or ".").st_mtime_ns
+            except OSError:
+                continue
+            digest.update(f"{path}:{mtime}".encode())
+        return digest.hexdigest()
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return the entry point manifest, from the cache when it is still valid.
+
+        Returns:
+            A mapping of command name to ``help``, ``module``, ``class`` and
+            ``distribution``
+        """
+        fingerprint = self.fingerprint()
+        cached = read_json_cache(self.cache_file)
+        if (
+            cached
+            and cached.get("version") == MANIFEST_VERSION
+            and cached.get("group") == self.group
+            and cached.get("fingerprint") == fingerprint
+        ):
+            logger.debug("Using cached entry points %s", self.cache_file)
+            return cached["commands"]
+
+        logger.info("Scanning installed distributions for %s entry points", self.group)
+        commands = self.build()
+        write_json_cache(
+            self.cache_file,
+            {
+                "version": MANIFEST_VERSION,
+                "group": self.group,
+                "fingerprint": fingerprint,
+                "commands": commands,
+            },
+        )
+        return commands
+
+    def build(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Read the entry point group from installed distribution metadata.
+
+        No entry point target is imported.
+
+        Returns:
+            The entry point manifest
+        """
+        import importlib.metadata
+
+        entry_points = importlib.metadata.entry_points()
+        if hasattr(entry_points, "select"):
+            selected = entry_points.select(group=self.group)
+        else:  # Python < 3.10 returns a dict of groups
+            selected = entry_points.get(self.group, [])
+
+        commands = {}
+        for entry_point in selected:
+            module, _, attribute = entry_point.value.partition(":")
+            if not attribute:
+                logger.error(
+                    "Ignoring entry point %s: no class in %s", entry_point.name, entry_point.value
+                )
+                continue
+            distribution = getattr(getattr(entry_point, "dist", None), "name", None) or ""
+            commands[entry_point.name.lower()] = {
+                "help": f"Plugin command from {distribution or module}",
+                "module": module.strip(),
+                "class": attribute.strip(),
+                "distribution": distribution,
+            }
+        return commands
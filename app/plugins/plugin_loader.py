@@ -4,81 +4,197 @@ This module provides functionality to discover, load, and manage plugins and com
 from specified package directories.
 """
 
-import importlib
 import inspect
 import logging
-import pkgutil
-from typing import Dict, List, Type, Callable
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Type
 
 from app.commands.base import Command
+from app.metrics import REGISTRY
+from app.plugins.manifest import (
+    ENTRY_POINT_GROUP,
+    EntryPointManifest,
+    LazyCommand,
+    PluginManifest,
+)
 
 logger = logging.getLogger(__name__)
 
+PLUGIN_LOAD_SECONDS = REGISTRY.histogram(
+    "calculator_plugin_load_duration_seconds", "Time taken to register the commands of a plugin package"
+)
+
 class PluginLoader:
     """
     A class that dynamically loads plugins from specified directories.
     This class follows the Singleton pattern to ensure only one instance exists.
+
+    Singleton creation is guarded by a class-level lock and all registry
+    mutations by an instance lock, so plugins may be loaded and registered
+    from several threads at once.
     """
     _instance = None
+    _instance_lock = threading.Lock()
     plugins: Dict[str, Callable] = {}
     commands: Dict[str, Type[Command]] = {}
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(PluginLoader, cls).__new__(cls)
-            # Initialize instance attributes here
-            cls._instance._initialize()
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(PluginLoader, cls).__new__(cls)
+                    # Initialize instance attributes here
+                    instance._initialize()
+                    cls._instance = instance
         return cls._instance
 
     def _initialize(self):
         """Initialize instance attributes."""
+        self._lock = threading.RLock()
         self.plugins = {}
         self.commands = {}
-
-    def load_plugins(self, package_name: str = "app.plugins") -> Dict[str, object]:
+        self._loaded_packages = set()
+        self._loaded_groups = set()
+        # Plugin source file snapshots per scanned package, for hot reload
+        self.snapshots = {}
+
+    def load_plugins(
+        self, package_name: str = "app.plugins", eager: bool = False, refresh: bool = False
+    ) -> Dict[str, object]:
         """
-        Dynamically loads all plugins from the specified package.
+        Register all plugin commands from the specified package.
+
+        By default commands are registered lazily from the cached plugin
+        manifest and a plugin module is only imported the first time one of
+        its commands is used. Each package is only scanned once per process.
 
         Args:
             package_name: The package name to search for plugins
+            eager: Import every plugin module now instead of on first use
+            refresh: Scan the package again even if it was already loaded
 
         Returns:
             A dictionary of loaded plugins
         """
-        logger.info("Loading plugins from %s", package_name)
+        with self._lock:
+            if package_name in self._loaded_packages and not refresh and not eager:
+                return dict(self.commands)
+
+            logger.info("Loading plugins from %s", package_name)
+            start = time.perf_counter()
+            plugin_manifest = PluginManifest(package_name)
+            manifest = plugin_manifest.load()
+            self.snapshots[package_name] = plugin_manifest.last_snapshot
+            for command_name, entry in manifest.items():
+                command = LazyCommand(command_name, entry)
+                if eager:
+                    command.load()
+                logger.debug("Registering command: %s", command_name)
+                self.commands[command_name] = command
+            self._loaded_packages.add(package_name)
 
-        package = importlib.import_module(package_name)
+            self.load_entry_points(eager=eager, refresh=refresh)
+            PLUGIN_LOAD_SECONDS.observe(time.perf_counter() - start)
 
-        for _, name, is_pkg in pkgutil.iter_modules(package.__path__, package.__name__ + '.'):
-            if is_pkg and not name.endswith('__pycache__'):
-                try:
-                    # Import the module
-                    module = importlib.import_module(name)
-                    logger.debug("Loaded module: %s", name)
+            logger.info("Loaded %d commands from plugins", len(self.commands))
+            return dict(self.commands)
 
-                    # Look for command classes in the module
-                    self._register_commands_from_module(module)
+    def load_entry_points(
+        self, group: str = ENTRY_POINT_GROUP, eager: bool = False, refresh: bool = False
+    ) -> Dict[str, object]:
+        """
+        Register plugin commands published by installed distributions.
 
-                except ImportError as e:
-                    logger.error("Failed to load plugin %s: %s", name, str(e))
+        Entry point metadata is cached and no target module is imported until
+        its command is first used. Commands from plugin packages take
+        precedence over entry points with the same name.
 
-        logger.info("Loaded %d commands from plugins", len(self.commands))
-        return self.commands
+        Args:
+            group: The entry point group to read
+            eager: Import every entry point target now instead of on first use
+            refresh: Read the entry points again even if already loaded
 
-    def _register_commands_from_module(self, module):
+        Returns:
+            A dictionary of the commands registered from entry points
+        """
+        with self._lock:
+            if group in self._loaded_groups and not refresh and not eager:
+                return {}
+
+            registered = {}
+            for command_name, entry in EntryPointManifest(group).load().items():
+                existing = self.commands.get(command_name)
+                if existing is not None and getattr(existing, "distribution", None) is None:
+                    logger.warning(
+                        "Ignoring entry point command %s from %s: name already registered",
+                        command_name,
+                        entry["distribution"] or entry["module"],
+                    )
+                    continue
+                command = LazyCommand(command_name, entry)
+                if eager:
+                    command.load()
+                logger.debug("Registering entry point command: %s", command_name)
+                self.commands[command_name] = command
+                registered[command_name] = command
+            self._loaded_groups.add(group)
+            return registered
+
+    @staticmethod
+    def find_commands(module) -> Dict[str, Type[Command]]:
         """
-        Register all Command subclasses from a module.
+        Find all Command subclasses exported by a module.
 
         Args:
             module: The module to search for Command subclasses
+
+        Returns:
+            A mapping of command name to command class
         """
+        commands = {}
         for _, obj in inspect.getmembers(module, inspect.isclass):
             # Check if the class is a subclass of Command but not Command itself
             if issubclass(obj, Command) and obj is not Command:
                 # Get the command name from the class
                 command_name = getattr(obj, 'name', obj.__name__.lower())
-                logger.debug("Registering command: %s", command_name)
-                self.commands[command_name] = obj
+                commands[command_name] = obj
+        return commands
+
+    def replace_package_commands(
+        self, plugin_package: str, manifest: Dict[str, Dict]
+    ) -> Dict[str, List[str]]:
+        """
+        Replace the registered commands of one plugin package.
+
+        Args:
+            plugin_package: Full name of the plugin package, e.g. ``app.plugins.csv``
+            manifest: The package's current manifest entries (empty if it was removed)
+
+        Returns:
+            The command names that were ``added``, ``updated`` and ``removed``
+        """
+        with self._lock:
+            previous = {
+                name
+                for name, command in self.commands.items()
+                if self._command_package(command) == plugin_package
+            }
+            for name in previous - set(manifest):
+                del self.commands[name]
+            for name, entry in manifest.items():
+                self.commands[name] = LazyCommand(name, entry)
+                logger.debug("Registering command: %s", name)
+            return {
+                "added": sorted(set(manifest) - previous),
+                "updated": sorted(set(manifest) & previous),
+                "removed": sorted(previous - set(manifest)),
+            }
+
+    @staticmethod
+    def _command_package(command) -> Optional[str]:
+        """Return the plugin package a registered command came from."""
+        return getattr(command, "package", None)
 
     def register_plugin(self, name: str, plugin_func: Callable) -> None:
         """
@@ -89,9 +205,10 @@ class PluginLoader:
             plugin_func: The plugin function
         """
         logger.debug("Registering function plugin: %s", name)
-        self.plugins[name] = plugin_func
-        # Also add to commands for unified access
-        self.commands[name] = plugin_func
+        with self._lock:
+            self.plugins[name] = plugin_func
+            # Also add to commands for unified access
+            self.commands[name] = plugin_func
 
     def get_command_list(self) -> List[str]:
         """
@@ -100,7 +217,8 @@ class PluginLoader:
         Returns:
             A list of command names
         """
-        return sorted(self.commands.keys())
+        with self._lock:
+            return sorted(self.commands.keys())
 
     def get_command(self, command_name: str) -> Type[Command]:
         """
@@ -125,3 +243,8 @@ class PluginLoader:
             The plugin function if found, otherwise None
         """
         return self.plugins.get(plugin_name.lower())
+
+
+REGISTRY.gauge("calculator_plugin_commands", "Commands registered from plugins").set_function(
+    lambda: None if PluginLoader._instance is None else len(PluginLoader._instance.commands)
+)
@@ -0,0 +1 @@
+from .primes_command import PrimeCountCommand
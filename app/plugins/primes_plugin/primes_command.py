@@ -0,0 +1,44 @@
+import logging
+
+from app.commands.base import Command
+
+logger = logging.getLogger(__name__)
+
+
+def count_primes(limit: int) -> int:
+    """Count the primes below ``limit`` with a pure-Python sieve of Eratosthenes."""
+    if limit < 3:
+        return 0
+    sieve = bytearray([1]) * limit
+    sieve[0] = sieve[1] = 0
+    for number in range(2, int(limit**0.5) + 1):
+        if sieve[number]:
+            for multiple in range(number * number, limit, number):
+                sieve[multiple] = 0
+    return sum(sieve)
+
+
+class PrimeCountCommand(Command):
+    """Command to count the prime numbers below a limit."""
+
+    name = "primes"
+    help = "Count the primes below a number (primes <limit>)"
+    cpu_bound = True
+    reads_history = False
+
+    def execute(self, *args) -> str:
+        if len(args) != 1:
+            return "Error: 'primes' requires exactly one argument"
+
+        try:
+            limit = int(args[0])
+        except ValueError:
+            return f"Error: Invalid limit '{args[0]}'"
+        if limit < 0:
+            return "Error: Limit must not be negative"
+
+        count = count_primes(limit)
+        if self.calculator is not None:
+            self.calculator.history_manager.add_entry("primes", f"primes({limit})", count)
+        logger.info("Counted %d primes below %d", count, limit)
+        return f"Result: {count}"
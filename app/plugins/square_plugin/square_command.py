@@ -1,30 +1,32 @@
-from app.commands.base import Command
+import numpy as np
 
+from app.commands.base import VectorizedCommand
 
-class SquareCommand(Command):
+
+class SquareCommand(VectorizedCommand):
     name = "square"
     help = "square of number (square <number>)"
+    arg_types = (float,)
+    reads_history = False
 
-    def execute(self, args):
-        """Calculate the square of a number
+    def parse_args(self, args) -> tuple:
+        if not args:
+            raise ValueError("Usage: square <number>")
+        try:
+            return super().parse_args(args)
+        except ValueError:
+            raise ValueError("Please provide a valid number")
 
-        Args:
-            args: Should contain a single number
+    def compute(self, number: float) -> float:
+        """Calculate the square of a number."""
+        return number**2
 
-        Returns:
-            float: The square of the input number
-        """
-        # Debug line to see what's coming in
-        print(f"Debug - received args: {args}, type: {type(args)}")
+    def execute_batch(self, numbers: np.ndarray) -> np.ndarray:
+        """Calculate the squares of many numbers at once."""
+        return np.square(numbers)
 
-        if not args:
-            return "Usage: square <number>"
+    def format_result(self, result: float, number: float = None) -> str:
+        return f"The square of {number} is {result}"
 
-        try:
-            # Try to parse the first argument as a float
-            number = float(args[0])
-            result = number**2
-            return f"The square of {number} is {result}"
-        except (ValueError, IndexError) as e:
-            print(f"Error: {str(e)}")
-            return "Please provide a valid number"
+    def format_error(self, error: Exception) -> str:
+        return str(error)
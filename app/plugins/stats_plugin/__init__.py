@@ -0,0 +1 @@
+from .stats_command import StatsCommand
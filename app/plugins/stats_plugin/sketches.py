@@ -0,0 +1,257 @@
+"""
+Mergeable single-pass summaries of a stream of numbers.
+
+Every summary takes values a chunk (NumPy array) at a time, uses memory
+independent of the number of values, and can be merged with a summary of
+another part of the stream, so partitions can be summarized in parallel.
+
+* ``RunningStats``: count, mean, variance, min and max. Each chunk's mean and
+  sum of squared deviations are computed with NumPy and combined with the
+  running ones by the parallel form of Welford's algorithm (Chan et al.),
+  which stays accurate where the naive sum-of-squares formula cancels.
+* ``DDSketch``: quantiles within a relative error (1% by default), from
+  counts in logarithmically sized buckets (Masson et al., VLDB 2019).
+* ``FixedHistogram``: exact counts in equal-width bins over a known range.
+"""
+import math
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+DEFAULT_MAX_BUCKETS = 2048
+
+
+class RunningStats:
+    """Count, mean, variance, min and max of a stream."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        # Sum of squared deviations from the mean
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values: np.ndarray) -> None:
+        """Add a chunk of finite values."""
+        if not values.size:
+            return
+        mean = float(values.mean())
+        self._combine(values.size, mean, float(np.square(values - mean).sum()), values.min(), values.max())
+
+    def merge(self, other: "RunningStats") -> None:
+        """Add the values summarized by another instance."""
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.min, other.max)
+
+    def _combine(self, count: int, mean: float, m2: float, low: float, high: float) -> None:
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = min(self.min, float(low))
+        self.max = max(self.max, float(high))
+
+    @property
+    def variance(self) -> float:
+        """The sample variance (NaN for fewer than two values)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self) -> float:
+        """The sample standard deviation."""
+        return math.sqrt(self.variance)
+
+
+class DDSketch:
+    """Quantile sketch with relative accuracy guarantees."""
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY, max_buckets: int = DEFAULT_MAX_BUCKETS):
+        """
+        Args:
+            relative_accuracy: Maximum relative error of the quantiles
+            max_buckets: Buckets kept per sign; beyond that the buckets
+                nearest zero are collapsed, losing accuracy only for the
+                smallest magnitudes
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        # Smaller magnitudes are counted as zero
+        self._min_indexable = sys.float_info.min * self.gamma
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def update(self, values: np.ndarray) -> None:
+        """Add a chunk of finite values."""
+        magnitudes = np.abs(values)
+        indexable = magnitudes > self._min_indexable
+        for store, selected in ((self.positive, values > 0), (self.negative, values < 0)):
+            selected &= indexable
+            if selected.any():
+                indexes = np.ceil(np.log(magnitudes[selected]) / self._log_gamma).astype(np.int64)
+                buckets, counts = np.unique(indexes, return_counts=True)
+                for index, count in zip(buckets.tolist(), counts.tolist()):
+                    store[index] = store.get(index, 0) + count
+                self._collapse(store)
+        self.zero_count += int(values.size - indexable.sum())
+        self.count += int(values.size)
+
+    def merge(self, other: "DDSketch") -> None:
+        """
+        Add the values summarized by another sketch.
+
+        Raises:
+            ValueError: If the sketches have different accuracies
+        """
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches of different relative accuracy")
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, count in other_store.items():
+                store[index] = store.get(index, 0) + count
+            self._collapse(store)
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def _collapse(self, store: Dict[int, int]) -> None:
+        if len(store) <= self.max_buckets:
+            return
+        indexes = sorted(store)
+        keep = indexes[len(indexes) - self.max_buckets]
+        store[keep] += sum(store.pop(index) for index in indexes[: len(indexes) - self.max_buckets])
+
+    def _value(self, index: int) -> float:
+        """The value a bucket stands for, within the relative accuracy of all its values."""
+        return 2 * self.gamma**index / (self.gamma + 1)
+
+    def buckets(self) -> Iterator[Tuple[float, int]]:
+        """Yield ``(value, count)`` for every non-empty bucket, in increasing value order."""
+        for index in sorted(self.negative, reverse=True):
+            yield -self._value(index), self.negative[index]
+        if self.zero_count:
+            yield 0.0, self.zero_count
+        for index in sorted(self.positive):
+            yield self._value(index), self.positive[index]
+
+    def quantiles(self, fractions: List[float]) -> List[float]:
+        """
+        Return approximate quantiles.
+
+        Args:
+            fractions: Quantiles to compute, each between 0 and 1
+
+        Returns:
+            One value per fraction (NaN if the sketch is empty)
+        """
+        if not self.count:
+            return [math.nan] * len(fractions)
+        ranks = sorted((fraction * (self.count - 1), position) for position, fraction in enumerate(fractions))
+        results = [math.nan] * len(fractions)
+        buckets = self.buckets()
+        seen, value = 0, math.nan
+        for rank, position in ranks:
+            while seen <= rank:
+                value, count = next(buckets)
+                seen += count
+            results[position] = value
+        return results
+
+
+class FixedHistogram:
+    """Exact counts of values in equal-width bins over a fixed range."""
+
+    def __init__(self, low: float, high: float, bins: int):
+        if not low < high or bins < 1:
+            raise ValueError("The histogram range must be increasing and have at least one bin")
+        self.edges = np.linspace(low, high, bins + 1)
+        self.counts = np.zeros(bins, dtype=np.int64)
+        # Values below and above the range
+        self.outside = [0, 0]
+
+    def update(self, values: np.ndarray) -> None:
+        """Add a chunk of finite values."""
+        self.counts += np.histogram(values, bins=self.edges)[0]
+        self.outside[0] += int((values < self.edges[0]).sum())
+        self.outside[1] += int((values > self.edges[-1]).sum())
+
+    def merge(self, other: "FixedHistogram") -> None:
+        """Add the counts of another histogram over the same bins."""
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Cannot merge histograms with different bins")
+        self.counts += other.counts
+        self.outside = [self.outside[0] + other.outside[0], self.outside[1] + other.outside[1]]
+
+
+class ColumnSummary:
+    """All the summaries of one column, plus the number of values that were not numbers."""
+
+    def __init__(
+        self,
+        relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+        histogram_range: Optional[Tuple[float, float]] = None,
+        bins: int = 10,
+    ):
+        """
+        Args:
+            relative_accuracy: Accuracy of the quantile sketch
+            histogram_range: Range of an exact histogram; without one, the
+                histogram is derived from the sketch (see ``histogram``)
+            bins: Number of histogram bins
+        """
+        self.stats = RunningStats()
+        self.sketch = DDSketch(relative_accuracy)
+        self.bins = bins
+        self.exact = FixedHistogram(*histogram_range, bins) if histogram_range is not None else None
+        self.skipped = 0
+
+    def update(self, values: np.ndarray) -> None:
+        """Add a chunk of values; NaN and infinite values are counted as skipped."""
+        finite = np.isfinite(values)
+        self.skipped += int(values.size - finite.sum())
+        values = values[finite]
+        self.stats.update(values)
+        self.sketch.update(values)
+        if self.exact is not None:
+            self.exact.update(values)
+
+    def merge(self, other: "ColumnSummary") -> None:
+        """Add the summaries of another part of the column."""
+        self.stats.merge(other.stats)
+        self.sketch.merge(other.sketch)
+        if self.exact is not None:
+            self.exact.merge(other.exact)
+        self.skipped += other.skipped
+
+    def quantiles(self, fractions: List[float]) -> List[float]:
+        """Approximate quantiles, clamped to the exact min and max."""
+        return [min(max(value, self.stats.min), self.stats.max) for value in self.sketch.quantiles(fractions)]
+
+    def histogram(self) -> Tuple[np.ndarray, np.ndarray, bool]:
+        """
+        Return the histogram.
+
+        Returns:
+            ``(edges, counts, exact)``. Without a fixed range the bins span
+            min to max and each sketch bucket is counted in the bin of its
+            value, so counts near bin edges are approximate.
+        """
+        if self.exact is not None:
+            return self.exact.edges, self.exact.counts, True
+        if not self.stats.count:
+            return np.array([]), np.array([], dtype=np.int64), False
+        low, high = self.stats.min, self.stats.max
+        if low == high:
+            high = low + 1
+        edges = np.linspace(low, high, self.bins + 1)
+        values, weights = zip(*self.sketch.buckets())
+        values = np.clip(values, low, high)
+        counts = np.histogram(values, bins=edges, weights=weights)[0].astype(np.int64)
+        return edges, counts, False
@@ -0,0 +1,133 @@
+"""Command summarizing a numeric column of a CSV file."""
+
+import logging
+import math
+import os
+from typing import Any, Dict, List, Tuple
+
+from app.commands.base import Command
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+USAGE = "Usage: stats <filename> [column] [--bins N] [--range LOW HIGH] [--quantiles Q,Q,...] [--workers N]"
+
+
+def _format_quantile(fraction: float) -> str:
+    return f"p{fraction * 100:g}"
+
+
+def _parse_args(args: List[str]) -> Tuple[List[str], List[float], Dict[str, Any]]:
+    """
+    Separate the options of the command from its positional arguments.
+
+    Returns:
+        The filename and optional column, the quantiles to show, and the
+        ``bins``, ``workers`` and ``histogram_range`` options
+
+    Raises:
+        ValueError: With the message to show if the arguments are invalid
+    """
+    positional: List[str] = []
+    quantiles = list(DEFAULT_QUANTILES)
+    options: Dict[str, Any] = {"bins": 10, "workers": None, "histogram_range": None}
+    while args:
+        arg = args.pop(0)
+        try:
+            if arg in ("--bins", "--workers"):
+                options[arg[2:]] = int(args.pop(0))
+            elif arg == "--range":
+                options["histogram_range"] = (float(args.pop(0)), float(args.pop(0)))
+            elif arg == "--quantiles":
+                quantiles = [float(value) for value in args.pop(0).split(",")]
+            else:
+                positional.append(arg)
+        except IndexError:
+            raise ValueError(USAGE)
+        except ValueError:
+            raise ValueError(f"Invalid value for {arg}")
+    if not 1 <= len(positional) <= 2:
+        raise ValueError(USAGE)
+    _check_options(quantiles, options)
+    return positional, quantiles, options
+
+
+def _check_options(quantiles: List[float], options: Dict[str, Any]) -> None:
+    """
+    Check the values of the options returned by ``_parse_args``.
+
+    Raises:
+        ValueError: With the message to show if an option is invalid
+    """
+    for option in ("bins", "workers"):
+        if options[option] is not None and options[option] < 1:
+            raise ValueError(f"--{option} must be at least 1")
+    histogram_range = options["histogram_range"]
+    if histogram_range is not None and not (
+        math.isfinite(histogram_range[0]) and math.isfinite(histogram_range[1])
+        and histogram_range[0] < histogram_range[1]
+    ):
+        raise ValueError("--range LOW must be less than HIGH, both finite")
+    if not all(0 <= value <= 1 for value in quantiles):
+        raise ValueError("--quantiles must be between 0 and 1")
+
+
+class StatsCommand(Command):
+    """Command computing streaming statistics of a CSV column, recorded as one history entry."""
+
+    name = "stats"
+    help = (
+        "Statistics of a numeric CSV column in one bounded-memory pass: count, mean, std, min, max, "
+        "quantiles (within 1%) and a histogram "
+        "(stats <filename> [column] [--bins N] [--range LOW HIGH] [--quantiles Q,Q,...] [--workers N])"
+    )
+    # Reads a file, never the live history
+    reads_history = False
+
+    def execute(self, *args) -> str:
+        from app.plugins.stats_plugin.streaming import summarize_file
+
+        try:
+            positional, quantiles, options = _parse_args(list(args))
+        except ValueError as e:
+            return f"Error: {str(e)}"
+
+        path = positional[0]
+        try:
+            column, summary = summarize_file(
+                path,
+                positional[1] if len(positional) == 2 else None,
+                **options,
+            )
+        except (OSError, ValueError) as e:
+            logger.error("Failed to compute statistics of %s: %s", path, str(e))
+            return f"Error: Could not read {path}: {str(e)}"
+
+        stats = summary.stats
+        if not stats.count:
+            return f"Error: No numeric values in column {column} of {path}"
+        quantile_text = ", ".join(
+            f"{_format_quantile(fraction)}={value:g}"
+            for fraction, value in zip(quantiles, summary.quantiles(quantiles))
+        )
+        result = (
+            f"n={stats.count} mean={stats.mean:g} std={stats.std:g} min={stats.min:g} max={stats.max:g} "
+            f"{quantile_text.replace(', ', ' ')}"
+        )
+        if self.calculator is not None:
+            self.calculator.history_manager.add_entry(self.name, f"stats({os.path.basename(path)}:{column})", result)
+
+        edges, counts, exact = summary.histogram()
+        lines = [
+            f"Statistics of {column} in {path}: {stats.count} values" + (f", {summary.skipped} skipped" if summary.skipped else ""),
+            f"mean: {stats.mean:g}, std: {stats.std:g}, variance: {stats.variance:g}",
+            f"min: {stats.min:g}, max: {stats.max:g}",
+            f"quantiles (within {summary.sketch.relative_accuracy:.0%}): {quantile_text}",
+            "histogram" + ("" if exact else " (approximate)") + ":",
+        ]
+        width = max(len(f"{edge:g}") for edge in edges)
+        for low, high, count in zip(edges, edges[1:], counts):
+            lines.append(f"  [{low:>{width}g}, {high:>{width}g}): {count}")
+        if exact and any(summary.exact.outside):
+            lines.append(f"  outside the range: {summary.exact.outside[0]} below, {summary.exact.outside[1]} above")
+        return "\n".join(lines)
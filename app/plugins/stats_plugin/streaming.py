@@ -0,0 +1,169 @@
+"""
+Streaming a numeric column out of a CSV file into a ``ColumnSummary``.
+
+The file is read ``STATS_CHUNK_ROWS`` rows at a time (default 100,000), so
+memory stays bounded whatever its size. Files large enough are split into
+byte ranges starting at line boundaries, one per worker process
+(``STATS_WORKERS``, default: the number of CPUs), and the summaries of the
+ranges are merged. Splitting at line boundaries assumes no quoted field
+spans several lines, which holds for history files.
+"""
+import csv
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from app.plugins.stats_plugin.sketches import DEFAULT_RELATIVE_ACCURACY, ColumnSummary
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_ROWS = 100_000
+# Smaller ranges are not worth a worker process
+MIN_PARTITION_BYTES = 4 * 1024 * 1024
+# Column used when none is given, if the file has it
+DEFAULT_COLUMN = "result"
+
+
+class _RangeFile(io.FileIO):
+    """A read-only view of the bytes ``[start, end)`` of a file."""
+
+    def __init__(self, path: str, start: int, end: int):
+        super().__init__(path, "rb")
+        self.seek(start)
+        self._remaining = end - start
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        read = super().readinto(memoryview(buffer)[:size])
+        self._remaining -= read
+        return read
+
+
+def _partition(path: str, parts: int) -> Tuple[List[str], List[Tuple[int, int]]]:
+    """
+    Read the header of a CSV file and split the rest into byte ranges of whole lines.
+
+    Returns:
+        The column names and the ``(start, end)`` ranges (none for a file
+        without data rows)
+    """
+    with open(path, "rb") as file:
+        header = file.readline()
+        start = file.tell()
+        size = os.fstat(file.fileno()).st_size
+        bounds = [start]
+        for part in range(1, parts):
+            # Move to the start of the line after the one holding the target
+            file.seek(start + (size - start) * part // parts - 1)
+            file.readline()
+            if bounds[-1] < file.tell() < size:
+                bounds.append(file.tell())
+        bounds.append(size)
+    columns = next(csv.reader([header.decode("utf-8-sig")]), [])
+    return columns, [(low, high) for low, high in zip(bounds, bounds[1:]) if low < high]
+
+
+def _column_index(columns: List[str], column: Optional[str]) -> int:
+    """Find a column by name or position (``result``, else the first column, by default)."""
+    if column is None:
+        return columns.index(DEFAULT_COLUMN) if DEFAULT_COLUMN in columns else 0
+    if column in columns:
+        return columns.index(column)
+    if column.isdigit() and int(column) < len(columns):
+        return int(column)
+    raise ValueError(f"No column {column!r} (columns: {', '.join(columns)})")
+
+
+def _summarize_range(
+    path: str, start: int, end: int, *, index: int, chunk_rows: int, options: dict
+) -> ColumnSummary:
+    """Summarize one column of the lines in a byte range (a module-level function, so it can be pickled)."""
+    import pandas as pd
+
+    summary = ColumnSummary(**options)
+    with io.BufferedReader(_RangeFile(path, start, end)) as file:
+        reader = pd.read_csv(file, header=None, usecols=[index], chunksize=chunk_rows)
+        with reader:
+            for chunk in reader:
+                values = chunk[index]
+                # The parser yields floats unless a value in the chunk is not a number
+                if not pd.api.types.is_numeric_dtype(values):
+                    values = pd.to_numeric(values.astype(str).str.strip(), errors="coerce")
+                summary.update(values.to_numpy(dtype="float64", na_value=float("nan")))
+    return summary
+
+
+def summarize_file(
+    path: str,
+    column: Optional[str] = None,
+    *,
+    chunk_rows: Optional[int] = None,
+    workers: Optional[int] = None,
+    relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+    histogram_range: Optional[Tuple[float, float]] = None,
+    bins: int = 10,
+) -> Tuple[str, ColumnSummary]:
+    """
+    Summarize a numeric column of a CSV file in one pass.
+
+    Args:
+        path: The CSV file, with a header row
+        column: Column name or position (``result``, else the first column,
+            by default)
+        chunk_rows: Rows parsed at a time (``STATS_CHUNK_ROWS`` by default)
+        workers: Worker processes (``STATS_WORKERS``, or the number of CPUs,
+            by default); 1 reads the whole file in this process
+        relative_accuracy: Accuracy of the quantiles
+        histogram_range: ``(low, high)`` for an exact histogram
+        bins: Number of histogram bins
+
+    Returns:
+        The name of the column and its summary. Values that are not numbers
+        are counted as skipped.
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the column does not exist or an option is invalid
+    """
+    if chunk_rows is None:
+        chunk_rows = int(os.getenv("STATS_CHUNK_ROWS", str(DEFAULT_CHUNK_ROWS)))
+    if workers is None:
+        workers = int(os.getenv("STATS_WORKERS", "0")) or os.cpu_count() or 1
+    if chunk_rows < 1 or workers < 1 or bins < 1:
+        raise ValueError("chunk_rows, workers and bins must be at least 1")
+    options = {"relative_accuracy": relative_accuracy, "histogram_range": histogram_range, "bins": bins}
+    # Fail on invalid options before reading anything
+    summary = ColumnSummary(**options)
+
+    parts = max(1, min(workers, os.path.getsize(path) // MIN_PARTITION_BYTES))
+    columns, ranges = _partition(path, parts)
+    if not columns:
+        raise ValueError(f"{path} is empty")
+    index = _column_index(columns, column)
+
+    if len(ranges) <= 1:
+        for start, end in ranges:
+            summary.merge(_summarize_range(path, start, end, index=index, chunk_rows=chunk_rows, options=options))
+    else:
+        # Spawned, like the command workers: the caller may be running threads
+        with ProcessPoolExecutor(max_workers=len(ranges), mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = [
+                pool.submit(_summarize_range, path, start, end, index=index, chunk_rows=chunk_rows, options=options)
+                for start, end in ranges
+            ]
+            for future in futures:
+                summary.merge(future.result())
+    logger.info(
+        "Summarized column %s of %s in %d partition(s): %d values, %d skipped",
+        columns[index],
+        path,
+        len(ranges),
+        summary.stats.count,
+        summary.skipped,
+    )
+    return columns[index], summary
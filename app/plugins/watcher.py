@@ -0,0 +1,231 @@
+"""
+Hot reload of plugin packages without restarting the application.
+
+``PluginWatcher`` polls the size and modification time of every plugin source
+file (plain ``os.stat`` calls, no platform-specific notification APIs) and
+compares them with the snapshot taken when the plugins were last loaded.
+Only the packages that were added, changed or removed are touched: changed
+modules that were already imported are reloaded with ``importlib.reload``,
+and only the registry entries of those packages are replaced.
+"""
+import importlib
+import logging
+import os
+import sys
+import threading
+from typing import Callable, Dict, List, Optional
+
+from app.plugins.manifest import PluginManifest
+from app.plugins.plugin_loader import PluginLoader
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["PluginChanges", "PluginWatcher"]
+
+
+class PluginChanges:
+    """Plugin packages and commands affected by one reload."""
+
+    def __init__(self):
+        self.added_packages: List[str] = []
+        self.changed_packages: List[str] = []
+        self.removed_packages: List[str] = []
+        self.added_commands: List[str] = []
+        self.updated_commands: List[str] = []
+        self.removed_commands: List[str] = []
+
+    def __bool__(self):
+        return bool(self.added_packages or self.changed_packages or self.removed_packages)
+
+    def __str__(self):
+        if not self:
+            return "No plugin changes"
+        parts = []
+        for label, names in (
+            ("added", self.added_commands),
+            ("reloaded", self.updated_commands),
+            ("removed", self.removed_commands),
+        ):
+            if names:
+                parts.append(f"{label}: {', '.join(names)}")
+        return "Plugins reloaded (" + ("; ".join(parts) or "no commands affected") + ")"
+
+
+class PluginWatcher:
+    """Detects and applies changes to the plugin packages of one package root."""
+
+    def __init__(self, package_name: str = "app.plugins", loader: Optional[PluginLoader] = None):
+        """
+        Args:
+            package_name: The package whose subpackages are plugins
+            loader: The plugin registry to update (the singleton by default)
+        """
+        self.package_name = package_name
+        self.loader = loader or PluginLoader()
+        self.loader.load_plugins(package_name)
+        self._manifest = PluginManifest(package_name)
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[PluginChanges], None]] = []
+        self._thread = None
+        self._stop = threading.Event()
+        self._current = {}
+
+    def add_listener(self, listener: Callable[[PluginChanges], None]) -> None:
+        """Call ``listener`` with the changes after every reload that found some."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[PluginChanges], None]) -> None:
+        """Stop notifying ``listener``."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def poll(self) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Compare plugin source files with the last loaded snapshot.
+
+        Returns:
+            A mapping of package name to its ``added``, ``changed`` and
+            ``removed`` files; packages without changes are omitted
+        """
+        current = self._manifest.snapshot(self._manifest.plugin_packages())
+        previous = self.loader.snapshots.get(self.package_name, {})
+        differences = {}
+        for package_name in set(previous) | set(current):
+            old_files = previous.get(package_name, {})
+            new_files = current.get(package_name, {})
+            files = {
+                "added": sorted(set(new_files) - set(old_files)),
+                "changed": sorted(
+                    f for f in set(new_files) & set(old_files)
+                    if list(new_files[f]) != list(old_files[f])
+                ),
+                "removed": sorted(set(old_files) - set(new_files)),
+            }
+            if any(files.values()):
+                differences[package_name] = files
+        self._current = current
+        return differences
+
+    def reload(self) -> PluginChanges:
+        """
+        Reload every plugin package that changed since the last snapshot.
+
+        Returns:
+            The packages and commands that were affected
+        """
+        with self._lock:
+            differences = self.poll()
+            changes = PluginChanges()
+            for package_name, files in sorted(differences.items()):
+                try:
+                    self._apply(package_name, files, changes)
+                except Exception as e:
+                    # Keep the old snapshot so the next poll retries this package
+                    logger.error("Failed to reload plugin %s: %s", package_name, str(e))
+                    self._current[package_name] = self.loader.snapshots.get(
+                        self.package_name, {}
+                    ).get(package_name, {})
+            self.loader.snapshots[self.package_name] = self._current
+
+        if changes:
+            logger.info("%s", changes)
+            for listener in list(self._listeners):
+                listener(changes)
+        return changes
+
+    def _apply(self, package_name: str, files: Dict[str, List[str]], changes: PluginChanges) -> None:
+        """Reload one package and replace its registry entries."""
+        known = package_name in self.loader.snapshots.get(self.package_name, {})
+        if package_name not in self._current:
+            self._forget_modules(package_name)
+            result = self.loader.replace_package_commands(package_name, {})
+            changes.removed_packages.append(package_name)
+        else:
+            if package_name in sys.modules:
+                self._reload_modules(package_name, files)
+            if known:
+                changes.changed_packages.append(package_name)
+            else:
+                changes.added_packages.append(package_name)
+            packages = [p for p in self._manifest.plugin_packages() if p["name"] == package_name]
+            manifest = self._manifest.build(packages)
+            result = self.loader.replace_package_commands(package_name, manifest)
+
+        changes.added_commands.extend(result["added"])
+        changes.updated_commands.extend(result["updated"])
+        changes.removed_commands.extend(result["removed"])
+
+    @staticmethod
+    def _module_name(package_name: str, relative_path: str) -> str:
+        """Translate a file path inside a package into its module name."""
+        parts = os.path.splitext(relative_path)[0].split(os.sep)
+        if parts[-1] == "__init__":
+            parts = parts[:-1]
+        return ".".join([package_name] + parts)
+
+    def _reload_modules(self, package_name: str, files: Dict[str, List[str]]) -> None:
+        """Reload the changed, already imported modules of a package."""
+        for relative in files["removed"]:
+            sys.modules.pop(self._module_name(package_name, relative), None)
+
+        changed = [self._module_name(package_name, f) for f in files["changed"]]
+        # Deepest modules first, so packages re-export the reloaded classes
+        for module_name in sorted(set(changed), key=lambda m: m.count("."), reverse=True):
+            module = sys.modules.get(module_name)
+            if module is not None and module_name != package_name:
+                importlib.reload(module)
+                logger.debug("Reloaded module %s", module_name)
+
+        # Re-run package initializers so they pick up new and reloaded modules
+        packages = {package_name}
+        for module_name in changed:
+            parts = module_name.split(".")
+            for depth in range(package_name.count(".") + 1, len(parts)):
+                packages.add(".".join(parts[:depth]))
+        for module_name in sorted(packages, key=lambda m: m.count("."), reverse=True):
+            if module_name in sys.modules:
+                importlib.reload(sys.modules[module_name])
+                logger.debug("Reloaded package %s", module_name)
+
+    @staticmethod
+    def _forget_modules(package_name: str) -> None:
+        """Drop a removed package and its submodules from the import cache."""
+        for module_name in list(sys.modules):
+            if module_name == package_name or module_name.startswith(package_name + "."):
+                del sys.modules[module_name]
+
+    def start(self, interval: float = 1.0) -> None:
+        """
+        Reload changed plugins automatically from a background thread.
+
+        Args:
+            interval: Seconds between polls
+        """
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(interval,), name="plugin-watcher", daemon=True
+        )
+        self._thread.start()
+        logger.info("Plugin auto-reload enabled (every %s seconds)", interval)
+
+    def stop(self) -> None:
+        """Stop automatic reloading."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            logger.info("Plugin auto-reload disabled")
+
+    @property
+    def running(self) -> bool:
+        """Whether automatic reloading is enabled."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.reload()
+            except Exception as e:
+                logger.error("Plugin auto-reload failed: %s", str(e))
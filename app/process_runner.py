@@ -0,0 +1,251 @@
+"""
+Process-pool execution for CPU-bound commands.
+
+Commands that set ``cpu_bound = True`` are run in a pool of warm worker
+processes so that they use other cores and do not hold the interpreter lock of
+the REPL process. Each worker loads all plugins once when it starts, runs
+commands against its own private ``HistoryManager`` and ships the entries a
+command recorded back to the parent, where they are appended to the real
+history.
+"""
+import logging
+import multiprocessing
+import os
+from concurrent.futures import CancelledError, Future, InvalidStateError, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple, Type
+
+from app.commands.base import Command
+from app.history_manager import HistoryManager
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["ProcessCommandRunner"]
+
+
+def _init_worker(package_name: str) -> None:
+    """Warm a worker process: disable autosave and preload all plugins."""
+    # Only the parent process may write the history file or publish the
+    # history; a worker's scratch history would overwrite the parent's
+    os.environ.pop("HISTORY_FILE", None)
+    os.environ.pop("HISTORY_SHARED_FILE", None)
+    # The scratch history is cleared before every command; undoing that is
+    # never needed, and each clear would spill the last command's entries
+    os.environ["UNDO_LIMIT"] = "0"
+
+    from app.plugins.plugin_loader import PluginLoader
+
+    PluginLoader().load_plugins(package_name, eager=True)
+    HistoryManager()
+
+
+def _ping() -> int:
+    """No-op task used to make sure every worker has started."""
+    return os.getpid()
+
+
+def _run_in_worker(command_class: Type[Command], args: tuple) -> Tuple[str, List[tuple]]:
+    """
+    Execute a command inside a worker process.
+
+    Returns:
+        The command output and the history entries it recorded
+    """
+    from app.calculator import Calculator
+
+    calculator = Calculator()
+    calculator.history_manager.clear_history()
+    output = command_class(calculator).execute(*args)
+    history = calculator.history_manager.get_history()
+    entries = list(
+        history[["operation", "expression", "result"]].itertuples(index=False, name=None)
+    )
+    return output, entries
+
+
+class CommandFuture(Future):
+    """Future for a command running in a worker process."""
+
+    def __init__(self, worker_future: Future):
+        super().__init__()
+        self.worker_future = worker_future
+        self.set_running_or_notify_cancel()
+
+    def fail(self, error: BaseException) -> None:
+        """Set ``error`` unless the future has already been resolved."""
+        try:
+            self.set_exception(error)
+        except InvalidStateError:
+            pass
+
+
+class ProcessCommandRunner:
+    """
+    Runs CPU-bound commands in a pool of warm worker processes.
+
+    The pool is started by the constructor and every worker imports all
+    plugins before accepting work. Cancelling a command that is already
+    running terminates the pool and starts a fresh one, which also fails any
+    other command running at that moment.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        history_manager: Optional[HistoryManager] = None,
+        package_name: str = "app.plugins",
+        default_timeout: Optional[float] = None,
+    ):
+        """
+        Args:
+            max_workers: Number of worker processes (``PROCESS_WORKERS``
+                environment variable, or the number of CPUs, by default)
+            history_manager: Where recorded entries are appended
+            package_name: Plugin package to preload in each worker
+            default_timeout: Timeout for commands that do not set one
+        """
+        if max_workers is None:
+            max_workers = int(os.getenv("PROCESS_WORKERS", "0")) or os.cpu_count() or 1
+        self.max_workers = max_workers
+        self.history_manager = history_manager or HistoryManager()
+        self.package_name = package_name
+        self.default_timeout = default_timeout
+        self._executor = None
+        self._start_pool()
+
+    def _start_pool(self) -> None:
+        """Start the worker pool and wait until every worker is warm."""
+        # Workers are spawned rather than forked: the parent may already be
+        # running threads that hold locks (history buffers, logging, batching).
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.package_name,),
+        )
+        warmup = [self._executor.submit(_ping) for _ in range(self.max_workers)]
+        for future in warmup:
+            future.result()
+        logger.info("Started %d warm command worker processes", self.max_workers)
+
+    def _restart_pool(self) -> None:
+        """Kill all workers and start a new warm pool."""
+        executor = self._executor
+        processes = list(getattr(executor, "_processes", {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+        logger.warning("Restarted command worker processes")
+        self._start_pool()
+
+    def submit(
+        self, command_class: Type[Command], *args, history_manager: Optional[HistoryManager] = None
+    ) -> CommandFuture:
+        """
+        Start a command in a worker process.
+
+        Args:
+            command_class: The command class to run; it must be importable
+                by module path from the worker
+            *args: Arguments for the command
+            history_manager: Where recorded entries are appended, instead of
+                the runner's history manager
+
+        Returns:
+            A future resolving to the command output. History entries the
+            command recorded are appended before the future resolves.
+        """
+        worker_future = self._executor.submit(_run_in_worker, command_class, args)
+        result = CommandFuture(worker_future)
+        history_manager = history_manager or self.history_manager
+
+        def _on_done(done: Future):
+            if done.cancelled():
+                result.fail(CancelledError())
+                return
+            error = done.exception()
+            if error is not None:
+                result.fail(error)
+                return
+            output, entries = done.result()
+            try:
+                history_manager.add_entries(entries)
+            except ValueError as e:
+                result.fail(e)
+                return
+            try:
+                result.set_result(output)
+            except InvalidStateError:
+                pass
+
+        worker_future.add_done_callback(_on_done)
+        return result
+
+    def cancel(self, future: CommandFuture) -> bool:
+        """
+        Cancel a submitted command.
+
+        Args:
+            future: A future returned by ``submit``
+
+        Returns:
+            True if the command was cancelled, False if it had already finished
+        """
+        worker_future = future.worker_future
+        if worker_future.done():
+            return False
+        future.fail(CancelledError())
+        if not worker_future.cancel():
+            # Already running: the only way to stop it is to kill its worker
+            self._restart_pool()
+        logger.info("Cancelled worker command")
+        return True
+
+    def run(
+        self,
+        command_class: Type[Command],
+        *args,
+        timeout: Optional[float] = None,
+        history_manager: Optional[HistoryManager] = None,
+    ) -> str:
+        """
+        Run a command in a worker process and wait for its output.
+
+        Args:
+            command_class: The command class to run
+            *args: Arguments for the command
+            timeout: Seconds to wait; defaults to the command's ``timeout``
+                attribute, then to the runner's default
+            history_manager: Where recorded entries are appended, instead of
+                the runner's history manager
+
+        Returns:
+            The command output, or an error message if it timed out or failed
+        """
+        if timeout is None:
+            timeout = getattr(command_class, "timeout", None) or self.default_timeout
+
+        future = self.submit(command_class, *args, history_manager=history_manager)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            self.cancel(future)
+            logger.error("Command %s timed out after %s seconds", command_class.name, timeout)
+            return f"Error: '{command_class.name}' timed out after {timeout} seconds"
+        except KeyboardInterrupt:
+            self.cancel(future)
+            return f"Cancelled '{command_class.name}'"
+        except (CancelledError, BrokenProcessPool) as e:
+            logger.error("Command %s did not complete: %s", command_class.name, repr(e))
+            return f"Error: '{command_class.name}' was cancelled"
+
+    def shutdown(self) -> None:
+        """Stop all worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            logger.info("Command worker processes stopped")
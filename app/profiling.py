@@ -0,0 +1,149 @@
+# app/profiling.py
+"""
+On-demand profiling with ``cProfile`` and ``tracemalloc``.
+
+``Profiler`` runs a block of code under both and reports the functions with
+the most cumulative time and the source lines that allocated the most memory
+still alive when profiling stopped. It backs the ``profile <command...>``
+command and the ``--profile`` start-up flag, which profiles a whole session.
+
+Results can also be saved for offline analysis: ``<prefix>.pstats`` can be
+opened with ``pstats`` or snakeviz, and ``<prefix>.tracemalloc`` with
+``tracemalloc.Snapshot.load``.
+"""
+import cProfile
+import io
+import logging
+import os
+import pstats
+import threading
+import tracemalloc
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["Profiler"]
+
+DEFAULT_TOP = 15
+
+# Frames that would otherwise dominate the allocation report
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class Profiler:
+    """Profiles time and memory allocations of a block of code."""
+
+    # Only one profiler can be active in a process at a time
+    _active: Optional["Profiler"] = None
+    _active_lock = threading.Lock()
+
+    def __init__(self, top: int = DEFAULT_TOP):
+        """
+        Args:
+            top: The number of functions and allocation sites to report
+        """
+        if top < 1:
+            raise ValueError("top must be at least 1")
+        self.top = top
+        self.stats: Optional[pstats.Stats] = None
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self._profile = None
+        self._started_tracemalloc = False
+
+    def start(self) -> None:
+        """
+        Start profiling.
+
+        Raises:
+            RuntimeError: If another profiler is already active
+        """
+        with Profiler._active_lock:
+            if Profiler._active is not None:
+                raise RuntimeError("A profiler is already active")
+            Profiler._active = self
+        self._started_tracemalloc = not tracemalloc.is_tracing()
+        if self._started_tracemalloc:
+            tracemalloc.start()
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def stop(self) -> None:
+        """Stop profiling and collect the results."""
+        if self._profile is None:
+            return
+        try:
+            self._profile.disable()
+            self.snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+            self.stats = pstats.Stats(self._profile, stream=io.StringIO())
+        finally:
+            self._profile = None
+            with Profiler._active_lock:
+                Profiler._active = None
+
+    def __enter__(self) -> "Profiler":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def report(self) -> str:
+        """
+        Format the top functions by cumulative time and the top allocation sites.
+
+        Returns:
+            The report text
+        """
+        if self.stats is None:
+            return "No profile collected"
+
+        stream = io.StringIO()
+        self.stats.stream = stream
+        self.stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+        # Drop the per-profile preamble (blank lines and "Ordered by: ...")
+        lines = [line for line in stream.getvalue().splitlines() if line.strip()]
+        calls = [line for line in lines if "function calls" in line]
+        table = lines[next(i for i, line in enumerate(lines) if "ncalls" in line):]
+
+        sections = [f"Top {self.top} functions by cumulative time ({calls[0].strip() if calls else ''}):"]
+        sections.extend(table)
+        sections.append("")
+        sections.append(f"Top {self.top} allocation sites:")
+        statistics = self.snapshot.statistics("lineno")[: self.top]
+        if not statistics:
+            sections.append("  (no allocations)")
+        for statistic in statistics:
+            frame = statistic.traceback[0]
+            sections.append(
+                f"  {frame.filename}:{frame.lineno}: "
+                f"{statistic.size / 1024:.1f} KiB in {statistic.count} blocks"
+            )
+        return "\n".join(sections)
+
+    def save(self, prefix: str) -> List[str]:
+        """
+        Save the results as ``<prefix>.pstats`` and ``<prefix>.tracemalloc``.
+
+        Args:
+            prefix: Path of the files without extension
+
+        Returns:
+            The paths written
+        """
+        if self.stats is None:
+            return []
+        directory = os.path.dirname(prefix)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        paths = [f"{prefix}.pstats", f"{prefix}.tracemalloc"]
+        self.stats.dump_stats(paths[0])
+        self.snapshot.dump(paths[1])
+        logger.info("Saved profile to %s", ", ".join(paths))
+        return paths
@@ -1,5 +1,8 @@
 import logging
-from typing import Dict, Optional, Type
+import os
+import re
+import time
+from typing import Dict, List, Optional, Tuple, Type
 
 from app.calculator import Calculator
 from app.commands.arithmetic import (
@@ -9,13 +12,66 @@ from app.commands.arithmetic import (
     SubtractCommand,
 )
 from app.commands.base import Command
-from app.commands.history import ClearHistoryCommand, DeleteCommand, HistoryCommand
-from app.commands.system import ExitCommand, HelpCommand
+from app.commands.batch import BatchCommand
+from app.commands.history import (
+    ClearHistoryCommand,
+    DeleteCommand,
+    HistoryCommand,
+    RedoCommand,
+    RollupCommand,
+    UndoCommand,
+)
+from app.commands.profile import ProfileCommand
+from app.commands.system import ExitCommand, HelpCommand, MetricsCommand, ReloadCommand
+from app.commands.variables import VariablesCommand
+from app.commands.verify import VerifyCommand
+from app.event_log import get_event_log
+from app.history_manager import DEFAULT_NAMESPACE
+from app.metrics import DEFAULT_METRICS_INTERVAL, REGISTRY, MetricsFileExporter
 from app.plugins.csv.csv_plugin import ExportCSVCommand, ImportCSVCommand
 from app.plugins.plugin_loader import PluginLoader
+from app.tracing import span, trace, traced
 
 logger = logging.getLogger(__name__)
 
+COMMAND_SECONDS = REGISTRY.histogram(
+    "calculator_command_duration_seconds", "Time taken to execute a command", ("command",)
+)
+COMMAND_ERRORS = REGISTRY.counter(
+    "calculator_command_errors_total", "Commands whose output was an error", ("command",)
+)
+
+# Commands available without loading any plugin
+BUILTIN_COMMANDS: Dict[str, Type[Command]] = {
+    # Arithmetic commands
+    "add": AddCommand,
+    "subtract": SubtractCommand,
+    "multiply": MultiplyCommand,
+    "divide": DivideCommand,
+    "vars": VariablesCommand,
+    # History commands
+    "history": HistoryCommand,
+    "clear": ClearHistoryCommand,
+    "delete": DeleteCommand,
+    "undo": UndoCommand,
+    "redo": RedoCommand,
+    "rollup": RollupCommand,
+    # System commands
+    "exit": ExitCommand,
+    "quit": ExitCommand,  # Alias for exit
+    "help": HelpCommand,
+    "reload": ReloadCommand,
+    "metrics": MetricsCommand,
+    "profile": ProfileCommand,
+    "batch": BatchCommand,
+    "verify": VerifyCommand,
+    "export_csv": ExportCSVCommand,
+    "import_csv": ImportCSVCommand,
+}
+
+# "<name> = <command> <args...>" or "<name> = <number>"
+ASSIGNMENT = re.compile(r"^\s*([A-Za-z_][A-Za-z0-9_]*)\s*=(.*)$")
+
 
 class REPL:
     """
@@ -24,9 +80,18 @@ class REPL:
     for interacting with the calculator and its commands.
     """
 
-    def __init__(self):
-        self.calculator = Calculator()
+    def __init__(self, namespace: Optional[str] = None):
+        """
+        Args:
+            namespace: The history namespace of this session
+                (``HISTORY_NAMESPACE``, or the default namespace, by default)
+        """
+        self.calculator = Calculator(namespace or os.getenv("HISTORY_NAMESPACE") or DEFAULT_NAMESPACE)
         self.running = False
+        # Worker pool for CPU-bound commands, started on first use
+        self.process_runner = None
+        # Plugin hot-reload watcher, created on first use
+        self._plugin_watcher = None
 
         # Important: Make sure we're using the plugin manager instance that has plugins registered
         # We'll try to import the pre-configured instance first
@@ -35,41 +100,23 @@ class REPL:
         self._commands = self._register_commands()
 
         # Print registered commands for debugging
-        logger.info(
-            f"REPL initialized with commands: {', '.join(self._commands.keys())}"
-        )
+        logger.info("REPL initialized with commands: %s", ", ".join(self._commands))
 
-    def _register_commands(self) -> Dict[str, Type[Command]]:
-        """Register built-in commands."""
-        commands = {
-            # Arithmetic commands
-            "add": AddCommand,
-            "subtract": SubtractCommand,
-            "multiply": MultiplyCommand,
-            "divide": DivideCommand,
-            # History commands
-            "history": HistoryCommand,
-            "clear": ClearHistoryCommand,
-            "delete": DeleteCommand,
-            # System commands
-            "exit": ExitCommand,
-            "quit": ExitCommand,  # Alias for exit
-            "help": HelpCommand,
-            "export_csv": ExportCSVCommand,
-            "import_csv": ImportCSVCommand,
-        }
+    def _register_commands(self, refresh: bool = False) -> Dict[str, Type[Command]]:
+        """Register built-in commands and plugin commands from the manifest."""
+        commands = dict(BUILTIN_COMMANDS)
 
         # Load plugin commands
         plugin_loader = PluginLoader()
-        plugin_commands = plugin_loader.load_plugins()
+        plugin_commands = plugin_loader.load_plugins(refresh=refresh)
         commands.update(plugin_commands)
 
         return commands
 
     def refresh_commands(self):
         """Refresh commands to include any newly registered plugins."""
-        self._commands = self._register_commands()
-        logger.info(f"Commands refreshed. Total commands: {len(self._commands)}")
+        self._commands = self._register_commands(refresh=True)
+        logger.info("Commands refreshed. Total commands: %d", len(self._commands))
 
     def get_command(self, command_name: str) -> Optional[Command]:
         """
@@ -84,13 +131,57 @@ class REPL:
         command_class = self._commands.get(command_name.lower())
         if command_class:
             # Create a new instance of the command with the calculator
-            return command_class(self.calculator)
+            command = command_class(self.calculator)
+            command.repl = self
+            return command
         return None
 
+    @property
+    def plugin_watcher(self):
+        """The watcher that hot-reloads plugins into this REPL's command table."""
+        if self._plugin_watcher is None:
+            from app.plugins.watcher import PluginWatcher
+
+            self._plugin_watcher = PluginWatcher()
+            self._plugin_watcher.add_listener(self.apply_plugin_changes)
+        return self._plugin_watcher
+
+    def apply_plugin_changes(self, changes) -> None:
+        """
+        Update only the command table entries affected by a plugin reload.
+
+        Args:
+            changes: The ``PluginChanges`` reported by the watcher
+        """
+        plugin_loader = PluginLoader()
+        for name in changes.removed_commands:
+            self._commands.pop(name, None)
+        for name in changes.added_commands + changes.updated_commands:
+            command = plugin_loader.get_command(name)
+            if command is not None:
+                self._commands[name] = command
+        logger.info("Applied plugin changes: %s", changes)
+
+    def get_command_class(self, command_name: str) -> Optional[Type[Command]]:
+        """
+        Get the registered class of a command without instantiating it.
+
+        Plugin commands are returned as lazy stand-ins whose ``help`` can be
+        read without importing the plugin.
+
+        Args:
+            command_name: The name of the command to get
+
+        Returns:
+            The command class if found, otherwise None
+        """
+        return self._commands.get(command_name.lower())
+
     def get_command_list(self):
         """Get a list of all available command names."""
         return sorted(self._commands.keys())
 
+    @traced("REPL.parse_input")
     def parse_input(self, user_input: str) -> tuple:
         """
         Parse user input into command and arguments.
@@ -109,6 +200,86 @@ class REPL:
         args = parts[1:]
         return command_name, args
 
+    def parse_assignment(self, user_input: str) -> Optional[Tuple[str, Optional[str], List[str]]]:
+        """
+        Parse a variable assignment such as ``x = add 2 3`` or ``x = 5``.
+
+        Args:
+            user_input: The raw user input
+
+        Returns:
+            ``(name, operation, args)``, with ``operation`` None when a single
+            value is assigned, or None if the input is not an assignment
+        """
+        match = ASSIGNMENT.match(user_input)
+        if match is None:
+            return None
+        name, parts = match.group(1), match.group(2).split()
+        if len(parts) < 2:
+            return name, None, parts
+        return name, parts[0].lower(), parts[1:]
+
+    def assign(self, name: str, operation: Optional[str], args: List[str]) -> str:
+        """
+        Assign a variable (see ``Calculator.assign``).
+
+        Returns:
+            The variable's new value, or an error message
+        """
+        try:
+            value, recomputed = self.calculator.assign(name, operation, *args)
+        except ValueError as e:
+            return f"Error: {str(e)}"
+        if recomputed:
+            return f"{name} = {value} ({recomputed} dependent{'s' if recomputed != 1 else ''} updated)"
+        return f"{name} = {value}"
+
+    def execute_command(self, command: Command, args: list, in_process: bool = False) -> str:
+        """
+        Execute a command, dispatching CPU-bound commands to worker processes.
+
+        Records a ``command`` event in the event log and the command's
+        latency and status in the metrics registry, and runs in a trace span
+        (the root span of a new trace if none is active).
+
+        Args:
+            command: The command instance to execute
+            args: The arguments for the command
+            in_process: Run CPU-bound commands on this thread too
+
+        Returns:
+            The command output
+        """
+        with trace("REPL.execute_command", command=command.name):
+            start = time.perf_counter()
+            if getattr(command, "cpu_bound", False) and not in_process:
+                if self.process_runner is None:
+                    from app.process_runner import ProcessCommandRunner
+
+                    self.process_runner = ProcessCommandRunner(
+                        history_manager=self.calculator.history_manager
+                    )
+                with span("ProcessCommandRunner.run"):
+                    output = self.process_runner.run(
+                        type(command), *args, history_manager=self.calculator.history_manager
+                    )
+            else:
+                with span(f"{type(command).__name__}.execute"):
+                    output = command.execute(*args)
+            duration = time.perf_counter() - start
+        ok = not str(output).startswith("Error")
+        COMMAND_SECONDS.labels(command.name).observe(duration)
+        if not ok:
+            COMMAND_ERRORS.labels(command.name).inc()
+        get_event_log().record(
+            "command",
+            command=command.name,
+            args=list(args),
+            ok=ok,
+            duration_ms=round(duration * 1000, 3),
+        )
+        return output
+
     def run(self):
         """Run the REPL loop."""
         self.running = True
@@ -118,36 +289,80 @@ class REPL:
         # Print available commands at startup for debugging
         print(f"Available commands: {', '.join(self.get_command_list())}")
 
+        self._start_plugin_auto_reload()
+        metrics_exporter = self._start_metrics_exporter()
+
         while self.running:
             try:
                 # Read
                 user_input = input("> ")
-                # Parse
-                command_name, args = self.parse_input(user_input)
-                if not command_name:
-                    continue
+                with trace("REPL.input"):
+                    assignment = self.parse_assignment(user_input)
+                    if assignment is not None:
+                        print(self.assign(*assignment))
+                        continue
+
+                    # Parse
+                    command_name, args = self.parse_input(user_input)
+                    if not command_name:
+                        continue
 
-                # Get command
-                command = self.get_command(command_name)
-                if not command:
-                    print(f"Unknown command: {command_name}")
-                    print("Type 'help' for a list of commands")
-                    continue
+                    # Get command
+                    command = self.get_command(command_name)
+                    if not command:
+                        print(f"Unknown command: {command_name}")
+                        print("Type 'help' for a list of commands")
+                        continue
 
-                # Execute
-                logger.info(f"Executing command: {command_name} with args: {args}")
-                result = command.execute(*args)
+                    # Execute
+                    logger.debug("Executing command: %s with args: %s", command_name, args)
+                    result = self.execute_command(command, args)
 
-                # Print
-                print(result)
+                    # Print
+                    print(result)
 
             except KeyboardInterrupt:
                 print("\nExiting...")
                 self.running = False
             except Exception as e:
-                logger.error(f"Error in REPL: {str(e)}")
+                logger.error("Error in REPL: %s", str(e))
                 print(f"Error: {str(e)}")
 
+        if self.process_runner is not None:
+            self.process_runner.shutdown()
+            self.process_runner = None
+        if self._plugin_watcher is not None:
+            self._plugin_watcher.stop()
+        if metrics_exporter is not None:
+            metrics_exporter.stop()
+
+    def _start_plugin_auto_reload(self) -> None:
+        """Start watching plugin files if ``PLUGIN_AUTO_RELOAD`` sets an interval."""
+        try:
+            auto_reload = float(os.getenv("PLUGIN_AUTO_RELOAD", "0") or 0)
+        except ValueError:
+            logger.error("Invalid PLUGIN_AUTO_RELOAD %r; plugin auto-reload disabled", os.getenv("PLUGIN_AUTO_RELOAD"))
+            auto_reload = 0
+        if auto_reload > 0:
+            self.plugin_watcher.start(auto_reload)
+
+    @staticmethod
+    def _start_metrics_exporter() -> Optional[MetricsFileExporter]:
+        """Start writing metrics to ``METRICS_FILE``, if it is set."""
+        if not os.getenv("METRICS_FILE"):
+            return None
+        try:
+            metrics_exporter = MetricsFileExporter()
+        except ValueError:
+            logger.warning(
+                "Invalid METRICS_INTERVAL %r; writing metrics every %s seconds",
+                os.getenv("METRICS_INTERVAL"),
+                DEFAULT_METRICS_INTERVAL,
+            )
+            metrics_exporter = MetricsFileExporter(interval=DEFAULT_METRICS_INTERVAL)
+        metrics_exporter.start()
+        return metrics_exporter
+
     def stop(self):
         """Stop the REPL loop."""
         self.running = False
@@ -0,0 +1,321 @@
+# app/shared_history.py
+"""
+Shared-memory export of the live history.
+
+``SharedHistoryPublisher`` keeps the numeric columns of the history in a
+memory-mapped file, so that other processes (e.g. a dashboard) can read new
+entries without re-reading and parsing ``HISTORY_FILE``. Put the file on a
+memory file system (``/dev/shm`` on Linux) to keep it out of the disk
+entirely. The history publishes to ``HISTORY_SHARED_FILE`` when that is set
+(see ``HistoryManager``).
+
+Layout
+------
+A 64-byte header followed by fixed-size records::
+
+    header:  magic (8s) version (u32) record size (u32) capacity (u64)
+             sequence (u64) length (u64) generation (u64), little-endian
+    record:  lhs (f8) rhs (f8) result (f8) operation (u8), padded to 32 bytes
+
+``operation`` indexes ``OPERATIONS``; code 0 stands for every other
+operation (plugin commands). Operands and results that are not numbers are
+NaN.
+
+Consistency
+-----------
+The header is a seqlock. The publisher makes ``sequence`` odd before it
+changes anything and even again afterwards; a reader that sees the same even
+``sequence`` before and after reading has a consistent snapshot, otherwise
+it retries. New entries are appended after ``length`` and never change
+records below it, so the rows of a snapshot stay valid, without copying,
+until ``generation`` changes: it is bumped whenever the history is rewritten
+(cleared, replaced, loaded, or an entry deleted), which overwrites the rows
+in place. Readers must therefore check ``stale()`` after reading the rows of
+a snapshot, and discard what they read if it is True. The file grows by doubling
+its capacity; readers remap it when they see a larger one.
+"""
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import TYPE_CHECKING, Any, NamedTuple, Sequence, Tuple
+
+from app.calculator import OPERATION_SYMBOLS
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["OPERATIONS", "SharedHistoryPublisher", "SharedHistoryReader", "Snapshot"]
+
+MAGIC = b"CALCHIST"
+VERSION = 1
+OPERATIONS = ("other", "add", "subtract", "multiply", "divide")
+DEFAULT_CAPACITY = 4096
+
+HEADER = struct.Struct("<8sIIQQQQ")
+HEADER_SIZE = 64
+RECORD = struct.Struct("<dddB7x")
+# Offsets of the header fields the seqlock protocol updates one at a time
+_U64 = struct.Struct("<Q")
+_CAPACITY_OFFSET = 16
+_SEQUENCE_OFFSET = 24
+_LENGTH_OFFSET = 32
+_GENERATION_OFFSET = 40
+
+# Needed on Windows to open the file without newline translation
+_O_BINARY = getattr(os, "O_BINARY", 0)
+
+_OPERATION_CODES = {name: code for code, name in enumerate(OPERATIONS) if code}
+_NAN = float("nan")
+
+
+def record_dtype() -> "np.dtype":
+    """Return the NumPy dtype of one record."""
+    import numpy as np
+
+    return np.dtype(
+        {
+            "names": ["lhs", "rhs", "result", "operation"],
+            "formats": ["<f8", "<f8", "<f8", "u1"],
+            "offsets": [0, 8, 16, 24],
+            "itemsize": RECORD.size,
+        }
+    )
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return _NAN
+
+
+def _pack_entry(operation: str, expression: str, result: Any) -> bytes:
+    """Return the record of one history entry."""
+    lhs = rhs = _NAN
+    symbol = OPERATION_SYMBOLS.get(operation)
+    if symbol is not None:
+        parts = str(expression).split(f" {symbol} ", 1)
+        if len(parts) == 2:
+            lhs, rhs = _to_float(parts[0]), _to_float(parts[1])
+    return RECORD.pack(lhs, rhs, _to_float(result), _OPERATION_CODES.get(operation, 0))
+
+
+def _frame_records(frame: "pd.DataFrame") -> "np.ndarray":
+    """Return the records of a history DataFrame, computed per operation with pandas."""
+    import numpy as np
+    import pandas as pd
+
+    records = np.zeros(len(frame), dtype=record_dtype())
+    operations = frame["operation"].astype(object).to_numpy()
+    records["result"] = pd.to_numeric(frame["result"], errors="coerce").to_numpy(dtype="float64")
+    records["lhs"] = records["rhs"] = np.nan
+    expressions = frame["expression"].astype(object).fillna("").astype(str)
+    for operation, code in _OPERATION_CODES.items():
+        mask = operations == operation
+        if not mask.any():
+            continue
+        records["operation"][mask] = code
+        parts = expressions[mask].str.split(f" {OPERATION_SYMBOLS[operation]} ", n=1, expand=True, regex=False)
+        parts = parts.reindex(columns=[0, 1])
+        records["lhs"][mask] = pd.to_numeric(parts[0], errors="coerce").to_numpy(dtype="float64")
+        records["rhs"][mask] = pd.to_numeric(parts[1], errors="coerce").to_numpy(dtype="float64")
+    return records
+
+
+class SharedHistoryPublisher:
+    """Writes the history to a shared memory-mapped file (see the module docstring)."""
+
+    def __init__(self, path: str, capacity: int = DEFAULT_CAPACITY):
+        """
+        Args:
+            path: The file to publish to; it is created or truncated
+            capacity: Records the file initially has room for
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC | _O_BINARY, 0o666)
+        self._capacity = capacity
+        os.ftruncate(self._fd, HEADER_SIZE + capacity * RECORD.size)
+        self._map = mmap.mmap(self._fd, 0)
+        self._sequence = 0
+        self._length = 0
+        self._generation = 0
+        HEADER.pack_into(self._map, 0, MAGIC, VERSION, RECORD.size, capacity, 0, 0, 0)
+        logger.info("Publishing history to %s", path)
+
+    @property
+    def length(self) -> int:
+        """The number of published entries."""
+        return self._length
+
+    def _begin(self) -> None:
+        self._sequence += 1
+        _U64.pack_into(self._map, _SEQUENCE_OFFSET, self._sequence)
+
+    def _end(self) -> None:
+        _U64.pack_into(self._map, _LENGTH_OFFSET, self._length)
+        _U64.pack_into(self._map, _GENERATION_OFFSET, self._generation)
+        self._sequence += 1
+        _U64.pack_into(self._map, _SEQUENCE_OFFSET, self._sequence)
+
+    def _reserve(self, length: int) -> None:
+        """Grow the file to hold ``length`` records. Must be called inside ``_begin``/``_end``."""
+        if length <= self._capacity:
+            return
+        capacity = self._capacity
+        while capacity < length:
+            capacity *= 2
+        self._map.close()
+        os.ftruncate(self._fd, HEADER_SIZE + capacity * RECORD.size)
+        self._map = mmap.mmap(self._fd, 0)
+        self._capacity = capacity
+        _U64.pack_into(self._map, _CAPACITY_OFFSET, capacity)
+        logger.debug("Grew shared history %s to %d records", self.path, capacity)
+
+    def append(self, entries: Sequence[Tuple[str, str, Any]]) -> None:
+        """
+        Publish new entries after the published ones.
+
+        Args:
+            entries: (operation, expression, result) tuples in order
+        """
+        if not entries:
+            return
+        with self._lock:
+            self._begin()
+            try:
+                self._reserve(self._length + len(entries))
+                offset = HEADER_SIZE + self._length * RECORD.size
+                self._map[offset:offset + len(entries) * RECORD.size] = b"".join(
+                    _pack_entry(*entry) for entry in entries
+                )
+                self._length += len(entries)
+            finally:
+                self._end()
+
+    def publish(self, frame: "pd.DataFrame", start: int = 0) -> None:
+        """
+        Publish a history DataFrame.
+
+        Args:
+            frame: The whole history
+            start: Entries before this position are already published and
+                unchanged; 0 rewrites everything and bumps the generation
+        """
+        records = _frame_records(frame.iloc[start:])
+        with self._lock:
+            self._begin()
+            try:
+                if start == 0:
+                    self._generation += 1
+                self._reserve(start + len(records))
+                offset = HEADER_SIZE + start * RECORD.size
+                self._map[offset:offset + records.nbytes] = records.tobytes()
+                self._length = start + len(records)
+            finally:
+                self._end()
+
+    def close(self) -> None:
+        """Unmap and close the file (readers keep their own mappings)."""
+        with self._lock:
+            if not self._map.closed:
+                self._map.close()
+                os.close(self._fd)
+
+
+class Snapshot(NamedTuple):
+    """A consistent view of the published history."""
+
+    sequence: int
+    generation: int
+    rows: "np.ndarray"
+
+
+class SharedHistoryReader:
+    """Maps a published history read-only and takes consistent snapshots of it."""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: The file a ``SharedHistoryPublisher`` writes
+
+        Raises:
+            OSError: If the file cannot be opened
+            ValueError: If it is not a published history
+        """
+        self.path = path
+        self._fd = os.open(path, os.O_RDONLY | _O_BINARY)
+        try:
+            self._map = mmap.mmap(self._fd, 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            os.close(self._fd)
+            raise
+        magic, version, record_size = HEADER.unpack_from(self._map, 0)[:3]
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is not a shared history file")
+        self._dtype = record_dtype()
+
+    def _header(self) -> Tuple[int, int, int, int]:
+        capacity, sequence, length, generation = HEADER.unpack_from(self._map, 0)[3:]
+        return sequence, length, generation, capacity
+
+    @property
+    def sequence(self) -> int:
+        """The current sequence number; it changes whenever the history does."""
+        return _U64.unpack_from(self._map, _SEQUENCE_OFFSET)[0]
+
+    def snapshot(self, timeout: float = 1.0) -> Snapshot:
+        """
+        Take a consistent snapshot of the published entries.
+
+        The rows are a read-only view into the shared mapping, not a copy.
+        A rewrite of the history overwrites them in place, so values read
+        from them are only valid if ``stale(snapshot)`` is still False after
+        they were read (copy the rows first to keep them).
+
+        Args:
+            timeout: Seconds to keep retrying while the publisher is writing
+
+        Raises:
+            TimeoutError: If no consistent snapshot could be taken in time
+        """
+        import numpy as np
+
+        deadline = time.monotonic() + timeout
+        while True:
+            sequence, length, generation, capacity = self._header()
+            if not sequence % 2:
+                if HEADER_SIZE + capacity * RECORD.size > len(self._map):
+                    self._remap()
+                    continue
+                rows = np.frombuffer(self._map, dtype=self._dtype, count=length, offset=HEADER_SIZE)
+                if self.sequence == sequence:
+                    return Snapshot(sequence, generation, rows)
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"No consistent snapshot of {self.path} within {timeout}s")
+            time.sleep(0)
+
+    def stale(self, snapshot: Snapshot) -> bool:
+        """Whether the history was rewritten since ``snapshot``, invalidating its rows."""
+        return _U64.unpack_from(self._map, _GENERATION_OFFSET)[0] != snapshot.generation
+
+    def _remap(self) -> None:
+        # Views from earlier snapshots keep the old mapping alive until released
+        self._map = mmap.mmap(self._fd, 0, access=mmap.ACCESS_READ)
+
+    def close(self) -> None:
+        """Close the file; the mapping is released once no snapshot uses it."""
+        os.close(self._fd)
+
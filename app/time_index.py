@@ -0,0 +1,107 @@
+# app/time_index.py
+"""
+Time-window lookups over the ``timestamp`` column of a history.
+
+History timestamps are int64 nanoseconds since the Unix epoch, kept
+non-decreasing as entries are added (see ``HistoryManager``), so a window is
+found with two binary searches of the column itself, without copying it or
+reading the rows outside the window. A history whose timestamps are out of
+order (e.g. after merging another machine's history) falls back to a sorted
+permutation of the column, computed once and kept until the history changes.
+
+0 stands for an unknown time, e.g. entries read from files written before
+timestamps were recorded.
+"""
+import re
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+__all__ = ["TimeIndex", "parse_duration"]
+
+NANOSECONDS = {"ms": 1_000_000, "s": 1_000_000_000, "m": 60_000_000_000, "h": 3_600_000_000_000, "d": 86_400_000_000_000}
+
+_DURATION = re.compile(r"^(\d+(?:\.\d+)?)(ms|s|m|h|d)?$")
+
+
+def parse_duration(text: str) -> int:
+    """
+    Parse a duration such as ``90s``, ``5m``, ``1.5h`` or ``2d`` (seconds without a unit).
+
+    Returns:
+        The duration in nanoseconds
+
+    Raises:
+        ValueError: If the text is not a positive duration
+    """
+    match = _DURATION.match(text.strip().lower())
+    duration = int(float(match.group(1)) * NANOSECONDS[match.group(2) or "s"]) if match else 0
+    if duration <= 0:
+        raise ValueError(f"Invalid duration: {text!r} (e.g. 30s, 5m, 1h, 1d)")
+    return duration
+
+
+class TimeIndex:
+    """Binary-search index over a history's timestamp column."""
+
+    def __init__(self, timestamps: "np.ndarray"):
+        """
+        Args:
+            timestamps: The whole timestamp column
+        """
+        self.length = 0
+        self.monotonic = True
+        self._last = None
+        # Positions in timestamp order and the sorted timestamps, for a
+        # column that is out of order
+        self._order = None
+        self._sorted = None
+        self.extend(timestamps)
+
+    def extend(self, timestamps: "np.ndarray") -> None:
+        """
+        Take in rows appended to the column since the last call.
+
+        Only the new rows are examined.
+
+        Args:
+            timestamps: The whole timestamp column, including the new rows
+        """
+        new = timestamps[self.length:]
+        if not new.size:
+            return
+        if self.monotonic and (
+            (self._last is not None and new[0] < self._last) or bool((new[1:] < new[:-1]).any())
+        ):
+            self.monotonic = False
+        self._order = None
+        self._last = new[-1] if self._last is None else max(self._last, new[-1])
+        self.length = len(timestamps)
+
+    def positions(self, timestamps: "np.ndarray", start: Optional[int] = None, end: Optional[int] = None):
+        """
+        Find the rows with ``start <= timestamp < end``.
+
+        Args:
+            timestamps: The whole timestamp column
+            start: Window start in nanoseconds, or None for no lower bound
+            end: Window end in nanoseconds, or None for no upper bound
+
+        Returns:
+            A slice of the rows when the column is in order, else an array
+            of their positions in row order
+        """
+        import numpy as np
+
+        if self.monotonic:
+            low = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+            high = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, side="left"))
+            return slice(low, max(low, high))
+        if self._order is None:
+            self._order = np.argsort(timestamps, kind="stable")
+            self._sorted = timestamps[self._order]
+        ordered = self._sorted
+        low = 0 if start is None else int(np.searchsorted(ordered, start, side="left"))
+        high = len(ordered) if end is None else int(np.searchsorted(ordered, end, side="left"))
+        return np.sort(self._order[low:max(low, high)])
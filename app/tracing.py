@@ -0,0 +1,236 @@
+# app/tracing.py
+"""
+Lightweight in-process tracing.
+
+A trace is a tree of timed spans, e.g. a REPL command and, nested inside it,
+the command's ``execute``, ``Calculator.calculate``, the expression formatting,
+``HistoryManager.add_entry`` and autosave. ``trace()`` opens a root span (or a
+child span when a trace is already active) and decides whether to sample it;
+``span()`` and the ``@traced`` decorator open child spans only while a sampled
+trace is active in the current context (``contextvars``), so they cost a single
+context variable lookup otherwise.
+
+Traces are sampled with probability ``TRACE_SAMPLE_RATE`` (default 0, which
+disables tracing) and appended to ``TRACE_FILE`` (default
+``logs/trace.json``) when their root span ends, in the Chrome trace-event JSON
+array format, which chrome://tracing, Perfetto and speedscope open directly.
+The array is left unterminated so events can be appended across runs; the viewers accept that.
+"""
+import atexit
+import contextvars
+import functools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["Tracer", "get_tracer", "span", "trace", "traced"]
+
+DEFAULT_TRACE_FILE = os.path.join("logs", "trace.json")
+DEFAULT_SAMPLE_RATE = 0.0
+
+_current: contextvars.ContextVar = contextvars.ContextVar("trace_span", default=None)
+
+
+class _NoopSpan:
+    """Returned instead of a span when nothing is being traced."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    """A timed span, recorded as a Chrome "complete" event when it ends."""
+
+    __slots__ = ("tracer", "name", "args", "root", "start", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, args: Dict[str, Any], root: bool = False):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.root = root
+        self.start = None
+        self._token = None
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        _current.reset(self._token)
+        if exc is not None:
+            self.args["error"] = str(exc)
+        self.tracer._record(self, end)
+        return False
+
+
+class Tracer:
+    """Samples traces and writes their spans as Chrome trace events."""
+
+    # The process-wide tracer (see get_tracer)
+    _instance = None
+
+    def __init__(self, path: Optional[str] = None, sample_rate: Optional[float] = None):
+        """
+        Args:
+            path: The trace file (``TRACE_FILE`` by default)
+            sample_rate: Fraction of traces recorded (``TRACE_SAMPLE_RATE`` by default)
+        """
+        if path is None:
+            path = os.getenv("TRACE_FILE", DEFAULT_TRACE_FILE)
+        if sample_rate is None:
+            sample_rate = float(os.getenv("TRACE_SAMPLE_RATE", str(DEFAULT_SAMPLE_RATE)))
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.path = path
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._pending: List[str] = []
+        self._pid = os.getpid()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any trace can be sampled."""
+        return bool(self.path) and self.sample_rate > 0
+
+    def trace(self, name: str, **args: Any):
+        """
+        Open a root span, or a child span if a trace is already active.
+
+        Args:
+            name: The span name
+            **args: JSON-serializable details shown with the span
+
+        Returns:
+            A context manager
+        """
+        parent = _current.get()
+        if parent is not None:
+            return _Span(parent.tracer, name, args)
+        if not self.enabled or (self.sample_rate < 1 and random.random() >= self.sample_rate):
+            return _NOOP
+        return _Span(self, name, args, root=True)
+
+    def _record(self, span: _Span, end: int) -> None:
+        event = {
+            "name": span.name,
+            "cat": "calculator",
+            "ph": "X",
+            "ts": span.start / 1000,
+            "dur": (end - span.start) / 1000,
+            "pid": self._pid,
+            "tid": threading.get_ident(),
+        }
+        if span.args:
+            event["args"] = span.args
+        line = json.dumps(event, default=str)
+        with self._lock:
+            self._pending.append(line)
+        # A trace is written as soon as it ends, so none is lost to a crash
+        if span.root:
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Append pending events to the trace file.
+
+        Returns:
+            The number of events written
+        """
+        with self._lock:
+            lines, self._pending = self._pending, []
+            if not lines:
+                return 0
+            try:
+                directory = os.path.dirname(self.path)
+                if directory and not os.path.exists(directory):
+                    os.makedirs(directory)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    if f.tell() == 0:
+                        f.write("[\n")
+                    f.write(",\n".join(lines) + ",\n")
+            except OSError as e:
+                logger.error("Failed to write %d trace events to %s: %s", len(lines), self.path, str(e))
+                return 0
+        return len(lines)
+
+
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """
+    Return the process-wide tracer, configured from the environment on first use.
+
+    An invalid ``TRACE_SAMPLE_RATE`` is logged once and replaced by the
+    default, so that it cannot make every traced call fail.
+    """
+    if Tracer._instance is None:
+        with _tracer_lock:
+            if Tracer._instance is None:
+                try:
+                    tracer = Tracer()
+                except ValueError:
+                    logger.warning(
+                        "Invalid TRACE_SAMPLE_RATE %r; using %s",
+                        os.getenv("TRACE_SAMPLE_RATE"),
+                        DEFAULT_SAMPLE_RATE,
+                    )
+                    tracer = Tracer(sample_rate=DEFAULT_SAMPLE_RATE)
+                atexit.register(tracer.flush)
+                Tracer._instance = tracer
+    return Tracer._instance
+
+
+def trace(name: str, **args: Any):
+    """Open a root span on the process-wide tracer (see ``Tracer.trace``)."""
+    return get_tracer().trace(name, **args)
+
+
+def span(name: str, **args: Any):
+    """
+    Open a child span if a sampled trace is active, otherwise do nothing.
+
+    Args:
+        name: The span name
+        **args: JSON-serializable details shown with the span
+
+    Returns:
+        A context manager
+    """
+    parent = _current.get()
+    if parent is None:
+        return _NOOP
+    return _Span(parent.tracer, name, args)
+
+
+def traced(name: str) -> Callable:
+    """Decorate a function to run in a child span named ``name`` while a trace is active."""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            parent = _current.get()
+            if parent is None:
+                return func(*args, **kwargs)
+            with _Span(parent.tracer, name, {}):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,256 @@
+# app/undo_log.py
+"""
+Undo and redo of history changes.
+
+Instead of snapshotting the history before every change, ``HistoryManager``
+records in an ``UndoLog`` the inverse of each change. Each inverse is sized
+by the change, not by the history:
+
+* adding or merging entries records how many rows were appended
+  (``Truncate``)
+* deleting an entry records its position and the deleted row (``Insert``)
+* replacing the history (``clear``, ``import_csv``, ``set_history`` and
+  ``load_history``) spills the replaced history to a file and records its
+  path (``Restore``), so the replaced rows do not stay in memory
+
+Applying an inverse to the history returns the inverse of that, which goes
+on the redo stack (and back on the undo stack when redone). A new change
+empties the redo stack.
+
+At most ``UNDO_LIMIT`` changes (default 100) are kept; the oldest are
+forgotten first. Spilled histories go to ``UNDO_SPILL_DIR`` (default: a
+temporary directory removed at exit), and their files are deleted as soon as
+their change is forgotten.
+"""
+import atexit
+import itertools
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Optional, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["Insert", "Restore", "Truncate", "UndoLog"]
+
+DEFAULT_UNDO_LIMIT = 100
+
+
+class Inverse(ABC):
+    """A change to the history that reverts an earlier change."""
+
+    @abstractmethod
+    def apply(self, frame: "pd.DataFrame", log: "UndoLog") -> Tuple["pd.DataFrame", "Inverse", int]:
+        """
+        Apply the change to a history.
+
+        Args:
+            frame: The current history
+            log: The log, for spilling
+
+        Returns:
+            The new history, the inverse of this change, and the number of
+            leading rows left unchanged
+        """
+
+    def discard(self) -> None:
+        """Release what the change holds once it can no longer be applied."""
+
+
+class Truncate(Inverse):
+    """Remove the last ``count`` rows, reverting an append."""
+
+    def __init__(self, count: int):
+        self.count = count
+
+    def apply(self, frame, log):
+        keep = max(len(frame) - self.count, 0)
+        return frame.iloc[:keep].reset_index(drop=True), Append(frame.iloc[keep:]), keep
+
+
+class Append(Inverse):
+    """Append rows, reverting a ``Truncate``."""
+
+    def __init__(self, rows: "pd.DataFrame"):
+        self.rows = rows
+
+    def apply(self, frame, log):
+        import pandas as pd
+
+        rows = self.rows.reindex(columns=frame.columns)
+        history = rows.reset_index(drop=True) if frame.empty else pd.concat([frame, rows], ignore_index=True)
+        return history, Truncate(len(rows)), len(frame)
+
+
+class Insert(Inverse):
+    """Insert a row at a position, reverting its deletion."""
+
+    def __init__(self, index: int, row: "pd.DataFrame"):
+        self.index = index
+        self.row = row
+
+    def apply(self, frame, log):
+        import pandas as pd
+
+        index = min(self.index, len(frame))
+        row = self.row.reindex(columns=frame.columns)
+        history = pd.concat([frame.iloc[:index], row, frame.iloc[index:]], ignore_index=True)
+        return history, Remove(index), index
+
+
+class Remove(Inverse):
+    """Delete the row at a position, reverting an ``Insert``."""
+
+    def __init__(self, index: int):
+        self.index = index
+
+    def apply(self, frame, log):
+        history = frame.drop(frame.index[self.index]).reset_index(drop=True)
+        return history, Insert(self.index, frame.iloc[self.index:self.index + 1]), self.index
+
+
+class Restore(Inverse):
+    """Replace the history by one spilled to a file, reverting a replacement."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def apply(self, frame, log):
+        import pandas as pd
+
+        history = pd.read_pickle(self.path)
+        # Emptying the restored history reverts restoring it into an empty one
+        inverse = Truncate(len(history)) if frame.empty else log.spill(frame)
+        self.discard()
+        return history, inverse, 0
+
+    def discard(self) -> None:
+        try:
+            os.remove(self.path)
+        except OSError as e:
+            logger.warning("Could not remove undo file %s: %s", self.path, str(e))
+
+
+class UndoLog:
+    """Bounded undo and redo stacks of ``(label, inverse)`` pairs."""
+
+    def __init__(self, limit: Optional[int] = None, spill_dir: Optional[str] = None):
+        """
+        Args:
+            limit: Changes kept (``UNDO_LIMIT`` by default); 0 disables undo
+            spill_dir: Directory of spilled histories (``UNDO_SPILL_DIR``, or
+                a temporary directory, by default)
+        """
+        if limit is None:
+            limit = int(os.getenv("UNDO_LIMIT", str(DEFAULT_UNDO_LIMIT)))
+        self.limit = max(limit, 0)
+        self._spill_dir = spill_dir if spill_dir is not None else os.getenv("UNDO_SPILL_DIR", "")
+        self._lock = threading.Lock()
+        self._undo: Deque[Tuple[str, Inverse]] = deque()
+        self._redo: Deque[Tuple[str, Inverse]] = deque()
+        self._spill_ids = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._undo)
+
+    def redo_count(self) -> int:
+        """Return the number of changes that can be redone."""
+        return len(self._redo)
+
+    def record(self, label: str, inverse: Inverse) -> None:
+        """
+        Record the inverse of a new change, forgetting the redo stack.
+
+        Args:
+            label: What the change was, e.g. ``delete``
+            inverse: How to revert it
+        """
+        with self._lock:
+            self._discard_all(self._redo)
+            self._undo.append((label, inverse))
+            while len(self._undo) > self.limit:
+                self._undo.popleft()[1].discard()
+
+    def record_replacement(self, label: str, frame: "pd.DataFrame", length: int) -> None:
+        """
+        Record a change that replaces a whole history, spilling the replaced one.
+
+        Replacing an empty history is recorded as an append instead. If the
+        replaced history cannot be spilled, every recorded change is
+        forgotten, since none could be reverted past this one.
+
+        Args:
+            label: What the change was, e.g. ``clear``
+            frame: The replaced history
+            length: The number of entries of the new history
+        """
+        if not self.limit:
+            return
+        if frame.empty:
+            self.record(label, Truncate(length))
+            return
+        try:
+            inverse = self.spill(frame)
+        except OSError as e:
+            logger.error("Could not save the history for undo: %s", str(e))
+            self.clear()
+            return
+        self.record(label, inverse)
+
+    def spill(self, frame: "pd.DataFrame") -> Restore:
+        """
+        Write a history to a file of the spill directory.
+
+        Returns:
+            The ``Restore`` that reads it back
+
+        Raises:
+            OSError: If the file cannot be written
+        """
+        with self._lock:
+            if not self._spill_dir:
+                self._spill_dir = tempfile.mkdtemp(prefix="calculator-undo-")
+                atexit.register(shutil.rmtree, self._spill_dir, True)
+            os.makedirs(self._spill_dir, exist_ok=True)
+            path = os.path.join(self._spill_dir, f"{os.getpid()}-{id(self):x}-{next(self._spill_ids)}.pkl")
+        frame.to_pickle(path)
+        logger.debug("Spilled %d history entries to %s", len(frame), path)
+        return Restore(path)
+
+    def pop_undo(self) -> Optional[Tuple[str, Inverse]]:
+        """Remove and return the most recent change, or None."""
+        with self._lock:
+            return self._undo.pop() if self._undo else None
+
+    def pop_redo(self) -> Optional[Tuple[str, Inverse]]:
+        """Remove and return the most recently undone change, or None."""
+        with self._lock:
+            return self._redo.pop() if self._redo else None
+
+    def push_undo(self, label: str, inverse: Inverse) -> None:
+        """Put back a redone change, keeping the redo stack."""
+        with self._lock:
+            self._undo.append((label, inverse))
+
+    def push_redo(self, label: str, inverse: Inverse) -> None:
+        """Record an undone change so it can be redone."""
+        with self._lock:
+            self._redo.append((label, inverse))
+
+    def clear(self) -> None:
+        """Forget every change."""
+        with self._lock:
+            self._discard_all(self._undo)
+            self._discard_all(self._redo)
+
+    @staticmethod
+    def _discard_all(changes: Deque[Tuple[str, Inverse]]) -> None:
+        while changes:
+            changes.pop()[1].discard()
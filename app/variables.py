@@ -0,0 +1,215 @@
+# app/variables.py
+"""
+Named variables with dependency tracking.
+
+A variable holds either a constant (``x = 5``) or a formula: a binary
+operation whose operands are numbers or other variables
+(``y = multiply x 4``). The graph keeps, for every variable, the variables
+computed from it, so assigning a variable recomputes only what lies
+downstream of it, in topological order; every other value is served from
+its cache. Propagation also stops at variables whose recomputed value did
+not change.
+
+Formulas may only refer to variables that already exist, and a
+reassignment that would make a variable depend on itself is rejected, so
+the graph never has cycles. A formula that fails (e.g. a division by zero)
+leaves its variable, and everything computed from it, without a value until
+an input changes again.
+"""
+import logging
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["VariableGraph", "validate_name"]
+
+Operand = Union[float, str]
+Formula = Tuple[str, Tuple[Operand, ...]]
+
+_VALID_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def validate_name(name: str) -> str:
+    """
+    Check that a name can be used for a variable.
+
+    Returns:
+        The name
+
+    Raises:
+        ValueError: If the name is not an identifier, or would read as a number
+            (``inf``, ``nan``, ...)
+    """
+    if not _VALID_NAME.match(name):
+        raise ValueError(f"Invalid variable name: {name!r}")
+    try:
+        float(name)
+    except ValueError:
+        return name
+    raise ValueError(f"Invalid variable name: {name!r}")
+
+
+class VariableGraph:
+    """Variables of one calculator and the dependencies between them."""
+
+    def __init__(self, evaluate: Callable[..., float]):
+        """
+        Args:
+            evaluate: Computes ``evaluate(operation, *values)`` when a formula
+                is recomputed, raising ValueError if it fails
+        """
+        self._evaluate = evaluate
+        # None for constants
+        self._formulas: Dict[str, Optional[Formula]] = {}
+        self._values: Dict[str, float] = {}
+        self._errors: Dict[str, str] = {}
+        # Edges both ways: the variables each formula reads, and the
+        # formulas reading each variable
+        self._inputs: Dict[str, Tuple[str, ...]] = {}
+        self._dependents: Dict[str, Set[str]] = {}
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._formulas
+
+    def __len__(self) -> int:
+        return len(self._formulas)
+
+    def names(self) -> List[str]:
+        """Return the variable names in definition order."""
+        return list(self._formulas)
+
+    def value(self, name: str) -> float:
+        """
+        Return the cached value of a variable.
+
+        Raises:
+            ValueError: If the variable does not exist or its formula failed
+        """
+        try:
+            return self._values[name]
+        except KeyError:
+            pass
+        if name in self._errors:
+            raise ValueError(f"Variable {name} has no value: {self._errors[name]}")
+        raise ValueError(f"Unknown variable: {name}")
+
+    def describe(self, name: str, symbols: Optional[Dict[str, str]] = None) -> str:
+        """
+        Return a line showing a variable's formula and value.
+
+        Args:
+            name: The variable
+            symbols: Operator symbol of each operation, for display
+
+        Raises:
+            KeyError: If the variable does not exist
+        """
+        formula = self._formulas[name]
+        value = self._values.get(name, f"<error: {self._errors.get(name)}>")
+        if formula is None:
+            return f"{name} = {value}"
+        operation, operands = formula
+        symbol = (symbols or {}).get(operation, operation)
+        return f"{name} = {operands[0]} {symbol} {operands[1]} = {value}"
+
+    def parse_operand(self, operand: str) -> Operand:
+        """
+        Parse a formula operand: an existing variable's name, or a number.
+
+        Raises:
+            ValueError: If the operand is neither
+        """
+        if operand in self._formulas:
+            return operand
+        try:
+            return float(operand)
+        except ValueError:
+            raise ValueError(f"Unknown variable: {operand}") from None
+
+    def resolve(self, operand: Operand) -> Operand:
+        """Return a variable's value if ``operand`` names one, else ``operand`` unchanged."""
+        if isinstance(operand, str) and operand in self._formulas:
+            return self.value(operand)
+        return operand
+
+    def define(self, name: str, formula: Optional[Formula], value: float) -> int:
+        """
+        Assign a variable and recompute the variables downstream of it.
+
+        Args:
+            name: The variable (created if new)
+            formula: ``(operation, operands)`` with operands as returned by
+                ``parse_operand``, or None for a constant
+            value: The variable's new value, already computed by the caller
+
+        Returns:
+            The number of downstream variables recomputed
+
+        Raises:
+            ValueError: If the name is invalid or the formula would make the
+                variable depend on itself; nothing is changed then
+        """
+        validate_name(name)
+        refs = tuple(dict.fromkeys(op for op in formula[1] if isinstance(op, str))) if formula else ()
+        downstream = self._downstream(name)
+        if name in refs or any(ref in downstream for ref in refs):
+            raise ValueError(f"Circular reference: {name} cannot depend on itself")
+
+        for ref in self._inputs.get(name, ()):
+            self._dependents[ref].discard(name)
+        for ref in refs:
+            self._dependents.setdefault(ref, set()).add(name)
+        self._inputs[name] = refs
+        self._formulas[name] = formula
+        changed = self._values.get(name) != value or name in self._errors
+        self._values[name] = value
+        self._errors.pop(name, None)
+
+        recomputed = self._propagate(downstream, {name} if changed else set())
+        logger.debug("Assigned %s = %s; recomputed %d dependents", name, value, recomputed)
+        return recomputed
+
+    def _downstream(self, name: str) -> List[str]:
+        """Return the variables computed from ``name``, directly or not, in topological order."""
+        order = []
+        visited = {name}
+        # Iterative depth-first search: long chains must not hit the recursion limit
+        stack = [(name, iter(self._dependents.get(name, ())))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if child not in visited:
+                    visited.add(child)
+                    stack.append((child, iter(self._dependents.get(child, ()))))
+                    break
+            else:
+                stack.pop()
+                order.append(node)
+        order.pop()  # ``name`` itself, finished last
+        order.reverse()
+        return order
+
+    def _propagate(self, order: Iterable[str], changed: Set[str]) -> int:
+        """Recompute, in ``order``, the variables that read a changed variable."""
+        recomputed = 0
+        for node in order:
+            inputs = self._inputs[node]
+            if not any(ref in changed for ref in inputs):
+                continue
+            recomputed += 1
+            old_value = self._values.pop(node, None)
+            had_error = self._errors.pop(node, None) is not None
+            failed = [ref for ref in inputs if ref in self._errors]
+            if failed:
+                self._errors[node] = f"{failed[0]} has no value"
+            else:
+                operation, operands = self._formulas[node]
+                values = [self._values[op] if isinstance(op, str) else op for op in operands]
+                try:
+                    self._values[node] = self._evaluate(operation, *values)
+                except ValueError as e:
+                    self._errors[node] = str(e)
+            if self._values.get(node) != old_value or had_error or node in self._errors:
+                changed.add(node)
+        return recomputed
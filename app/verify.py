@@ -0,0 +1,302 @@
+# app/verify.py
+"""
+Verification of history files.
+
+Re-checks that every row of a history CSV evaluates to its stored result,
+without going through ``Calculator.calculate`` and without touching
+``HistoryManager``. The operands are parsed out of each ``expression`` (as
+written by ``Calculator._format_expression``) and every operation is
+recomputed for all its rows at once with NumPy.
+
+Files are read in chunks of ``VERIFY_CHUNK_ROWS`` rows (default 100,000).
+Files of more than one chunk are verified by a pool of ``VERIFY_WORKERS``
+processes (default: the number of CPUs).
+
+Problems are reported by file line number (the header is line 1):
+
+* mismatches: the recomputed result differs from the stored one by more
+  than a relative tolerance
+* non-finite values: an operand, the stored or the recomputed result is NaN
+  or infinite
+* parse failures: an operand or the result is not a number, or the
+  expression does not have the form ``<a> <symbol> <b>``
+
+Rows of operations other than the four basic ones (e.g. plugin commands) are
+counted as skipped.
+
+Usage:
+    python -m app.verify history.csv [--workers N] [--chunk-rows N] [--limit 20]
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+from app.calculator import OPERATION_SYMBOLS
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["format_report", "has_issues", "verify_file", "verify_frame"]
+
+DEFAULT_CHUNK_ROWS = 100_000
+DEFAULT_RTOL = 1e-9
+DEFAULT_LIMIT = 20
+ISSUE_KINDS = ("mismatches", "non_finite", "parse_failures")
+
+# NumPy ufunc name of each basic operation
+_UFUNCS = {"add": "add", "subtract": "subtract", "multiply": "multiply", "divide": "true_divide"}
+_NAN_TEXT = ("nan", "+nan", "-nan")
+
+
+def _empty_report() -> Dict[str, Any]:
+    return {"rows": 0, "checked": 0, "skipped": {}, **{kind: [] for kind in ISSUE_KINDS}}
+
+
+def _parse_numbers(text: "pd.Series") -> Tuple["pd.Series", "pd.Series"]:
+    """Parse a column of numbers; return the values and a mask of unparsable entries."""
+    import pandas as pd
+
+    text = text.fillna("").str.strip()
+    values = pd.to_numeric(text, errors="coerce")
+    failed = values.isna() & ~text.str.lower().isin(_NAN_TEXT)
+    return values.astype("float64"), failed
+
+
+def verify_frame(frame: "pd.DataFrame", first_line: int = 2, rtol: float = DEFAULT_RTOL) -> Dict[str, Any]:
+    """
+    Verify history rows held as text.
+
+    Args:
+        frame: ``operation``, ``expression`` and ``result`` columns as strings
+        first_line: The file line number of the first row
+        rtol: Relative tolerance for matching results
+
+    Returns:
+        A report: ``rows``, ``checked``, ``skipped`` (rows per unsupported
+        operation) and the ``mismatches``, ``non_finite`` and
+        ``parse_failures`` found, each a list of dicts with a ``line``
+    """
+    import numpy as np
+
+    report = _empty_report()
+    report["rows"] = len(frame)
+    frame = frame.reset_index(drop=True)
+    operations = frame["operation"].fillna("").str.strip().str.lower()
+    lines = np.arange(len(frame)) + first_line
+
+    unsupported = operations[~operations.isin(list(OPERATION_SYMBOLS))]
+    report["skipped"] = {op: int(count) for op, count in unsupported.value_counts().items()}
+
+    for operation, symbol in OPERATION_SYMBOLS.items():
+        mask = (operations == operation).to_numpy()
+        if not mask.any():
+            continue
+        rows = frame[mask]
+        row_lines = lines[mask]
+        parts = rows["expression"].fillna("").str.split(f" {symbol} ", n=1, expand=True, regex=False)
+        parts = parts.reindex(columns=[0, 1])
+        lhs, lhs_failed = _parse_numbers(parts[0])
+        rhs, rhs_failed = _parse_numbers(parts[1])
+        stored, stored_failed = _parse_numbers(rows["result"])
+
+        lhs_failed, rhs_failed, stored_failed = (
+            lhs_failed.to_numpy(), rhs_failed.to_numpy(), stored_failed.to_numpy()
+        )
+        failed = lhs_failed | rhs_failed | stored_failed
+        for position in np.flatnonzero(failed):
+            fields = [
+                name
+                for name, flags in (
+                    ("left operand", lhs_failed),
+                    ("right operand", rhs_failed),
+                    ("result", stored_failed),
+                )
+                if flags[position]
+            ]
+            report["parse_failures"].append(
+                {
+                    "line": int(row_lines[position]),
+                    "operation": operation,
+                    "expression": rows["expression"].iloc[position],
+                    "result": rows["result"].iloc[position],
+                    "reason": f"unparsable {', '.join(fields)}",
+                }
+            )
+        valid = ~failed
+
+        lhs, rhs, stored = lhs.to_numpy(), rhs.to_numpy(), stored.to_numpy()
+        with np.errstate(all="ignore"):
+            expected = getattr(np, _UFUNCS[operation])(lhs, rhs)
+            finite = np.isfinite(lhs) & np.isfinite(rhs) & np.isfinite(stored) & np.isfinite(expected)
+            matches = np.isclose(stored, expected, rtol=rtol, atol=0)
+        report["checked"] += int(valid.sum())
+
+        for kind, flagged in (("non_finite", valid & ~finite), ("mismatches", valid & finite & ~matches)):
+            for position in np.flatnonzero(flagged):
+                report[kind].append(
+                    {
+                        "line": int(row_lines[position]),
+                        "operation": operation,
+                        "expression": rows["expression"].iloc[position],
+                        "result": rows["result"].iloc[position],
+                        "expected": float(expected[position]),
+                    }
+                )
+    return report
+
+
+def _verify_chunk(frame: "pd.DataFrame", first_line: int, rtol: float) -> Dict[str, Any]:
+    """Worker entry point (a module-level function, so it can be pickled)."""
+    return verify_frame(frame, first_line, rtol)
+
+
+def _merge(total: Dict[str, Any], report: Dict[str, Any]) -> None:
+    total["rows"] += report["rows"]
+    total["checked"] += report["checked"]
+    for operation, count in report["skipped"].items():
+        total["skipped"][operation] = total["skipped"].get(operation, 0) + count
+    for kind in ISSUE_KINDS:
+        total[kind].extend(report[kind])
+
+
+def _read_chunks(path: str, chunk_rows: int) -> Iterator[Tuple["pd.DataFrame", int]]:
+    """Yield ``(chunk, first line number)`` pairs of a history CSV read as text."""
+    import pandas as pd
+
+    first_line = 2
+    reader = pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunk_rows)
+    with reader:
+        for chunk in reader:
+            missing = [column for column in ("operation", "expression", "result") if column not in chunk.columns]
+            if missing:
+                raise ValueError(f"History file missing columns: {', '.join(missing)}")
+            yield chunk, first_line
+            first_line += len(chunk)
+
+
+def verify_file(
+    path: str,
+    chunk_rows: Optional[int] = None,
+    workers: Optional[int] = None,
+    rtol: float = DEFAULT_RTOL,
+) -> Dict[str, Any]:
+    """
+    Verify a history CSV file.
+
+    Args:
+        path: The CSV file
+        chunk_rows: Rows per chunk (``VERIFY_CHUNK_ROWS`` by default)
+        workers: Worker processes for files of several chunks
+            (``VERIFY_WORKERS``, or the number of CPUs, by default); 1
+            verifies everything in this process
+        rtol: Relative tolerance for matching results
+
+    Returns:
+        The merged report of ``verify_frame``, with issues sorted by line
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the file lacks a history column
+    """
+    if chunk_rows is None:
+        chunk_rows = int(os.getenv("VERIFY_CHUNK_ROWS", str(DEFAULT_CHUNK_ROWS)))
+    if workers is None:
+        workers = int(os.getenv("VERIFY_WORKERS", "0")) or os.cpu_count() or 1
+    if chunk_rows < 1 or workers < 1:
+        raise ValueError("chunk_rows and workers must be at least 1")
+
+    total = _empty_report()
+    chunks = _read_chunks(path, chunk_rows)
+    first = next(chunks, None)
+    second = next(chunks, None) if first is not None else None
+
+    if second is None or workers == 1:
+        for chunk, first_line in [c for c in (first, second) if c is not None]:
+            _merge(total, verify_frame(chunk, first_line, rtol))
+        for chunk, first_line in chunks:
+            _merge(total, verify_frame(chunk, first_line, rtol))
+    else:
+        # Spawned, like the command workers: the caller may be running threads
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            pending = []
+            for chunk, first_line in [first, second]:
+                pending.append(pool.submit(_verify_chunk, chunk, first_line, rtol))
+            for chunk, first_line in chunks:
+                # Bound the chunks held in memory while workers catch up
+                if len(pending) >= 2 * workers:
+                    _merge(total, pending.pop(0).result())
+                pending.append(pool.submit(_verify_chunk, chunk, first_line, rtol))
+            for future in pending:
+                _merge(total, future.result())
+
+    for kind in ISSUE_KINDS:
+        total[kind].sort(key=lambda issue: issue["line"])
+    logger.info(
+        "Verified %s: %d rows, %d checked, %d mismatches, %d non-finite, %d parse failures",
+        path,
+        total["rows"],
+        total["checked"],
+        len(total["mismatches"]),
+        len(total["non_finite"]),
+        len(total["parse_failures"]),
+    )
+    return total
+
+
+def format_report(report: Dict[str, Any], limit: int = DEFAULT_LIMIT) -> str:
+    """
+    Format a verification report for display.
+
+    Args:
+        report: A report from ``verify_file``
+        limit: Maximum issues listed per kind
+
+    Returns:
+        The report text
+    """
+    lines = [f"Verified {report['rows']} rows: {report['checked']} checked"]
+    if report["skipped"]:
+        skipped = ", ".join(f"{op or '(empty)'}: {count}" for op, count in sorted(report["skipped"].items()))
+        lines[0] += f", {sum(report['skipped'].values())} skipped ({skipped})"
+    titles = {"mismatches": "Mismatches", "non_finite": "NaN/inf values", "parse_failures": "Parse failures"}
+    for kind in ISSUE_KINDS:
+        issues = report[kind]
+        lines.append(f"{titles[kind]}: {len(issues)}")
+        for issue in issues[:limit]:
+            detail = issue.get("reason") or f"expected {issue['expected']!r}"
+            lines.append(f"  line {issue['line']}: {issue['expression']} = {issue['result']} ({detail})")
+        if len(issues) > limit:
+            lines.append(f"  ... and {len(issues) - limit} more")
+    return "\n".join(lines)
+
+
+def has_issues(report: Dict[str, Any]) -> bool:
+    """Whether a report found any mismatch, non-finite value or parse failure."""
+    return any(report[kind] for kind in ISSUE_KINDS)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Verify that every row of a history CSV evaluates to its result")
+    parser.add_argument("file")
+    parser.add_argument("--workers", type=int, help="worker processes (default: VERIFY_WORKERS or CPUs)")
+    parser.add_argument("--chunk-rows", type=int, help=f"rows per chunk (default {DEFAULT_CHUNK_ROWS})")
+    parser.add_argument("--rtol", type=float, default=DEFAULT_RTOL, help="relative tolerance")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="issues listed per kind")
+    args = parser.parse_args(argv)
+    try:
+        report = verify_file(args.file, args.chunk_rows, args.workers, args.rtol)
+    except (OSError, ValueError) as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 2
+    print(format_report(report, args.limit))
+    return 1 if has_issues(report) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
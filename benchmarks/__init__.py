@@ -0,0 +1,7 @@
+"""
+Performance benchmarks for the calculator.
+
+``python -m benchmarks`` runs the suite covering every hot path (see
+``benchmarks.suite``). Each ``bench_*`` module explores one feature in more
+depth and can be run on its own, e.g. ``python -m benchmarks.bench_concurrency``.
+"""
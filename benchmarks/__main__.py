@@ -0,0 +1,75 @@
+"""
+Run the benchmark suite covering every hot path.
+
+Reports ops/sec, p50/p99 latency and peak memory per case, and optionally
+compares them with a saved baseline, exiting with status 1 if any case's
+throughput dropped by more than the threshold.
+
+Usage:
+    python -m benchmarks [--quick] [--filter history] [--budget 1.0]
+                         [--save-baseline FILE] [--baseline FILE] [--threshold 0.2]
+"""
+import argparse
+import sys
+
+from benchmarks.suite import (
+    DEFAULT_THRESHOLD,
+    FULL_SIZES,
+    QUICK_SIZES,
+    build_cases,
+    compare,
+    load_results,
+    run_suite,
+    save_results,
+)
+
+
+def print_result(name: str, result: dict) -> None:
+    peak = "-" if result["peak_kib"] is None else f"{result['peak_kib']:.1f}"
+    print(
+        f"{name:<34} {result['ops_per_sec']:>12.1f} {result['p50_us']:>12.1f} "
+        f"{result['p99_us']:>12.1f} {peak:>10}",
+        flush=True,
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="only history sizes up to 10^4")
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this")
+    parser.add_argument("--budget", type=float, default=1.0, help="seconds to time each case")
+    parser.add_argument("--save-baseline", metavar="FILE")
+    parser.add_argument("--baseline", metavar="FILE")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    cases = [
+        case
+        for case in build_cases(QUICK_SIZES if args.quick else FULL_SIZES)
+        if args.filter in case.name
+    ]
+    print(f"{'case':<34} {'ops/sec':>12} {'p50 us':>12} {'p99 us':>12} {'peak KiB':>10}")
+    results = run_suite(cases, budget=args.budget, report=print_result)
+
+    if args.save_baseline:
+        save_results(args.save_baseline, results)
+        print(f"Saved baseline to {args.save_baseline}")
+
+    if args.baseline:
+        comparisons = compare(results, load_results(args.baseline), args.threshold)
+        print(f"\n{'case':<34} {'baseline':>12} {'current':>12} {'change':>8}")
+        for comparison in comparisons:
+            flag = "  REGRESSED" if comparison["regressed"] else ""
+            print(
+                f"{comparison['name']:<34} {comparison['baseline']:>12.1f} "
+                f"{comparison['current']:>12.1f} {comparison['change']:>+8.1%}{flag}"
+            )
+        regressed = [c["name"] for c in comparisons if c["regressed"]]
+        if regressed:
+            print(f"\n{len(regressed)} case(s) regressed by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
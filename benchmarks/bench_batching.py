@@ -0,0 +1,123 @@
+"""
+Benchmark of the throughput/latency trade-off of the batching executor.
+
+Runs a fixed number of producer threads against direct ``Calculator.calculate``
+calls and against ``BatchingExecutor`` with several batch size and latency
+budget settings, reporting throughput and per-request latency percentiles.
+
+Each producer keeps ``--in-flight`` requests outstanding, as an async service
+handling many concurrent clients would.
+
+Usage:
+    python -m benchmarks.bench_batching [--producers 8] [--requests 20000]
+                                        [--in-flight 32] [--with-logging]
+"""
+import argparse
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from app.batching import BatchingExecutor
+from app.calculator import Calculator
+from app.history_manager import HistoryManager
+
+OPERATIONS = ["add", "subtract", "multiply", "divide"]
+SETTINGS = [(16, 100), (64, 250), (256, 500), (1024, 2000)]
+
+
+def run(producers: int, requests: int, in_flight: int, executor=None, calculator=None):
+    """
+    Run ``requests`` calculations spread over ``producers`` threads.
+
+    Returns:
+        A (throughput, p50 latency in us, p99 latency in us) tuple
+    """
+    per_producer = requests // producers
+    latencies = [None] * producers
+    barrier = threading.Barrier(producers + 1)
+
+    def produce(index):
+        samples = np.empty(per_producer)
+        barrier.wait()
+        for window in range(0, per_producer, in_flight):
+            batch = range(window, min(window + in_flight, per_producer))
+            if executor is None:
+                for i in batch:
+                    start = time.perf_counter()
+                    calculator.calculate(OPERATIONS[i % len(OPERATIONS)], i, index + 1)
+                    samples[i] = time.perf_counter() - start
+                continue
+            futures = []
+            for i in batch:
+                start = time.perf_counter()
+                future = executor.submit(OPERATIONS[i % len(OPERATIONS)], i, index + 1)
+                future.add_done_callback(
+                    lambda _, i=i, start=start: samples.__setitem__(
+                        i, time.perf_counter() - start
+                    )
+                )
+                futures.append(future)
+            for future in futures:
+                future.result()
+        latencies[index] = samples
+
+    threads = [threading.Thread(target=produce, args=(i,)) for i in range(producers)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    samples = np.concatenate(latencies) * 1e6
+    return (
+        per_producer * producers / elapsed,
+        float(np.percentile(samples, 50)),
+        float(np.percentile(samples, 99)),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--producers", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--in-flight", type=int, default=32)
+    parser.add_argument(
+        "--with-logging",
+        action="store_true",
+        help="log at INFO to a temporary file, as the application does",
+    )
+    args = parser.parse_args()
+
+    if args.with_logging:
+        log_file = os.path.join(tempfile.mkdtemp(), "bench.log")
+        logging.basicConfig(filename=log_file, level=logging.INFO)
+
+    # Autosave rewrites the whole file on every append and would dominate
+    os.environ.pop("HISTORY_FILE", None)
+
+    print(f"{'mode':<24} {'ops/sec':>10} {'p50 us':>10} {'p99 us':>10}")
+
+    HistoryManager._instance = None
+    throughput, p50, p99 = run(
+        args.producers, args.requests, args.in_flight, calculator=Calculator()
+    )
+    print(f"{'direct':<24} {throughput:>10.0f} {p50:>10.1f} {p99:>10.1f}")
+
+    for batch_size, latency_us in SETTINGS:
+        HistoryManager._instance = None
+        with BatchingExecutor(Calculator(), batch_size, latency_us) as executor:
+            throughput, p50, p99 = run(
+                args.producers, args.requests, args.in_flight, executor=executor
+            )
+        label = f"batch={batch_size} T={latency_us}us"
+        print(f"{label:<24} {throughput:>10.0f} {p50:>10.1f} {p99:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark of calculation throughput as the number of calling threads grows.
+
+Usage:
+    python -m benchmarks.bench_concurrency [--calculations N] [--threads 1 2 4 8]
+"""
+import argparse
+import os
+import threading
+import time
+
+from app.calculator import Calculator
+from app.history_manager import HistoryManager
+
+
+def run(thread_count: int, calculations: int) -> float:
+    """
+    Run ``calculations`` additions split across ``thread_count`` threads.
+
+    Args:
+        thread_count: Number of concurrent callers
+        calculations: Total number of calculations to perform
+
+    Returns:
+        Throughput in calculations per second
+    """
+    HistoryManager._instance = None
+    calculator = Calculator()
+    per_thread = calculations // thread_count
+    barrier = threading.Barrier(thread_count + 1)
+
+    def worker():
+        barrier.wait()
+        for i in range(per_thread):
+            calculator.calculate("add", i, 1)
+
+    threads = [threading.Thread(target=worker) for _ in range(thread_count)]
+    for thread in threads:
+        thread.start()
+
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    # Include the cost of merging the per-thread buffers into the frame
+    history = calculator.get_history()
+    elapsed = time.perf_counter() - start
+
+    assert len(history) == per_thread * thread_count
+    return per_thread * thread_count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calculations", type=int, default=40000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    # Autosave rewrites the whole file on every entry and would dominate
+    os.environ.pop("HISTORY_FILE", None)
+
+    print(f"{'threads':>8} {'ops/sec':>12} {'scaling':>8}")
+    baseline = None
+    for thread_count in args.threads:
+        throughput = run(thread_count, args.calculations)
+        baseline = baseline or throughput
+        print(f"{thread_count:>8} {throughput:>12.0f} {throughput / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
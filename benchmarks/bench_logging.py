@@ -0,0 +1,89 @@
+"""
+Benchmark of per-calculation latency with logging off, synchronous and asynchronous.
+
+Applies ``logging.yaml`` with its log files redirected to a temporary
+directory (and the console handler to ``os.devnull``), then times
+``Calculator.calculate`` calls one by one. ``async`` moves handler I/O to a
+``QueueListener`` thread; the time to drain its queue afterwards is reported
+separately.
+
+Usage:
+    python -m benchmarks.bench_logging [--calculations 5000]
+"""
+import argparse
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from app import logging_config
+from app.calculator import Calculator
+from app.history_manager import HistoryManager
+
+
+def time_calculations(count: int) -> list:
+    """Time ``count`` additions and return the latencies in microseconds."""
+    HistoryManager._instance = None
+    calculator = Calculator()
+    latencies = []
+    for i in range(count):
+        start = time.perf_counter()
+        calculator.calculate("add", i, 1)
+        latencies.append((time.perf_counter() - start) * 1_000_000)
+    return latencies
+
+
+def percentile(values: list, fraction: float) -> float:
+    """Return the value below which ``fraction`` of ``values`` fall."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calculations", type=int, default=5000)
+    args = parser.parse_args()
+
+    os.environ.pop("HISTORY_FILE", None)
+    log_dir = tempfile.mkdtemp()
+    for name in ("INFO", "WARNING", "ERROR"):
+        os.environ[f"LOG_FILE_{name}"] = os.path.join(log_dir, f"{name.lower()}.log")
+    stdout, devnull = sys.stdout, open(os.devnull, "w")
+
+    results = []
+    try:
+        # The console handler writes to sys.stderr
+        sys.stderr = devnull
+        for mode in ("off", "sync", "async"):
+            logging.disable(logging.NOTSET)
+            if mode == "off":
+                logging.disable(logging.CRITICAL)
+            else:
+                os.environ["LOG_ASYNC"] = "true" if mode == "async" else "false"
+                logging_config.configure_logging(force=True)
+            latencies = time_calculations(args.calculations)
+            start = time.perf_counter()
+            logging_config.stop_async_logging()
+            drain = (time.perf_counter() - start) * 1000
+            results.append((mode, latencies, drain))
+    finally:
+        sys.stderr = sys.__stderr__
+        logging_config.stop_async_logging()
+        logging.disable(logging.NOTSET)
+        devnull.close()
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+    print(f"{'logging':<8} {'mean us':>9} {'p50 us':>9} {'p99 us':>9} {'drain ms':>9}", file=stdout)
+    for mode, latencies, drain in results:
+        print(
+            f"{mode:<8} {statistics.mean(latencies):>9.1f} {percentile(latencies, 0.5):>9.1f} "
+            f"{percentile(latencies, 0.99):>9.1f} {drain:>9.1f}",
+            file=stdout,
+        )
+
+
+if __name__ == "__main__":
+    main()
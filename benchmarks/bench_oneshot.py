@@ -0,0 +1,79 @@
+"""
+Benchmark of one-shot command latency from the command line.
+
+Times ``python main.py add 2 3`` end to end in fresh interpreters, against
+piping the same command into the interactive REPL, optionally with a
+``HISTORY_FILE`` that already holds many entries (which the one-shot path
+appends to instead of loading).
+
+Usage:
+    python -m benchmarks.bench_oneshot [--runs 20] [--history-rows 0 10000]
+"""
+import argparse
+import csv
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_history(path: str, rows: int) -> None:
+    """Write a history CSV with ``rows`` entries."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(["operation", "expression", "result"])
+        writer.writerows(("add", f"{i}.0 + 1.0", f"{i + 1}.0") for i in range(rows))
+
+
+def time_runs(args: List[str], runs: int, env: dict, stdin: str = None) -> List[float]:
+    """Run ``main.py`` ``runs`` times and return the wall-clock times in milliseconds."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "main.py"] + args,
+            cwd=PROJECT_ROOT,
+            env=env,
+            input=stdin,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--history-rows", type=int, nargs="+", default=[0, 10000])
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    print(f"{'mode':<10} {'history':>8} {'p50 ms':>9} {'min ms':>9} {'max ms':>9}")
+    try:
+        for rows in args.history_rows:
+            history_file = os.path.join(work_dir, "history.csv")
+            env = dict(os.environ, HISTORY_FILE=history_file)
+            for mode, argv, stdin in (
+                ("one-shot", ["add", "2", "3"], None),
+                ("repl", [], "add 2 3\nexit\n"),
+            ):
+                write_history(history_file, rows)
+                timings = time_runs(argv, args.runs, env, stdin)
+                print(
+                    f"{mode:<10} {rows:>8} {statistics.median(timings):>9.1f} "
+                    f"{min(timings):>9.1f} {max(timings):>9.1f}"
+                )
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    main()
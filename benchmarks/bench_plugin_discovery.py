@@ -0,0 +1,79 @@
+"""
+Benchmark of entry point plugin discovery as installed plugins grow.
+
+Creates 1 to 200 fake installed distributions, each publishing one command in
+the ``calculator.commands`` group, and times a full metadata scan against a
+start-up that reuses the cached discovery result. Neither imports a plugin.
+
+Usage:
+    python -m benchmarks.bench_plugin_discovery [--counts 1 10 50 100 200] [--repeat 20]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from app.plugins.manifest import EntryPointManifest
+from app.plugins.plugin_loader import PluginLoader
+
+
+def install(site_dir: str, start: int, stop: int) -> None:
+    """Write fake distributions ``start``..``stop - 1`` into ``site_dir``."""
+    for index in range(start, stop):
+        name = f"calcplugin{index}"
+        dist_info = os.path.join(site_dir, f"{name}-1.0.dist-info")
+        os.makedirs(dist_info)
+        with open(os.path.join(dist_info, "METADATA"), "w") as f:
+            f.write(f"Metadata-Version: 2.1\nName: {name}\nVersion: 1.0\n")
+        with open(os.path.join(dist_info, "entry_points.txt"), "w") as f:
+            f.write(f"[calculator.commands]\ncmd{index} = {name}:Command{index}\n")
+
+
+def best_of(repeat: int, func) -> float:
+    """Return the fastest of ``repeat`` timed calls in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[1, 10, 50, 100, 200])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    site_dir = os.path.join(work_dir, "site")
+    os.makedirs(site_dir)
+    sys.path.insert(0, site_dir)
+    cache_file = os.path.join(work_dir, "entry_points.json")
+
+    print(f"{'plugins':>8} {'scan ms':>10} {'cached ms':>10} {'registered':>11} {'imported':>9}")
+    installed = 0
+    try:
+        for count in sorted(args.counts):
+            install(site_dir, installed, count)
+            installed = count
+            manifest = EntryPointManifest(cache_file=cache_file)
+            scan = best_of(args.repeat, manifest.build)
+            manifest.load()  # prime the cache
+            cached = best_of(args.repeat, manifest.load)
+
+            os.environ["PLUGIN_ENTRY_POINT_CACHE"] = cache_file
+            PluginLoader._instance = None
+            modules_before = set(sys.modules)
+            registered = PluginLoader().load_entry_points()
+            imported = len(set(sys.modules) - modules_before)
+            print(f"{count:>8} {scan:>10.2f} {cached:>10.2f} {len(registered):>11} {imported:>9}")
+    finally:
+        sys.path.remove(site_dir)
+        shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    main()
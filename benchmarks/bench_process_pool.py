@@ -0,0 +1,58 @@
+"""
+Benchmark of a CPU-heavy plugin command scaling across worker processes.
+
+Runs the same batch of ``primes`` commands in-process and through
+``ProcessCommandRunner`` with an increasing number of workers. Scaling is
+bounded by the number of cores available.
+
+Usage:
+    python -m benchmarks.bench_process_pool [--commands 8] [--limit 3000000]
+                                            [--workers 1 2 4]
+"""
+import argparse
+import os
+import time
+
+from app.calculator import Calculator
+from app.history_manager import HistoryManager
+from app.plugins.primes_plugin.primes_command import PrimeCountCommand
+from app.process_runner import ProcessCommandRunner
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--commands", type=int, default=8)
+    parser.add_argument("--limit", type=int, default=3_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    os.environ.pop("HISTORY_FILE", None)
+    HistoryManager._instance = None
+    print(f"cores available: {os.cpu_count()}")
+    print(f"{'mode':<16} {'seconds':>10} {'speedup':>8}")
+
+    command = PrimeCountCommand(Calculator())
+    start = time.perf_counter()
+    for _ in range(args.commands):
+        command.execute(str(args.limit))
+    baseline = time.perf_counter() - start
+    print(f"{'in-process':<16} {baseline:>10.2f} {1:>7.2f}x")
+
+    for workers in args.workers:
+        # Pool start-up is excluded: workers are warm before timing starts
+        runner = ProcessCommandRunner(max_workers=workers)
+        start = time.perf_counter()
+        futures = [
+            runner.submit(PrimeCountCommand, str(args.limit))
+            for _ in range(args.commands)
+        ]
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - start
+        runner.shutdown()
+        label = f"{workers} workers"
+        print(f"{label:<16} {elapsed:>10.2f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
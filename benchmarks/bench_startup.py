@@ -0,0 +1,79 @@
+"""
+Benchmark of application start-up import cost.
+
+Runs ``python -X importtime -c "import main"`` in fresh interpreters and
+reports the cumulative import time of ``main`` (best of several runs), the
+slowest modules it pulls in, and whether any heavy dependency that should
+only be imported on first use (pandas, NumPy, PyYAML, python-dotenv) was
+imported. The test suite enforces ``STARTUP_BUDGET_MS`` with the same helper.
+
+Usage:
+    python -m benchmarks.bench_startup [--module main] [--repeat 5] [--top 10]
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict
+
+# Budget for the cumulative import time of ``main``
+STARTUP_BUDGET_MS = 250
+# Modules that must only be imported on first use
+LAZY_MODULES = ("pandas", "numpy", "yaml", "dotenv")
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_imports(module: str = "main") -> Dict[str, float]:
+    """
+    Import ``module`` in a fresh interpreter under ``-X importtime``.
+
+    Args:
+        module: The module to import
+
+    Returns:
+        A mapping of every imported module to its cumulative import time in
+        milliseconds
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = int(cumulative) / 1000
+    return timings
+
+
+def best_startup(module: str = "main", repeat: int = 5) -> Dict[str, float]:
+    """Return the timings of the fastest of ``repeat`` runs of ``measure_imports``."""
+    runs = [measure_imports(module) for _ in range(repeat)]
+    return min(runs, key=lambda timings: timings.get(module, float("inf")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    timings = best_startup(args.module, args.repeat)
+    total = timings[args.module]
+    print(f"import {args.module}: {total:.1f} ms (budget {STARTUP_BUDGET_MS} ms)")
+    print(f"{'module':<40} {'cumulative ms':>14}")
+    slowest = sorted(timings.items(), key=lambda item: item[1], reverse=True)
+    for name, cumulative in slowest[1 : args.top + 1]:
+        print(f"{name:<40} {cumulative:>14.1f}")
+    eager = [name for name in LAZY_MODULES if name in timings]
+    print(f"heavy modules imported at start-up: {', '.join(eager) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
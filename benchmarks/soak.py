@@ -0,0 +1,452 @@
+"""
+Soak test replaying a command workload against the REPL command layer.
+
+Runs a weighted mix of commands (or replays a script of command lines, over
+and over) in-process through ``REPL.execute_command`` at a target rate for a
+fixed duration. Every ``window`` seconds it records throughput, latency
+percentiles, errors, resident memory, history length, mean autosave time and
+log file rotations, then summarizes the trends that reveal problems only
+sustained traffic shows:
+
+* ``rss_growth_mib_per_hour``: least-squares slope of resident memory over
+  time, after the first window (a steady climb suggests a leak).
+* ``latency_growth``: p50 latency in the last window over the first.
+* Per command, ``history_exponent``: the log-log slope of its p50 latency
+  against the history length. About 0 means independent of history size,
+  1 linear; above ``SUPERLINEAR_EXPONENT`` it is reported as superlinear.
+
+With a target rate, latency is measured from each command's scheduled start,
+so time spent queued behind a slow command is not hidden.
+
+Usage:
+    python -m benchmarks.soak [--duration 60] [--rate 200] [--window 5]
+                              [--mix add=50,divide=20,...] [--script FILE]
+                              [--history-file FILE] [--output report.json]
+"""
+import argparse
+import json
+import logging
+import logging.handlers
+import math
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from app.history_manager import AUTOSAVE_SECONDS, HistoryManager
+from app.metrics import process_memory_bytes
+
+DEFAULT_MIX = {
+    "add": 50,
+    "divide": 20,
+    "delete": 15,
+    "history": 2,
+    "export_csv": 2,
+    "import_csv": 1,
+}
+SUPERLINEAR_EXPONENT = 1.2
+RESERVOIR_SIZE = 10_000
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """
+    Parse a mix such as ``add=50,divide=20``.
+
+    Raises:
+        ValueError: If an entry is not ``command=weight`` with a positive weight
+    """
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        if not name.strip() or float(weight or "nan") <= 0:
+            raise ValueError(f"Invalid mix entry: {item!r}")
+        mix[name.strip().lower()] = float(weight)
+    return mix
+
+
+class Workload:
+    """An endless stream of command lines, synthesized from a mix or replayed from a script."""
+
+    def __init__(
+        self,
+        mix: Optional[Dict[str, float]] = None,
+        script: Optional[Sequence[str]] = None,
+        seed: int = 0,
+        work_dir: Optional[str] = None,
+    ):
+        """
+        Args:
+            mix: Relative weight of each command (``DEFAULT_MIX`` by default)
+            script: Command lines to replay in order instead of a mix; blank
+                lines and ``#`` comments are skipped
+            seed: Seed for the synthesized commands and their arguments
+            work_dir: Directory for the CSV files of ``export_csv``/``import_csv``
+        """
+        self.script = [
+            line.strip() for line in script or [] if line.strip() and not line.strip().startswith("#")
+        ]
+        if script is not None and not self.script:
+            raise ValueError("The script has no commands")
+        self.mix = mix or DEFAULT_MIX
+        self.csv_path = os.path.join(work_dir or tempfile.gettempdir(), "soak_history.csv")
+        self._random = random.Random(seed)
+        self._position = 0
+
+    def next_command(self) -> List[str]:
+        """Return the next command line as ``[name, *args]``."""
+        if self.script:
+            line = self.script[self._position % len(self.script)]
+            self._position += 1
+            return line.split()
+
+        name = self._random.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        value = lambda: f"{self._random.uniform(-1000, 1000):.3f}"  # noqa: E731
+        if name in ("add", "subtract", "multiply"):
+            return [name, value(), value()]
+        if name == "divide":
+            return [name, value(), f"{self._random.uniform(1, 100):.3f}"]
+        if name == "delete":
+            return [name, "0"]
+        if name in ("export_csv", "import_csv"):
+            return [name, self.csv_path]
+        return [name]
+
+
+class _LatencyRecorder:
+    """Latencies of one command: this window's, and a reservoir sample of all."""
+
+    def __init__(self, rng: random.Random):
+        self._random = rng
+        self.window: List[float] = []
+        self.reservoir: List[float] = []
+        self.count = 0
+        self.errors = 0
+        self.window_p50s: List[float] = []
+        self.window_entries: List[int] = []
+
+    def add(self, latency: float, ok: bool) -> None:
+        self.window.append(latency)
+        self.count += 1
+        if not ok:
+            self.errors += 1
+        if len(self.reservoir) < RESERVOIR_SIZE:
+            self.reservoir.append(latency)
+        else:
+            slot = self._random.randrange(self.count)
+            if slot < RESERVOIR_SIZE:
+                self.reservoir[slot] = latency
+
+    def close_window(self, history_entries: int) -> None:
+        if self.window:
+            self.window_p50s.append(statistics.median(self.window))
+            self.window_entries.append(history_entries)
+        self.window = []
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def _slope(xs: Sequence[float], ys: Sequence[float]) -> Optional[float]:
+    """Least-squares slope of ``ys`` against ``xs``, or None if undefined."""
+    if len(xs) < 2:
+        return None
+    mean_x, mean_y = statistics.fmean(xs), statistics.fmean(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    if spread == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread
+
+
+def _rotating_handlers() -> List[logging.handlers.RotatingFileHandler]:
+    """Return every rotating file handler, including those behind async logging queues."""
+    from app import logging_config
+
+    loggers = [logging.getLogger()] + [
+        logger for logger in logging.Logger.manager.loggerDict.values() if isinstance(logger, logging.Logger)
+    ]
+    handlers = [handler for logger in loggers for handler in logger.handlers]
+    for listener, _targets, _handlers in logging_config._queue_listeners:
+        handlers.extend(listener.handlers)
+    unique = []
+    for handler in handlers:
+        if isinstance(handler, logging.handlers.RotatingFileHandler) and handler not in unique:
+            unique.append(handler)
+    return unique
+
+
+class _RolloverCounter:
+    """Counts log file rotations while installed."""
+
+    def __init__(self):
+        self.count = 0
+        self._handlers = []
+
+    def install(self) -> None:
+        for handler in _rotating_handlers():
+            original = handler.doRollover
+
+            def counting(original=original):
+                self.count += 1
+                original()
+
+            handler.doRollover = counting
+            self._handlers.append(handler)
+
+    def uninstall(self) -> None:
+        for handler in self._handlers:
+            del handler.doRollover
+        self._handlers = []
+
+
+def _autosave_totals() -> List[float]:
+    """Return the total seconds and number of autosave writes so far."""
+    total, count = 0.0, 0
+    for _labels, child in AUTOSAVE_SECONDS.children():
+        total += child.sum
+        count += child.count
+    return [total, count]
+
+
+def run_soak(
+    workload: Workload,
+    duration: float,
+    rate: float = 0,
+    window: float = 5.0,
+    repl=None,
+    report: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Run a workload and report how throughput, latency and memory evolve.
+
+    Args:
+        workload: The commands to run
+        duration: Seconds to run for
+        rate: Target commands per second, 0 to run as fast as possible
+        window: Seconds per reporting window
+        repl: The REPL to run commands in (a new one by default)
+        report: Called with each window's statistics as it closes
+
+    Returns:
+        ``{"config", "windows", "commands", "summary"}``
+    """
+    if repl is None:
+        from app.repl import REPL
+
+        repl = REPL()
+    rng = random.Random(0)
+    recorders: Dict[str, _LatencyRecorder] = {}
+    windows: List[Dict[str, Any]] = []
+    rollovers = _RolloverCounter()
+    rollovers.install()
+
+    start = time.perf_counter()
+    window_start, window_latencies, window_errors = start, [], 0
+    autosave_before = _autosave_totals()
+    rollovers_before = 0
+    scheduled = start
+    interval = 1.0 / rate if rate > 0 else 0.0
+
+    def close_window(now: float) -> None:
+        nonlocal window_start, window_latencies, window_errors, autosave_before, rollovers_before
+        entries = HistoryManager().entry_count()
+        autosave = _autosave_totals()
+        saves = autosave[1] - autosave_before[1]
+        ordered = sorted(window_latencies)
+        stats = {
+            "t": round(now - start, 3),
+            "ops": len(ordered),
+            "throughput": len(ordered) / (now - window_start) if now > window_start else 0.0,
+            "p50_ms": _percentile(ordered, 0.5) * 1000,
+            "p95_ms": _percentile(ordered, 0.95) * 1000,
+            "p99_ms": _percentile(ordered, 0.99) * 1000,
+            "max_ms": (ordered[-1] if ordered else 0.0) * 1000,
+            "errors": window_errors,
+            "rss_mib": (process_memory_bytes() or 0) / 2**20,
+            "history_entries": entries,
+            "autosave_ms": (autosave[0] - autosave_before[0]) / saves * 1000 if saves else 0.0,
+            "log_rollovers": rollovers.count - rollovers_before,
+        }
+        windows.append(stats)
+        for recorder in recorders.values():
+            recorder.close_window(entries)
+        if report is not None:
+            report(stats)
+        window_start, window_latencies, window_errors = now, [], 0
+        autosave_before, rollovers_before = autosave, rollovers.count
+
+    try:
+        while True:
+            now = time.perf_counter()
+            if now - start >= duration:
+                break
+            if now - window_start >= window:
+                close_window(now)
+            if interval:
+                if scheduled > now:
+                    time.sleep(scheduled - now)
+                began = scheduled
+                scheduled += interval
+            else:
+                began = time.perf_counter()
+
+            name, *args = workload.next_command()
+            command = repl.get_command(name)
+            if command is None:
+                output = f"Error: Unknown command: {name}"
+            else:
+                try:
+                    output = repl.execute_command(command, args)
+                except Exception as e:
+                    output = f"Error: {str(e)}"
+            latency = time.perf_counter() - began
+            ok = not str(output).startswith("Error")
+            recorders.setdefault(name, _LatencyRecorder(rng)).add(latency, ok)
+            window_latencies.append(latency)
+            window_errors += not ok
+        close_window(time.perf_counter())
+    finally:
+        rollovers.uninstall()
+
+    return {
+        "config": {"duration": duration, "rate": rate, "window": window},
+        "windows": windows,
+        "commands": {name: _command_summary(recorder) for name, recorder in sorted(recorders.items())},
+        "summary": summarize(windows, recorders),
+    }
+
+
+def _history_exponent(recorder: _LatencyRecorder) -> Optional[float]:
+    points = [
+        (math.log(entries), math.log(p50))
+        for entries, p50 in zip(recorder.window_entries, recorder.window_p50s)
+        if entries > 0 and p50 > 0
+    ]
+    return _slope([x for x, _ in points], [y for _, y in points])
+
+
+def _command_summary(recorder: _LatencyRecorder) -> Dict[str, Any]:
+    ordered = sorted(recorder.reservoir)
+    exponent = _history_exponent(recorder)
+    return {
+        "count": recorder.count,
+        "errors": recorder.errors,
+        "p50_ms": _percentile(ordered, 0.5) * 1000,
+        "p99_ms": _percentile(ordered, 0.99) * 1000,
+        "history_exponent": None if exponent is None else round(exponent, 3),
+    }
+
+
+def summarize(windows: List[Dict[str, Any]], recorders: Dict[str, _LatencyRecorder]) -> Dict[str, Any]:
+    """
+    Summarize the trends across windows.
+
+    Args:
+        windows: Per-window statistics, in order
+        recorders: Per-command latency recorders
+
+    Returns:
+        Totals, ``rss_growth_mib_per_hour``, ``latency_growth`` and
+        ``warnings`` listing suspected leaks and superlinear slowdowns
+    """
+    # The first window includes warm-up (imports, caches), so it is left out
+    steady = windows[1:] if len(windows) > 2 else windows
+    rss_slope = _slope([w["t"] for w in steady], [w["rss_mib"] for w in steady])
+    first, last = windows[0] if windows else {}, windows[-1] if windows else {}
+    latency_growth = (
+        last["p50_ms"] / first["p50_ms"] if first.get("p50_ms") and last.get("p50_ms") else None
+    )
+    warnings = []
+    if rss_slope is not None and rss_slope > 0 and len(steady) >= 3:
+        growth = rss_slope * 3600
+        if growth > max(1.0, 0.05 * steady[0]["rss_mib"]):
+            entries = steady[-1]["history_entries"] - steady[0]["history_entries"]
+            warnings.append(
+                f"Resident memory grows by {growth:.1f} MiB/hour "
+                f"(history changed by {entries:+d} entries over the same windows)"
+            )
+    for name, recorder in sorted(recorders.items()):
+        exponent = _history_exponent(recorder)
+        if exponent is not None and exponent > SUPERLINEAR_EXPONENT:
+            warnings.append(f"{name} latency grows superlinearly with history length (exponent {exponent:.2f})")
+    return {
+        "ops": sum(w["ops"] for w in windows),
+        "errors": sum(w["errors"] for w in windows),
+        "log_rollovers": sum(w["log_rollovers"] for w in windows),
+        "rss_growth_mib_per_hour": None if rss_slope is None else round(rss_slope * 3600, 3),
+        "latency_growth": None if latency_growth is None else round(latency_growth, 3),
+        "warnings": warnings,
+    }
+
+
+def print_window(stats: Dict[str, Any]) -> None:
+    print(
+        f"{stats['t']:>8.1f} {stats['ops']:>7} {stats['throughput']:>9.1f} {stats['p50_ms']:>8.2f} "
+        f"{stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} {stats['errors']:>6} {stats['rss_mib']:>8.1f} "
+        f"{stats['history_entries']:>9} {stats['autosave_ms']:>9.2f} {stats['log_rollovers']:>5}",
+        flush=True,
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds to run")
+    parser.add_argument("--rate", type=float, default=200.0, help="target commands per second, 0 for unpaced")
+    parser.add_argument("--window", type=float, default=5.0, help="seconds per report line")
+    parser.add_argument("--mix", type=parse_mix, help="weighted commands, e.g. add=50,divide=20")
+    parser.add_argument("--script", metavar="FILE", help="replay the command lines in FILE instead")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--history-file", metavar="FILE", help="autosave the history to FILE")
+    parser.add_argument("--output", metavar="FILE", help="also write the report as JSON")
+    args = parser.parse_args()
+
+    if args.history_file:
+        os.environ["HISTORY_FILE"] = args.history_file
+    else:
+        os.environ.pop("HISTORY_FILE", None)
+
+    from app.logging_config import configure_logging
+
+    configure_logging()
+    script = None
+    if args.script:
+        with open(args.script, "r", encoding="utf-8") as f:
+            script = f.read().splitlines()
+    work_dir = tempfile.mkdtemp()
+    try:
+        workload = Workload(args.mix, script, args.seed, work_dir)
+        print(
+            f"{'t':>8} {'ops':>7} {'ops/sec':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'errors':>6} {'rss MiB':>8} {'history':>9} {'save ms':>9} {'rot':>5}"
+        )
+        result = run_soak(workload, args.duration, args.rate, args.window, report=print_window)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"\n{'command':<12} {'count':>8} {'errors':>7} {'p50 ms':>8} {'p99 ms':>8} {'exponent':>9}")
+    for name, command in result["commands"].items():
+        exponent = "-" if command["history_exponent"] is None else f"{command['history_exponent']:.2f}"
+        print(
+            f"{name:<12} {command['count']:>8} {command['errors']:>7} {command['p50_ms']:>8.2f} "
+            f"{command['p99_ms']:>8.2f} {exponent:>9}"
+        )
+    summary = result["summary"]
+    print(f"\nRSS growth: {summary['rss_growth_mib_per_hour']} MiB/hour")
+    print(f"p50 latency, last window / first: {summary['latency_growth']}")
+    print(f"Log rotations: {summary['log_rollovers']}")
+    for warning in summary["warnings"]:
+        print(f"WARNING: {warning}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"Saved report to {args.output}")
+    return 1 if summary["warnings"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,365 @@
+"""
+Benchmark suite covering the calculator's hot paths.
+
+Each case sets up its own state and returns an operation, which is timed
+call by call for up to ``budget`` seconds (at least ``min_iterations`` times)
+to report throughput and p50/p99 latency. The operation is then run again a
+few times under ``tracemalloc`` to report the peak memory it allocates on top
+of its set-up. Cases that spawn processes report no memory.
+
+Results can be saved as a baseline JSON file and later runs compared with
+it: a case regresses when its throughput falls more than ``threshold`` below
+the baseline.
+"""
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from app.history_manager import HistoryManager
+from app.plugins.plugin_loader import PluginLoader
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_VERSION = 1
+DEFAULT_THRESHOLD = 0.2
+
+FULL_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+QUICK_SIZES = (1_000, 10_000)
+
+
+class Case:
+    """One benchmark: a named set-up function returning the operation to time."""
+
+    def __init__(
+        self,
+        name: str,
+        setup: Callable[[], Callable[[], Any]],
+        trace_memory: bool = True,
+        min_iterations: int = 5,
+    ):
+        """
+        Args:
+            name: Unique name, used to match results against a baseline
+            setup: Prepares fresh state and returns the operation to time
+            trace_memory: Whether to measure peak memory under tracemalloc
+            min_iterations: Time at least this many calls, whatever the budget
+        """
+        self.name = name
+        self.setup = setup
+        self.trace_memory = trace_memory
+        self.min_iterations = min_iterations
+
+
+def _reset_state() -> None:
+    """Drop the singletons so every case starts clean."""
+    HistoryManager._instance = None
+    PluginLoader._instance = None
+    gc.collect()
+
+
+def _history_frame(size: int):
+    """Build a history DataFrame with ``size`` rows (sharing their strings)."""
+    import numpy as np
+    import pandas as pd
+
+    return pd.DataFrame(
+        {
+            "operation": np.full(size, "add", dtype=object),
+            "expression": np.full(size, "1.0 + 1.0", dtype=object),
+            "result": np.full(size, "2.0", dtype=object),
+        }
+    )
+
+
+def _history_manager(size: int) -> HistoryManager:
+    """Return a fresh HistoryManager holding ``size`` entries."""
+    manager = HistoryManager()
+    manager.set_history(_history_frame(size))
+    return manager
+
+
+def _calculate_case() -> Callable[[], Any]:
+    from app.calculator import Calculator
+
+    calculator = Calculator()
+    return lambda: calculator.calculate("add", 2, 3)
+
+
+def _add_entry_case(size: int) -> Callable[[], Any]:
+    manager = _history_manager(size)
+
+    def operation():
+        # 100 appends followed by the read that merges them into the frame
+        for _ in range(100):
+            manager.add_entry("add", "1.0 + 1.0", 2.0)
+        return len(manager.get_history())
+
+    return operation
+
+
+def _delete_entry_case(size: int) -> Callable[[], Any]:
+    manager = _history_manager(size)
+
+    def operation():
+        manager.add_entry("add", "1.0 + 1.0", 2.0)
+        return manager.delete_entry(0)
+
+    return operation
+
+
+def _history_command_case(size: int) -> Callable[[], Any]:
+    from app.calculator import Calculator
+    from app.commands.history import HistoryCommand
+
+    _history_manager(size)
+    command = HistoryCommand(Calculator())
+    return command.execute
+
+
+def _csv_case(size: int, direction: str) -> Callable[[], Any]:
+    manager = _history_manager(size)
+    path = os.path.join(tempfile.mkdtemp(), "history.csv")
+    manager.save_history(path)
+    if direction == "export":
+        return lambda: manager.save_history(path)
+    return lambda: manager.load_history(path)
+
+
+def _merge_case(size: int) -> Callable[[], Any]:
+    import numpy as np
+    import pandas as pd
+
+    manager = HistoryManager()
+    operands = np.arange(size * 2).astype(str).astype(object)
+    manager.set_history(
+        pd.DataFrame({"operation": "add", "expression": operands[:size], "result": operands[:size]})
+    )
+    # Half of the merged rows are already in the history; the warm-up call
+    # builds the hash index and adds the other half, later calls find only duplicates
+    other = slice(size // 2, size // 2 + size)
+    merged = pd.DataFrame({"operation": "add", "expression": operands[other], "result": operands[other]})
+    return lambda: manager.merge_history(merged)
+
+
+def _load_plugins_case() -> Callable[[], Any]:
+    def operation():
+        PluginLoader._instance = None
+        return PluginLoader().load_plugins()
+
+    return operation
+
+
+def _repl_case() -> Callable[[], Any]:
+    from app.repl import REPL
+
+    def operation():
+        HistoryManager._instance = None
+        PluginLoader._instance = None
+        return REPL()
+
+    return operation
+
+
+def _process_case(argv: List[str]) -> Callable[[], Any]:
+    def operation():
+        subprocess.run(
+            [sys.executable] + argv, cwd=PROJECT_ROOT, capture_output=True, check=True
+        )
+
+    return operation
+
+
+def build_cases(sizes: Iterable[int] = FULL_SIZES) -> List[Case]:
+    """
+    Build the benchmark cases.
+
+    Args:
+        sizes: History sizes for the cases that depend on history length
+
+    Returns:
+        All cases, in run order
+    """
+    sizes = list(sizes)
+    cases = [Case("calculator.calculate", _calculate_case)]
+    for size in sizes:
+        cases.append(Case(f"history.add_entry[x100]@{size}", lambda s=size: _add_entry_case(s)))
+    for size in sizes:
+        cases.append(Case(f"history.delete_entry@{size}", lambda s=size: _delete_entry_case(s)))
+    # Formatting the whole history row by row is too slow beyond 10^4 entries
+    for size in [s for s in sizes if s <= 10_000]:
+        cases.append(
+            Case(f"command.history@{size}", lambda s=size: _history_command_case(s), min_iterations=1)
+        )
+    for size in [s for s in sizes if s <= 100_000]:
+        for direction in ("export", "import"):
+            cases.append(
+                Case(
+                    f"csv.{direction}@{size}",
+                    lambda s=size, d=direction: _csv_case(s, d),
+                    min_iterations=1,
+                )
+            )
+        cases.append(Case(f"history.merge@{size}", lambda s=size: _merge_case(s), min_iterations=1))
+    cases += [
+        Case("plugins.load_plugins", _load_plugins_case),
+        Case("repl.construct", _repl_case),
+        Case("process.import_main", lambda: _process_case(["-c", "import main"]), trace_memory=False),
+        Case("process.oneshot_add", lambda: _process_case(["main.py", "add", "2", "3"]), trace_memory=False),
+    ]
+    return cases
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _time_case(case: Case, budget: float, max_iterations: int):
+    """Return the latencies of one case's calls and its peak memory in KiB (or None)."""
+    _reset_state()
+    operation = case.setup()
+    operation()  # warm up
+    latencies = []
+    start = time.perf_counter()
+    while len(latencies) < max_iterations and (
+        len(latencies) < case.min_iterations or time.perf_counter() - start < budget
+    ):
+        call_start = time.perf_counter()
+        operation()
+        latencies.append(time.perf_counter() - call_start)
+
+    peak_kib = None
+    if case.trace_memory:
+        _reset_state()
+        tracemalloc.start()
+        try:
+            operation = case.setup()
+            tracemalloc.reset_peak()
+            current = tracemalloc.get_traced_memory()[0]
+            for _ in range(min(3, len(latencies))):
+                operation()
+            peak_kib = (tracemalloc.get_traced_memory()[1] - current) / 1024
+        finally:
+            tracemalloc.stop()
+    _reset_state()
+    return latencies, peak_kib
+
+
+def run_case(case: Case, budget: float = 1.0, max_iterations: int = 10_000) -> Dict[str, Any]:
+    """
+    Run one case.
+
+    Args:
+        case: The case to run
+        budget: Seconds to spend timing the operation
+        max_iterations: Stop timing after this many calls
+
+    Returns:
+        ``ops_per_sec``, ``p50_us``, ``p99_us``, ``iterations`` and
+        ``peak_kib`` (None when memory is not traced)
+    """
+    # Cases run without autosave; the caller's HISTORY_FILE is put back after
+    history_file = os.environ.pop("HISTORY_FILE", None)
+    try:
+        latencies, peak_kib = _time_case(case, budget, max_iterations)
+    finally:
+        if history_file is not None:
+            os.environ["HISTORY_FILE"] = history_file
+
+    ordered = sorted(latencies)
+    return {
+        "ops_per_sec": len(latencies) / sum(latencies),
+        "p50_us": _percentile(ordered, 0.5) * 1_000_000,
+        "p99_us": _percentile(ordered, 0.99) * 1_000_000,
+        "iterations": len(latencies),
+        "peak_kib": peak_kib,
+    }
+
+
+def run_suite(
+    cases: Iterable[Case],
+    budget: float = 1.0,
+    max_iterations: int = 10_000,
+    report: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run several cases.
+
+    Args:
+        cases: The cases to run
+        budget: Seconds to spend timing each case
+        max_iterations: Maximum timed calls per case
+        report: Called with each case's name and result as it finishes
+
+    Returns:
+        A mapping of case name to result
+    """
+    results = {}
+    for case in cases:
+        results[case.name] = run_case(case, budget, max_iterations)
+        if report is not None:
+            report(case.name, results[case.name])
+    return results
+
+
+def save_results(path: str, results: Dict[str, Dict[str, Any]]) -> None:
+    """Save results as a baseline JSON file."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": RESULTS_VERSION, "results": results}, f, indent=2, sort_keys=True)
+
+
+def load_results(path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Load results saved by ``save_results``.
+
+    Raises:
+        ValueError: If the file is not a results file of this version
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != RESULTS_VERSION:
+        raise ValueError(f"Unsupported benchmark results version in {path}")
+    return data["results"]
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[Dict[str, Any]]:
+    """
+    Compare results with a baseline.
+
+    Args:
+        results: Results of this run
+        baseline: Results of the baseline run
+        threshold: Allowed relative drop in throughput, e.g. 0.2 for 20%
+
+    Returns:
+        One ``{"name", "baseline", "current", "change", "regressed"}`` dict per
+        case present in both, where ``change`` is the relative change in ops/sec
+    """
+    comparisons = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["ops_per_sec"]
+        after = result["ops_per_sec"]
+        change = (after - before) / before if before else 0.0
+        comparisons.append(
+            {
+                "name": name,
+                "baseline": before,
+                "current": after,
+                "change": change,
+                "regressed": change < -threshold,
+            }
+        )
+    return comparisons
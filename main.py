@@ -1,84 +1,66 @@
 # main.py
 import logging
-import logging.config
-import os
-import re
+import sys
 
-import yaml
-from app.plugins.plugin_loader import PluginLoader
+from app.cli import run_command
+from app.logging_config import configure_logging
 from app.repl import REPL
-from dotenv import load_dotenv
-
-
-def expand_env_vars(config):
-    """Recursively expand environment variables in the logging config."""
-    if isinstance(config, dict):
-        return {key: expand_env_vars(value) for key, value in config.items()}
-    elif isinstance(config, list):
-        return [expand_env_vars(item) for item in config]
-    elif isinstance(config, str):
-        # Replace ${VAR} with os.getenv(VAR, VAR) to use defaults if not set
-        return re.sub(
-            r"\$\{(\w+)\}",
-            lambda match: os.getenv(match.group(1), match.group(0)),
-            config,
-        )
-    else:
-        return config
-
-
-def configure_logging():
-    """Configure logging using YAML configuration with expanded environment variables."""
-
-    # Load environment variables
-    load_dotenv()
-
-    # Ensure logs directory exists
-    if not os.path.exists("logs"):
-        os.makedirs("logs")
-
-    # Load and expand environment variables in YAML config
-    with open("logging.yaml", "r") as f:
-        config = yaml.safe_load(f)
-        config = expand_env_vars(config)  # Expand environment variables
-
-    # Convert numeric values explicitly
-    for handler in config.get("handlers", {}).values():
-        if "maxBytes" in handler:
-            handler["maxBytes"] = int(handler["maxBytes"])
-        if "backupCount" in handler:
-            handler["backupCount"] = int(handler["backupCount"])
-
-    # Configure logging
-    logging.config.dictConfig(config)
 
-    logger = logging.getLogger(__name__)
-    logger.info("Logging configured from YAML file")
 
+def main(argv=None) -> int:
+    """
+    Main entry point for the calculator application.
+
+    With a command on the command line (``python main.py add 2 3``) runs just
+    that command; otherwise starts the interactive REPL. A leading
+    ``--profile`` (or ``--profile=PREFIX`` to also save the results) profiles
+    the whole run and prints the report to stderr when it ends.
 
-# Call the function to configure logging
-configure_logging()
+    Args:
+        argv: Command line arguments (``sys.argv[1:]`` by default)
 
+    Returns:
+        The process exit status
+    """
+    if argv is None:
+        argv = sys.argv[1:]
 
-def main():
-    """Main entry point for the calculator application."""
-    # Configure logging
+    # Configure logging (once; the parsed config is cached between runs)
     configure_logging()
 
+    if argv and (argv[0] == "--profile" or argv[0].startswith("--profile=")):
+        from app.profiling import Profiler
+
+        prefix = argv[0].partition("=")[2]
+        profiler = Profiler()
+        profiler.start()
+        try:
+            return _run(argv[1:])
+        finally:
+            profiler.stop()
+            print(profiler.report(), file=sys.stderr)
+            if prefix:
+                print("Saved " + ", ".join(profiler.save(prefix)), file=sys.stderr)
+
+    return _run(argv)
+
+
+def _run(argv) -> int:
+    """Run one command, or the REPL if ``argv`` is empty."""
+    if argv:
+        return run_command(argv)
+
     # Create a logger for this module
     logger = logging.getLogger(__name__)
     logger.info("Starting Advanced Calculator Application")
 
-    # Load plugins
-    plugin_loader = PluginLoader()
-    plugin_loader.load_plugins()
-
-    # Start REPL
+    # Start REPL (plugin commands are registered from the cached manifest)
     repl = REPL()
     repl.run()
 
     logger.info("Calculator application exiting")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
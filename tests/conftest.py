@@ -0,0 +1,40 @@
+"""Shared test fixtures."""
+
+import pytest
+from app.history_manager import HistoryManager
+from app.plugins.plugin_loader import PluginLoader
+from app.repl import REPL
+
+
+@pytest.fixture(autouse=True)
+def log_files(tmp_path, monkeypatch):
+    """Send the event log and the log files of every test to its temporary directory."""
+    monkeypatch.setenv("EVENT_LOG_FILE", str(tmp_path / "events.jsonl"))
+    for level in ("INFO", "WARNING", "ERROR"):
+        monkeypatch.setenv(f"LOG_FILE_{level}", str(tmp_path / f"{level.lower()}.log"))
+
+
+@pytest.fixture(autouse=True)
+def fresh_singletons(monkeypatch):
+    """Give every test an in-memory history and plugin loader of its own, restored afterwards."""
+    monkeypatch.delenv("HISTORY_FILE", raising=False)
+    monkeypatch.delenv("HISTORY_SHARED_FILE", raising=False)
+    monkeypatch.setattr(HistoryManager, "_instance", None)
+    monkeypatch.setattr(PluginLoader, "_instance", None)
+
+
+@pytest.fixture
+def repl():
+    """A REPL with a fresh history."""
+    return REPL()
+
+
+@pytest.fixture
+def run(repl):
+    """Run a line in the ``repl`` fixture and return its output."""
+
+    def run_line(line):
+        command_name, args = repl.parse_input(line)
+        return repl.execute_command(repl.get_command(command_name), args)
+
+    return run_line
@@ -0,0 +1,123 @@
+"""Tests for the micro-batching calculation executor."""
+
+import asyncio
+import threading
+
+import pytest
+from app.batching import BatchingExecutor
+from app.calculator import Calculator
+from app.history_manager import HistoryManager
+
+
+@pytest.fixture(name="calculator")
+def fixture_calculator():
+    """Fixture that provides a Calculator backed by a fresh history."""
+    return Calculator()
+
+
+def test_batched_results_match_calculate(calculator):
+    """Test that batched results and history match direct calculate() calls."""
+    requests = [("add", 2, 3), ("subtract", 10, 4), ("multiply", 1.5, 4), ("divide", 9, 3)]
+    with BatchingExecutor(calculator, max_batch_size=64, max_latency_us=1000) as executor:
+        futures = [executor.submit(*request) for request in requests]
+    batched = [future.result() for future in futures]
+    batched_history = calculator.get_history()
+
+    HistoryManager._instance = None
+    direct_calculator = Calculator()
+    direct = [direct_calculator.calculate(*request) for request in requests]
+
+    assert batched == direct
+    assert sorted(batched_history["expression"]) == sorted(
+        direct_calculator.get_history()["expression"]
+    )
+    assert sorted(batched_history["result"]) == sorted(
+        direct_calculator.get_history()["result"]
+    )
+
+
+def test_errors_fail_only_their_own_future(calculator):
+    """Test that invalid requests fail individually without affecting the batch."""
+    with BatchingExecutor(calculator, max_batch_size=64, max_latency_us=1000) as executor:
+        good = executor.submit("divide", 8, 2)
+        zero = executor.submit("divide", 1, 0)
+        invalid_op = executor.submit("power", 2, 3)
+        invalid_arg = executor.submit("add", "a", 1)
+        wrong_arity = executor.submit("add", 1)
+
+    assert good.result() == 4.0
+    with pytest.raises(ValueError, match="Division by zero"):
+        zero.result()
+    with pytest.raises(ValueError, match="Invalid operation"):
+        invalid_op.result()
+    with pytest.raises(ValueError, match="Invalid arguments"):
+        invalid_arg.result()
+    with pytest.raises(ValueError, match="Invalid number of arguments"):
+        wrong_arity.result()
+    assert len(calculator.get_history()) == 1
+
+
+def test_flushes_when_batch_is_full(calculator):
+    """Test that a full batch is flushed without waiting for the deadline."""
+    executor = BatchingExecutor(calculator, max_batch_size=4, max_latency_us=60_000_000)
+    futures = [executor.submit("add", i, i) for i in range(4)]
+    assert [future.result(timeout=5) for future in futures] == [0.0, 2.0, 4.0, 6.0]
+    executor.shutdown()
+
+
+def test_flushes_when_latency_budget_expires(calculator):
+    """Test that a partial batch is flushed once the latency budget expires."""
+    executor = BatchingExecutor(calculator, max_batch_size=1000, max_latency_us=1000)
+    assert executor.submit("multiply", 3, 3).result(timeout=5) == 9.0
+    executor.shutdown()
+
+
+def test_concurrent_producers(calculator):
+    """Test that many producer threads all get their own results."""
+    results = {}
+
+    with BatchingExecutor(calculator, max_batch_size=32, max_latency_us=200) as executor:
+
+        def produce(thread_index):
+            results[thread_index] = [
+                executor.calculate("add", thread_index, i) for i in range(50)
+            ]
+
+        threads = [threading.Thread(target=produce, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    for thread_index in range(8):
+        assert results[thread_index] == [float(thread_index + i) for i in range(50)]
+    assert len(calculator.get_history()) == 8 * 50
+
+
+def test_async_producers(calculator):
+    """Test that asyncio tasks can await batched calculations."""
+
+    async def produce_all(executor):
+        return await asyncio.gather(
+            *(executor.calculate_async("subtract", i, 1) for i in range(20))
+        )
+
+    with BatchingExecutor(calculator, max_batch_size=8, max_latency_us=200) as executor:
+        results = asyncio.run(produce_all(executor))
+    assert results == [float(i - 1) for i in range(20)]
+
+
+def test_submit_after_shutdown_raises(calculator):
+    """Test that a shut down executor rejects new requests."""
+    executor = BatchingExecutor(calculator)
+    executor.shutdown()
+    with pytest.raises(RuntimeError):
+        executor.submit("add", 1, 2)
+
+
+def test_invalid_configuration(calculator):
+    """Test that nonsensical batch limits are rejected."""
+    with pytest.raises(ValueError):
+        BatchingExecutor(calculator, max_batch_size=0)
+    with pytest.raises(ValueError):
+        BatchingExecutor(calculator, max_latency_us=-1)
@@ -0,0 +1,99 @@
+"""Tests for the benchmark suite; the suite itself only runs with ``-m benchmark``."""
+
+import os
+import random
+
+import pytest
+from benchmarks.soak import Workload, _LatencyRecorder, parse_mix, run_soak, summarize
+from benchmarks.suite import (
+    QUICK_SIZES,
+    Case,
+    build_cases,
+    compare,
+    load_results,
+    run_case,
+    run_suite,
+    save_results,
+)
+
+
+def test_compare_flags_regressions():
+    """Test that only throughput drops beyond the threshold count as regressions."""
+    baseline = {"a": {"ops_per_sec": 100.0}, "b": {"ops_per_sec": 100.0}, "gone": {"ops_per_sec": 1}}
+    results = {"a": {"ops_per_sec": 85.0}, "b": {"ops_per_sec": 70.0}, "new": {"ops_per_sec": 1}}
+
+    comparisons = {c["name"]: c for c in compare(results, baseline, threshold=0.2)}
+
+    assert sorted(comparisons) == ["a", "b"]
+    assert not comparisons["a"]["regressed"]
+    assert comparisons["b"]["regressed"]
+    assert comparisons["b"]["change"] == pytest.approx(-0.3)
+
+
+def test_results_round_trip(tmp_path, monkeypatch):
+    """Test that saved results load back unchanged and the autosave setting is kept."""
+    monkeypatch.setenv("HISTORY_FILE", str(tmp_path / "history.csv"))
+    autosave = []
+
+    def setup():
+        autosave.append(os.getenv("HISTORY_FILE"))
+        return lambda: sum(range(100))
+
+    results = {"case": run_case(Case("case", setup), budget=0.01)}
+    assert autosave[0] is None
+    assert os.environ["HISTORY_FILE"] == str(tmp_path / "history.csv")
+    path = str(tmp_path / "baseline.json")
+    save_results(path, results)
+
+    assert load_results(path) == results
+    assert results["case"]["iterations"] >= 5
+    assert results["case"]["p50_us"] <= results["case"]["p99_us"]
+    assert results["case"]["peak_kib"] is not None
+
+
+@pytest.mark.benchmark
+def test_benchmark_suite():
+    """Run the quick suite; compare with BENCHMARK_BASELINE if it is set."""
+    results = run_suite(build_cases(QUICK_SIZES), budget=0.2)
+    assert all(result["ops_per_sec"] > 0 for result in results.values())
+
+    baseline = os.getenv("BENCHMARK_BASELINE")
+    if baseline:
+        regressed = [c["name"] for c in compare(results, load_results(baseline)) if c["regressed"]]
+        assert regressed == []
+
+
+def test_soak_replays_script(repl):
+    """Test a short paced soak run replaying a script."""
+    repl.execute_command(repl.get_command("history"), [])  # import pandas up front
+    workload = Workload(script=["# comment", "add 1 2", "", "divide 1 0", "history"])
+
+    result = run_soak(workload, duration=0.5, rate=200, window=0.1, repl=repl)
+
+    assert result["commands"]["add"]["count"] == result["commands"]["divide"]["count"]
+    assert result["commands"]["divide"]["errors"] == result["commands"]["divide"]["count"]
+    assert len(result["windows"]) >= 4
+    assert result["summary"]["ops"] == sum(c["count"] for c in result["commands"].values())
+    # Pacing caps the count at about rate * duration; a slow machine only lowers it
+    assert 0 < result["summary"]["ops"] <= 110
+    assert all(w["p50_ms"] <= w["p99_ms"] for w in result["windows"])
+
+
+def test_soak_summary_flags_growth():
+    """Test that steady memory growth and superlinear slowdowns are reported."""
+    windows = [
+        {"t": t, "ops": 10, "errors": 0, "log_rollovers": 0, "p50_ms": 1.0 + t, "rss_mib": 50.0 + 10 * t,
+         "history_entries": 1000 * (t + 1)}
+        for t in range(5)
+    ]
+    recorder = _LatencyRecorder(random.Random(0))
+    recorder.window_entries = [1000, 2000, 4000, 8000]
+    recorder.window_p50s = [1.0, 4.0, 16.0, 64.0]
+
+    summary = summarize(windows, {"history": recorder})
+
+    assert summary["rss_growth_mib_per_hour"] == pytest.approx(36000)
+    assert summary["latency_growth"] == pytest.approx(5.0)
+    assert len(summary["warnings"]) == 2
+    assert "exponent 2.00" in summary["warnings"][1]
+    assert parse_mix("add=3, divide=1") == {"add": 3.0, "divide": 1.0}
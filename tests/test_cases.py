@@ -1,5 +1,7 @@
 """Test module for the REPL calculator application."""
 
+import time
+
 import pandas as pd
 import pytest
 from app.calculator import Calculator
@@ -92,6 +94,13 @@ def test_stop_repl(repl):
     assert repl.running is False
 
 
+def test_exit_command_stops_running_repl(repl):
+    """Test that the exit command stops the REPL that dispatched it."""
+    repl.running = True
+    assert repl.get_command("exit").execute() == "Exiting application"
+    assert repl.running is False
+
+
 def test_register_builtin_commands(repl):
     """Test that all expected built-in commands are registered."""
     commands = (
@@ -156,14 +165,18 @@ def test_history_manager_initialization(history_manager):
         "operation",
         "expression",
         "result",
+        "timestamp",
     ]
 
 
 def test_add_entry(history_manager):
     """Test adding an entry to history."""
+    before = time.time_ns()
     history_manager.add_entry("add", "2 + 3", 5)
     assert len(history_manager._history) == 1
-    assert history_manager._history.iloc[0].to_dict() == {
+    entry = history_manager._history.iloc[0].to_dict()
+    assert before <= entry.pop("timestamp") <= time.time_ns()
+    assert entry == {
         "operation": "add",
         "expression": "2 + 3",
         "result": "5",
@@ -207,6 +220,35 @@ def test_save_and_load_history(history_manager, tmp_path):
     assert new_history_manager._history.iloc[0]["operation"] == "power"
 
 
+def test_merge_history_skips_duplicates(history_manager, tmp_path):
+    """Test that merging appends only entries not already in the history."""
+    history_manager.add_entry("add", "2 + 3", 5)
+    history_manager.add_entry("multiply", "2 * 3", 6)
+    file_path = tmp_path / "other.csv"
+    pd.DataFrame(
+        {
+            "operation": ["add", "subtract", "subtract", "multiply"],
+            "expression": ["2 + 3", "5 - 1", "5 - 1", "2 * 3"],
+            "result": [5.0, 4.0, 4.0, 7.0],
+        }
+    ).to_csv(file_path, index=False)
+
+    assert history_manager.merge_history(pd.read_csv(file_path)) == (2, 2)
+    history_manager.add_entry("divide", "8 / 2", 4)
+    assert history_manager.merge_history(pd.read_csv(file_path)) == (0, 4)
+    assert history_manager._history["expression"].tolist() == [
+        "2 + 3",
+        "2 * 3",
+        "5 - 1",
+        "2 * 3",
+        "8 / 2",
+    ]
+
+    repl = REPL()
+    output = repl.execute_command(repl.get_command("import_csv"), [str(file_path), "--merge"])
+    assert output == f"History merged from {file_path}: 0 new, 4 duplicate records"
+
+
 def test_invalid_load_history(history_manager, tmp_path):
     """Test loading a non-existent or invalid history file."""
     file_path = tmp_path / "non_existent.csv"
@@ -282,6 +324,9 @@ def test_delete_command_invalid_index(simple_calculator):
 @pytest.fixture
 def calculator():
     class MockCalculator:
+        def resolve(self, operand):
+            return operand
+
         def calculate(self, operation, *args):
             if operation == "add":
                 return float(args[0]) + float(args[1])
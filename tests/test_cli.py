@@ -0,0 +1,79 @@
+"""Tests for one-shot command execution from the command line."""
+
+import io
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from app.cli import EXIT_FAILURE, EXIT_OK, EXIT_USAGE, run_command
+from app.history_manager import HistoryManager
+
+MAIN_SCRIPT = Path(__file__).resolve().parent.parent / "main.py"
+
+
+def run(*argv):
+    """Run a one-shot command and return its status, stdout and stderr."""
+    stdout, stderr = io.StringIO(), io.StringIO()
+    status = run_command(list(argv), stdout=stdout, stderr=stderr)
+    return status, stdout.getvalue().strip(), stderr.getvalue().strip()
+
+
+def test_exit_status():
+    """Test the output and exit status of successful, failed and unknown commands."""
+    assert run("add", "2", "3") == (EXIT_OK, "Result: 5.0", "")
+    assert run("divide", "1", "0") == (EXIT_FAILURE, "", "Error: Division by zero")
+    assert run("delete") == (EXIT_FAILURE, "", "Error: Please specify an index to delete")
+    assert run("nope", "1") == (EXIT_USAGE, "", "Unknown command: nope")
+    assert run()[0] == EXIT_USAGE
+    assert run("square", "x") == (EXIT_FAILURE, "", "Please provide a valid number")
+
+
+def test_appends_without_loading_history(tmp_path, monkeypatch):
+    """Test that adding commands append to HISTORY_FILE instead of loading it."""
+    history_file = tmp_path / "history.csv"
+    history_file.write_text("operation,expression,result\nadd,1.0 + 1.0,2.0\n")
+    monkeypatch.setenv("HISTORY_FILE", str(history_file))
+    monkeypatch.setattr(
+        HistoryManager, "load_history", lambda self, filename: pytest.fail("history loaded")
+    )
+
+    assert run("multiply", "2", "3")[0] == EXIT_OK
+    HistoryManager._instance = None
+    assert run("primes", "10") == (EXIT_OK, "Result: 4", "")
+
+    assert history_file.read_text().splitlines() == [
+        "operation,expression,result",
+        "add,1.0 + 1.0,2.0",
+        "multiply,2.0 * 3.0,6.0",
+        "primes,primes(10),4",
+    ]
+
+
+def test_history_commands_load_history(tmp_path, monkeypatch):
+    """Test that commands reading the history still load it."""
+    history_file = tmp_path / "history.csv"
+    history_file.write_text("operation,expression,result\nadd,1.0 + 1.0,2.0\n")
+    monkeypatch.setenv("HISTORY_FILE", str(history_file))
+
+    status, output, _ = run("history")
+    assert status == EXIT_OK
+    assert "0: 1.0 + 1.0 = 2.0" in output
+
+
+def test_main_entry_point(tmp_path):
+    """Test running a command through main.py in a fresh interpreter."""
+    for name in ("logging.yaml", ".env"):
+        shutil.copy(MAIN_SCRIPT.parent / name, tmp_path)
+    completed = subprocess.run(
+        [sys.executable, str(MAIN_SCRIPT), "add", "2", "3"],
+        capture_output=True,
+        text=True,
+        env={"PATH": "", "HISTORY_FILE": str(tmp_path / "history.csv")},
+        # Logs and caches go to the temporary directory, not the repository
+        cwd=tmp_path,
+        check=False,
+    )
+    assert completed.returncode == EXIT_OK
+    assert completed.stdout.strip() == "Result: 5.0"
@@ -0,0 +1,107 @@
+"""Tests for the v2 (vectorizable) command interface and batch execution."""
+
+import pytest
+from app.calculator import Calculator
+from app.commands.arithmetic import AddCommand, DivideCommand
+from app.commands.base import Command, LegacyCommandAdapter, as_vectorized
+from app.commands.batch import BatchCommand, execute_rows, run_batch
+from app.plugins.square_plugin.square_command import SquareCommand
+
+
+@pytest.fixture(name="calculator")
+def fixture_calculator():
+    """Fixture that provides a Calculator backed by a fresh history."""
+    return Calculator()
+
+
+class EchoCommand(Command):
+    """A v1 command used to test the legacy adapter."""
+
+    name = "echo"
+
+    def execute(self, *args) -> str:
+        return " ".join(args)
+
+
+def test_arity_error_message(calculator):
+    """Test that v2 commands reject the wrong number of arguments."""
+    assert AddCommand(calculator).execute("1") == "Error: 'add' requires exactly two arguments"
+    assert SquareCommand(calculator).execute() == "Usage: square <number>"
+
+
+def test_legacy_command_adapter(calculator):
+    """Test that v1 commands run unchanged through the v2 interface."""
+    command = as_vectorized(EchoCommand(calculator))
+    assert isinstance(command, LegacyCommandAdapter)
+    assert not command.supports_batch()
+    assert run_batch(command, [("a", "b"), ("c",)]) == ["a b", "c"]
+
+
+def test_execute_rows_uses_batch_hook(calculator, monkeypatch):
+    """Test that valid rows are computed with one execute_batch call."""
+    command = AddCommand(calculator)
+    monkeypatch.setattr(command, "compute", lambda *values: pytest.fail("row-wise compute"))
+    rows = execute_rows(command, [("1", "2"), ("3", "4"), ("5",)])
+
+    assert [result for _, result, _ in rows[:2]] == [3.0, 7.0]
+    assert "requires exactly two arguments" in str(rows[2][2])
+    assert len(calculator.get_history()) == 2
+
+
+def test_execute_rows_falls_back_to_row_wise(calculator):
+    """Test that a rejected batch reports each error against its own row."""
+    outputs = run_batch(DivideCommand(calculator), [("8", "2"), ("1", "0"), ("9", "3")])
+
+    assert outputs == ["Result: 4.0", "Error: Division by zero", "Result: 3.0"]
+    assert list(calculator.get_history()["expression"]) == ["8.0 / 2.0", "9.0 / 3.0"]
+
+
+def test_square_command_batch(calculator):
+    """Test the square plugin through both interfaces."""
+    command = SquareCommand(calculator)
+    assert command.execute("3") == "The square of 3.0 is 9.0"
+    assert command.execute("x") == "Please provide a valid number"
+    assert run_batch(command, [("2",), ("x",), ("4",)]) == [
+        "The square of 2.0 is 4.0",
+        "Please provide a valid number",
+        "The square of 4.0 is 16.0",
+    ]
+
+
+def test_batch_command_runs_file(calculator, tmp_path):
+    """Test that the batch command runs a file, grouping consecutive commands."""
+    script = tmp_path / "script.txt"
+    script.write_text("# totals\nadd 1 2\nadd 3 4\n\nmultiply 2 5\nnope 1\n")
+
+    output = BatchCommand(calculator).execute(str(script))
+
+    assert output.splitlines() == [
+        "add 1 2: Result: 3.0",
+        "add 3 4: Result: 7.0",
+        "multiply 2 5: Result: 10.0",
+        "nope 1: Unknown command: nope",
+    ]
+    assert len(calculator.get_history()) == 3
+    assert BatchCommand(calculator).execute(str(tmp_path / "missing.txt")).startswith(
+        "Error reading batch file"
+    )
+
+
+def test_batch_updates_saves_once(calculator, tmp_path, monkeypatch):
+    """Test that autosave is postponed until the outermost batch block exits."""
+    history_file = tmp_path / "history.csv"
+    monkeypatch.setenv("HISTORY_FILE", str(history_file))
+    manager = calculator.history_manager
+    saves = []
+    original_save = manager.save_history
+    monkeypatch.setattr(manager, "save_history", lambda path: saves.append(original_save(path)))
+
+    with manager.batch_updates():
+        with manager.batch_updates():
+            calculator.calculate("add", 1, 2)
+        calculator.calculate_batch("multiply", [1, 2], [3, 4])
+        assert not saves
+
+    assert len(saves) == 1
+    assert history_file.exists()
+    assert len(manager.get_history()) == 3
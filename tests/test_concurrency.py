@@ -0,0 +1,123 @@
+"""Multi-threaded stress tests for the calculator and its singletons."""
+
+import threading
+
+import pytest
+from app.calculator import Calculator
+from app.history_manager import HistoryManager
+from app.plugins.plugin_loader import PluginLoader
+
+THREADS = 8
+CALCULATIONS_PER_THREAD = 250
+
+
+@pytest.fixture(name="history_manager")
+def fixture_history_manager():
+    """Fixture that provides a fresh HistoryManager without autosave."""
+    return HistoryManager()
+
+
+def _run_threads(target, count=THREADS):
+    """Start ``count`` threads running ``target(thread_index)`` and join them."""
+    barrier = threading.Barrier(count)
+    errors = []
+
+    def worker(thread_index):
+        try:
+            barrier.wait()
+            target(thread_index)
+        except Exception as e:  # pragma: no cover - only reached on failure
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+
+
+def test_singleton_creation_is_thread_safe():
+    """Test that concurrent constructors all receive the same instance."""
+    history_managers = [None] * THREADS
+    plugin_loaders = [None] * THREADS
+
+    def create(thread_index):
+        history_managers[thread_index] = HistoryManager()
+        plugin_loaders[thread_index] = PluginLoader()
+
+    _run_threads(create)
+    assert len({id(instance) for instance in history_managers}) == 1
+    assert len({id(instance) for instance in plugin_loaders}) == 1
+
+
+def test_concurrent_calculations_lose_no_entries(history_manager):
+    """Test that concurrent calculate() calls record every entry exactly once."""
+    calculator = Calculator()
+
+    def calculate(thread_index):
+        for i in range(CALCULATIONS_PER_THREAD):
+            calculator.calculate("add", thread_index, i)
+
+    _run_threads(calculate)
+    history = history_manager.get_history()
+    assert len(history) == THREADS * CALCULATIONS_PER_THREAD
+    expected = {
+        f"{float(t)} + {float(i)}"
+        for t in range(THREADS)
+        for i in range(CALCULATIONS_PER_THREAD)
+    }
+    assert set(history["expression"]) == expected
+
+
+def test_per_thread_append_order_is_preserved(history_manager):
+    """Test that entries from one thread keep their relative order."""
+
+    def append(thread_index):
+        for i in range(CALCULATIONS_PER_THREAD):
+            history_manager.add_entry(f"t{thread_index}", str(i), i)
+
+    _run_threads(append)
+    history = history_manager.get_history()
+    for thread_index in range(THREADS):
+        rows = history[history["operation"] == f"t{thread_index}"]
+        assert list(rows["expression"]) == [
+            str(i) for i in range(CALCULATIONS_PER_THREAD)
+        ]
+
+
+def test_readers_see_consistent_snapshots(history_manager):
+    """Test that snapshots taken during writes never shrink or tear."""
+    snapshot_lengths = []
+    writers_done = threading.Event()
+
+    def read_and_write(thread_index):
+        if thread_index == 0:
+            while not writers_done.is_set():
+                snapshot = history_manager.get_history()
+                assert list(snapshot.columns) == ["operation", "expression", "result", "timestamp"]
+                assert not snapshot.isnull().values.any()
+                snapshot_lengths.append(len(snapshot))
+            return
+        for i in range(CALCULATIONS_PER_THREAD):
+            history_manager.add_entry("add", f"{i} + 0", i)
+        if thread_index == 1:
+            writers_done.set()
+
+    _run_threads(read_and_write, count=4)
+    assert snapshot_lengths == sorted(snapshot_lengths)
+    assert len(history_manager.get_history()) == 3 * CALCULATIONS_PER_THREAD
+
+
+def test_concurrent_deletes_and_appends(history_manager):
+    """Test that deletes interleaved with appends keep the count consistent."""
+    for i in range(THREADS * 10):
+        history_manager.add_entry("add", f"{i} + 0", i)
+
+    def mutate(thread_index):
+        for i in range(10):
+            history_manager.add_entry("multiply", f"{thread_index} * {i}", 0)
+            assert history_manager.delete_entry(0) is True
+
+    _run_threads(mutate)
+    assert len(history_manager.get_history()) == THREADS * 10
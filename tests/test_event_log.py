@@ -0,0 +1,128 @@
+"""Tests for the structured calculation event log."""
+
+import json
+import time
+
+import pytest
+from app.calculator import Calculator
+from app.event_log import EventLog, EventLogConfig, get_event_log
+
+
+class FakeClock:
+    """A manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def read_events(path):
+    """Return the events written to a JSON Lines file."""
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_rate_limit_reports_suppressed_events(tmp_path):
+    """Test that events over the per-second limit are counted, not lost silently."""
+    path = tmp_path / "events.jsonl"
+    clock = FakeClock()
+    log = EventLog(str(path), rate_limit=5, batch_size=100, flush_interval=0, clock=clock)
+
+    kept = [log.record("calculation", index=i) for i in range(20)]
+    clock.now = 1.0
+    kept.append(log.record("calculation", index=20))
+    log.close()
+
+    assert kept.count(True) == 6
+    events = read_events(path)
+    assert [e["index"] for e in events if e["event"] == "calculation"] == [0, 1, 2, 3, 4, 20]
+    assert events[-1]["event"] == "suppressed"
+    assert events[-1]["rate_limited"] == 15
+
+
+def test_sampling(tmp_path):
+    """Test that sampled-out events are only counted."""
+    path = tmp_path / "events.jsonl"
+    log = EventLog(str(path), sample_rate=0, rate_limit=0, flush_interval=0)
+    assert not any(log.record("calculation") for _ in range(10))
+    log.close()
+
+    assert [(e["event"], e["sampled_out"]) for e in read_events(path)] == [("suppressed", 10)]
+
+
+def test_dropped_events_are_flushed_in_the_background(tmp_path):
+    """Test that a log that drops every event still reports them before exit."""
+    path = tmp_path / "events.jsonl"
+    log = EventLog(str(path), sample_rate=0, flush_interval=0.01)
+    assert not log.record("calculation")
+    deadline = time.monotonic() + 5
+    while not path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    log.close()
+
+    assert [(e["event"], e["sampled_out"]) for e in read_events(path)] == [("suppressed", 1)]
+
+
+def test_events_are_written_in_blocks(tmp_path, monkeypatch):
+    """Test that events are buffered until a batch is full."""
+    path = tmp_path / "events.jsonl"
+    log = EventLog(str(path), rate_limit=0, batch_size=4, flush_interval=0)
+    writes = []
+    original_flush = log.flush
+    monkeypatch.setattr(log, "flush", lambda: writes.append(original_flush()))
+
+    for i in range(3):
+        log.record("calculation", index=i)
+    assert not path.exists()
+    log.record("calculation", index=3)
+
+    assert writes == [4]
+    assert len(read_events(path)) == 4
+
+
+def test_invalid_configuration():
+    """Test that invalid settings are rejected."""
+    with pytest.raises(ValueError):
+        EventLog("events.jsonl", sample_rate=2)
+    with pytest.raises(ValueError):
+        EventLog("events.jsonl", batch_size=0)
+
+
+def test_invalid_environment_falls_back_to_defaults(tmp_path, monkeypatch, caplog):
+    """Test that invalid EVENT_LOG_* values are reported once and do not fail calculations."""
+    monkeypatch.setattr(EventLog, "_instance", None)
+    monkeypatch.setenv("EVENT_LOG_SAMPLE_RATE", "all")
+    monkeypatch.setenv("EVENT_LOG_BATCH_SIZE", "0")
+
+    calculator = Calculator()
+    assert calculator.calculate("add", 2, 3) == 5.0
+    assert calculator.calculate("add", 1, 1) == 2.0
+
+    log = get_event_log()
+    log.close()
+    assert log.config == EventLogConfig(path=str(tmp_path / "events.jsonl"))
+    assert len(read_events(tmp_path / "events.jsonl")) == 2
+    assert [r.message for r in caplog.records if "Invalid event log settings" in r.message] == [
+        "Invalid event log settings, using the defaults: could not convert string to float: 'all'"
+    ]
+
+
+def test_calculator_records_events(tmp_path, monkeypatch):
+    """Test that calculations go to the event log."""
+    path = tmp_path / "events.jsonl"
+    log = EventLog(str(path), rate_limit=0, flush_interval=0)
+    monkeypatch.setattr(EventLog, "_instance", log)
+
+    calculator = Calculator()
+    calculator.calculate("add", 2, 3)
+    calculator.calculate_batch("multiply", [1, 2], [3, 4])
+    log.close()
+
+    events = read_events(path)
+    assert events[0]["event"] == "calculation"
+    assert events[0]["expression"] == "2.0 + 3.0"
+    assert events[0]["result"] == 5.0
+    assert (events[1]["event"], events[1]["count"]) == ("calculation_batch", 2)
@@ -0,0 +1,82 @@
+"""Tests for per-session history namespaces."""
+
+import pytest
+from app.calculator import Calculator
+from app.history_manager import HistoryManager
+from app.history_namespaces import HistoryNamespaces
+from app.repl import REPL
+
+
+@pytest.fixture
+def namespaces(tmp_path, monkeypatch):
+    """Install process-wide namespaces in a temporary directory, two kept in memory."""
+    namespaces = HistoryNamespaces(str(tmp_path / "history"), max_live=2)
+    monkeypatch.setattr(HistoryNamespaces, "_instance", namespaces)
+    return namespaces
+
+
+def test_namespaces_are_isolated(namespaces, tmp_path):
+    """Test that each namespace has its own history and autosave file."""
+    alice, bob, default = Calculator("alice"), Calculator("bob"), Calculator()
+
+    alice.calculate("add", 1, 2)
+    bob.calculate("multiply", 2, 3)
+    bob.calculate("subtract", 5, 1)
+
+    assert alice.get_history()["expression"].tolist() == ["1.0 + 2.0"]
+    assert len(bob.get_history()) == 2
+    assert default.get_history().empty
+    assert default.history_manager is HistoryManager()
+    assert (tmp_path / "history" / "bob.csv").read_text().count("\n") == 3
+
+
+def test_idle_namespaces_are_evicted_and_reloaded(namespaces):
+    """Test that the least recently used namespace is saved to disk and reloaded on use."""
+    for name in ("a", "b"):
+        Calculator(name).calculate("add", 1, 1)
+    namespaces.get("a")  # "b" is now the least recently used
+
+    Calculator("c").calculate("add", 2, 2)
+
+    assert namespaces.live() == ["a", "c"]
+    assert Calculator("b").get_history()["result"].tolist() == [2.0]
+    assert namespaces.live() == ["c", "b"]
+
+
+def test_calculators_follow_evicted_namespaces(namespaces, caplog):
+    """Test that a calculator keeps using its namespace across evictions, unlike a kept manager."""
+    calculator = Calculator("a")
+    calculator.calculate("add", 1, 1)
+    stale = namespaces.get("a")
+    assert stale.undo_counts() == (1, 0)
+    for name in ("b", "c"):
+        Calculator(name).calculate("add", 2, 2)
+    assert "Evicting history namespace a discards 1 undo and 0 redo steps" in caplog.text
+    assert stale.undo_counts() == (0, 0)
+
+    calculator.calculate("add", 3, 3)
+
+    assert namespaces.get("a") is not stale
+    assert calculator.get_history()["expression"].tolist() == ["1.0 + 1.0", "3.0 + 3.0"]
+    assert stale.get_history()["expression"].tolist() == ["1.0 + 1.0"]
+
+
+def test_invalid_namespace_names(namespaces):
+    """Test that namespace names must be safe file names."""
+    for name in ("../etc", "a/b", "", ".."):
+        with pytest.raises(ValueError):
+            Calculator(name)
+
+
+def test_repl_session_commands_use_its_namespace(namespaces, tmp_path):
+    """Test that commands, including CSV export, work on the session's namespace."""
+    repl = REPL(namespace="carol")
+    repl.execute_command(repl.get_command("add"), ["4", "5"])
+    export = tmp_path / "carol_export.csv"
+
+    output = repl.execute_command(repl.get_command("export_csv"), [str(export)])
+
+    assert output == f"History exported to {export}"
+    assert "4.0 + 5.0" in export.read_text()
+    assert HistoryManager().get_history().empty
+    assert "4.0 + 5.0" in repl.execute_command(repl.get_command("history"), [])
@@ -0,0 +1,59 @@
+"""Tests for the vector and matrix plugin."""
+
+import numpy as np
+import pytest
+from app.plugins.linalg_plugin import arrays
+from app.plugins.linalg_plugin.arrays import ArrayStore, checksum, summarize
+
+
+@pytest.fixture(autouse=True)
+def array_store(monkeypatch):
+    """Give every test an empty array store."""
+    monkeypatch.setattr(arrays, "_store", ArrayStore())
+
+
+def test_operations_on_inline_and_named_arrays(repl, run):
+    """Test the operations, keeping results by name and recording summaries in the history."""
+    assert run("array let m [[2,0],[0,4]]") == f"m = {summarize(np.array([[2.0, 0.0], [0.0, 4.0]]))}"
+    assert run("solve m [2,8] --as x") == "Result: x = [1., 2.]"
+    assert run("dot x x") == "Result: 5.0"
+    assert run("matmul m x") == "Result: [2., 8.]"
+    assert run("vdiv x [0,4]") == "Result: [inf, 0.5]"
+    assert run("transpose [[1,2]]") == "Result: [[1.],\n [2.]]"
+    assert run("norm x 1") == "Result: 3.0"
+    assert run("vadd x [1,2,3]").startswith("Error: operands could not be broadcast")
+    assert run("solve [[1,2],[2,4]] [1,1]") == "Error: Singular matrix"
+    assert run("dot x nope") == "Error: Unknown array: nope"
+
+    history = repl.calculator.get_history()
+    assert history["expression"].tolist() == [
+        "solve(m, [2,8])",
+        "dot(x, x)",
+        "m @ x",
+        "x / [0,4]",
+        "transpose([[1,2]])",
+        "norm(x, 1)",
+    ]
+    assert history["result"].tolist()[1] == "5.0"
+    assert history["result"].tolist()[0] == f"ndarray(shape=(2,), dtype=float64, crc32={checksum(np.array([1.0, 2.0]))})"
+
+
+def test_files_are_memory_mapped_and_cached(repl, run, tmp_path):
+    """Test that .npy files are memory-mapped and files are loaded once while unchanged."""
+    large = tmp_path / "large.npy"
+    np.save(large, np.arange(1_000, dtype=np.float64).reshape(10, 100))
+    csv = tmp_path / "v.csv"
+    csv.write_text("1,2,3\n")
+    store = arrays.get_store()
+
+    assert isinstance(store.load_file(str(large)), np.memmap)
+    assert store.load_file(str(large)) is store.load_file(str(large))
+    assert run(f"matmul {large} {large}").startswith("Error: matmul")
+    assert run(f"vmul {large} 2 --as r") == f"Result: r = {summarize(store.get('r'))}"
+    assert store.get("r")[9, 99] == 1_998.0
+    assert run(f"vmul {csv} 2") == "Result: [2., 4., 6.]"
+    assert repl.calculator.get_history()["expression"].tolist() == ["large.npy * 2", "v.csv * 2"]
+
+    assert run("array list") == f"r: {summarize(store.get('r'))}"
+    assert run("array drop r") == "Dropped r"
+    assert run("array show r") == "Error: Unknown array: r"
@@ -0,0 +1,104 @@
+"""Tests for the runtime metrics registry and its instrumentation."""
+
+import pytest
+from app.calculator import Calculator
+from app.metrics import REGISTRY, MetricsFileExporter, MetricsRegistry
+from app.repl import REPL
+
+
+def sample(text, line_prefix):
+    """Return the value of the exposition line starting with ``line_prefix``."""
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+def test_histogram_exposition():
+    """Test that histograms render cumulative buckets, sum and count."""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", ("op",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.labels(op="add").observe(value)
+
+    text = registry.render()
+    assert "# TYPE latency_seconds histogram" in text
+    assert sample(text, 'latency_seconds_bucket{op="add",le="0.1"}') == 1
+    assert sample(text, 'latency_seconds_bucket{op="add",le="1"}') == 2
+    assert sample(text, 'latency_seconds_bucket{op="add",le="+Inf"}') == 3
+    assert sample(text, 'latency_seconds_sum{op="add"}') == pytest.approx(5.55)
+    assert sample(text, 'latency_seconds_count{op="add"}') == 3
+
+
+def test_counters_and_gauges():
+    """Test unlabelled counters, callback gauges and label validation."""
+    registry = MetricsRegistry()
+    counter = registry.counter("events_total", "Events")
+    counter.inc()
+    counter.inc(2)
+    registry.gauge("size", "Size").set_function(lambda: 7)
+
+    assert registry.counter("events_total", "Events") is counter
+    with pytest.raises(ValueError):
+        registry.gauge("events_total", "Events")
+    with pytest.raises(ValueError):
+        registry.counter("labelled_total", "Labelled", ("kind",)).labels(other="x")
+
+    text = registry.render()
+    assert sample(text, "events_total") == 3
+    assert sample(text, "size") == 7
+    assert registry.render("size").startswith("# HELP size")
+
+
+def test_calculations_and_commands_are_instrumented():
+    """Test the metrics recorded by the calculator, history and REPL dispatch."""
+    calculator = Calculator()
+    before = REGISTRY.render()
+
+    calculator.calculate("multiply", 2, 3)
+    with pytest.raises(ValueError):
+        calculator.calculate("divide", 1, 0)
+    repl = REPL()
+    repl.execute_command(repl.get_command("add"), ["1", "2"])
+    output = repl.execute_command(repl.get_command("metrics"), ["calculator_"])
+
+    def delta(line_prefix):
+        return (sample(output, line_prefix) or 0) - (sample(before, line_prefix) or 0)
+
+    assert delta('calculator_calculation_duration_seconds_count{operation="multiply"}') == 1
+    assert delta('calculator_calculation_errors_total{operation="divide"}') == 1
+    assert delta('calculator_history_mutations_total{kind="add"}') == 2
+    assert delta('calculator_command_duration_seconds_count{command="add"}') == 1
+    assert sample(output, "calculator_history_entries") == 2
+    assert "calculator_process_resident_memory_bytes" in output
+
+
+def test_file_exporter(tmp_path):
+    """Test that the exporter atomically writes the registry to a file."""
+    registry = MetricsRegistry()
+    registry.counter("events_total", "Events").inc()
+    path = tmp_path / "metrics" / "calculator.prom"
+    exporter = MetricsFileExporter(str(path), interval=60, registry=registry)
+
+    exporter.start()
+    exporter.stop()
+
+    assert sample(path.read_text(), "events_total") == 1
+    assert [p.name for p in path.parent.iterdir()] == ["calculator.prom"]
+
+    # A failed write leaves no temporary file behind
+    (path.parent / "taken").mkdir()
+    assert not MetricsFileExporter(str(path.parent / "taken"), interval=60, registry=registry).write()
+    assert sorted(p.name for p in path.parent.iterdir()) == ["calculator.prom", "taken"]
+
+
+def test_repl_exports_metrics_despite_invalid_interval(tmp_path, monkeypatch):
+    """Test that an invalid METRICS_INTERVAL falls back to the default instead of stopping the REPL."""
+    path = tmp_path / "calculator.prom"
+    monkeypatch.setenv("METRICS_FILE", str(path))
+    monkeypatch.setenv("METRICS_INTERVAL", "often")
+    monkeypatch.setattr("builtins.input", lambda prompt: "exit")
+    repl = REPL()
+    repl.run()
+    assert repl.running is False
+    assert "calculator_process_resident_memory_bytes" in path.read_text()
@@ -0,0 +1,185 @@
+"""Tests for lazy plugin loading from the cached plugin manifest."""
+
+import os
+import sys
+import textwrap
+
+import pytest
+from app.plugins.manifest import EntryPointManifest, LazyCommand, PluginManifest
+from app.plugins.plugin_loader import PluginLoader
+
+PLUGIN_SOURCE = textwrap.dedent(
+    '''
+    from app.commands.base import Command
+
+
+    class HelloCommand(Command):
+        name = "hello"
+        help = "{help}"
+
+        def execute(self, *args) -> str:
+            return "hello " + " ".join(args)
+    '''
+)
+
+
+def _forget(package_name):
+    """Drop a package and its submodules from the import cache."""
+    for module_name in list(sys.modules):
+        if module_name == package_name or module_name.startswith(package_name + "."):
+            del sys.modules[module_name]
+
+
+@pytest.fixture(name="plugin_package")
+def fixture_plugin_package(tmp_path, monkeypatch):
+    """Fixture that creates an importable plugin package with one plugin."""
+    package = tmp_path / "lazy_plugins"
+    plugin = package / "hello_plugin"
+    plugin.mkdir(parents=True)
+    (package / "__init__.py").write_text("")
+    (plugin / "__init__.py").write_text("from .hello import HelloCommand\n")
+    (plugin / "hello.py").write_text(PLUGIN_SOURCE.format(help="Say hello"))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setenv("PLUGIN_MANIFEST_FILE", str(tmp_path / "cache" / "manifest.json"))
+    PluginLoader._instance = None
+    yield plugin
+    PluginLoader._instance = None
+    _forget("lazy_plugins")
+
+
+def test_manifest_lists_commands(plugin_package):
+    """Test that the manifest records each command's help text and module."""
+    manifest = PluginManifest("lazy_plugins").load()
+    assert manifest["hello"]["help"] == "Say hello"
+    assert manifest["hello"]["module"] == "lazy_plugins.hello_plugin.hello"
+    assert manifest["hello"]["class"] == "HelloCommand"
+    assert os.path.exists(os.environ["PLUGIN_MANIFEST_FILE"])
+
+
+def test_manifest_is_served_from_cache(plugin_package, monkeypatch):
+    """Test that an unchanged plugin package is not imported to read the manifest."""
+    PluginManifest("lazy_plugins").load()
+
+    def fail_build(self, packages=None):
+        raise AssertionError("manifest should have been read from cache")
+
+    monkeypatch.setattr(PluginManifest, "build", fail_build)
+    assert "hello" in PluginManifest("lazy_plugins").load()
+
+
+def test_manifest_is_rebuilt_when_plugins_change(plugin_package):
+    """Test that modifying a plugin file invalidates the cached manifest."""
+    PluginManifest("lazy_plugins").load()
+    source = plugin_package / "hello.py"
+    source.write_text(PLUGIN_SOURCE.format(help="Say hello loudly"))
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    _forget("lazy_plugins.hello_plugin")
+
+    assert PluginManifest("lazy_plugins").load()["hello"]["help"] == "Say hello loudly"
+
+
+def test_plugin_imported_on_first_use(plugin_package):
+    """Test that registering commands does not import the plugin module."""
+    PluginManifest("lazy_plugins").load()
+    _forget("lazy_plugins.hello_plugin")
+
+    loader = PluginLoader()
+    commands = loader.load_plugins("lazy_plugins")
+    command = commands["hello"]
+    assert isinstance(command, LazyCommand)
+    assert command.help == "Say hello"
+    assert "lazy_plugins.hello_plugin.hello" not in sys.modules
+
+    assert command().execute("world") == "hello world"
+    assert "lazy_plugins.hello_plugin.hello" in sys.modules
+
+
+def test_load_plugins_scans_package_once(plugin_package, monkeypatch):
+    """Test that repeated load_plugins calls reuse the first scan."""
+    loader = PluginLoader()
+    loader.load_plugins("lazy_plugins")
+    monkeypatch.setattr(
+        PluginManifest, "load", lambda self: pytest.fail("package scanned twice")
+    )
+    assert "hello" in loader.load_plugins("lazy_plugins")
+
+
+def _install_fake_distribution(site_dir, name, commands):
+    """Write a minimal installed distribution publishing calculator commands."""
+    dist_info = site_dir / f"{name}-1.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text(f"Metadata-Version: 2.1\nName: {name}\nVersion: 1.0\n")
+    lines = "".join(
+        f"{command} = {name}_commands:{class_name}\n" for command, class_name in commands.items()
+    )
+    (dist_info / "entry_points.txt").write_text(f"[calculator.commands]\n{lines}")
+    source = "from app.commands.base import Command\n"
+    for command, class_name in commands.items():
+        source += (
+            f"\n\nclass {class_name}(Command):\n"
+            f"    name = '{command}'\n"
+            f"    help = '{command} from {name}'\n\n"
+            f"    def execute(self, *args):\n"
+            f"        return '{command}:' + ','.join(args)\n"
+        )
+    (site_dir / f"{name}_commands.py").write_text(source)
+    # Make sure the directory mtime changes even on coarse-grained filesystems
+    stat = site_dir.stat()
+    os.utime(site_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+@pytest.fixture(name="site_dir")
+def fixture_site_dir(tmp_path, monkeypatch):
+    """Fixture that provides an empty directory on sys.path for fake distributions."""
+    site_dir = tmp_path / "site"
+    site_dir.mkdir()
+    monkeypatch.syspath_prepend(str(site_dir))
+    monkeypatch.setenv("PLUGIN_ENTRY_POINT_CACHE", str(tmp_path / "cache" / "entry_points.json"))
+    PluginLoader._instance = None
+    yield site_dir
+    PluginLoader._instance = None
+    _forget("greeter_commands")
+
+
+def test_entry_point_commands_are_discovered_lazily(site_dir):
+    """Test that entry point commands are registered without importing them."""
+    _install_fake_distribution(site_dir, "greeter", {"greet": "GreetCommand"})
+
+    commands = PluginLoader().load_entry_points()
+    command = commands["greet"]
+    assert isinstance(command, LazyCommand)
+    assert command.distribution == "greeter"
+    assert "greeter_commands" not in sys.modules
+
+    assert command().execute("a", "b") == "greet:a,b"
+    assert command.help == "greet from greeter"
+    assert "greeter_commands" in sys.modules
+
+
+def test_entry_point_discovery_is_cached(site_dir, monkeypatch):
+    """Test that unchanged installations reuse the cached discovery result."""
+    _install_fake_distribution(site_dir, "greeter", {"greet": "GreetCommand"})
+    EntryPointManifest().load()
+
+    monkeypatch.setattr(
+        EntryPointManifest, "build", lambda self: pytest.fail("entry points rescanned")
+    )
+    assert "greet" in EntryPointManifest().load()
+
+
+def test_entry_point_cache_invalidated_by_new_distribution(site_dir):
+    """Test that installing another distribution is picked up."""
+    _install_fake_distribution(site_dir, "greeter", {"greet": "GreetCommand"})
+    assert set(EntryPointManifest().load()) >= {"greet"}
+
+    _install_fake_distribution(site_dir, "waver", {"wave": "WaveCommand"})
+    assert set(EntryPointManifest().load()) >= {"greet", "wave"}
+    _forget("waver_commands")
+
+
+def test_package_commands_take_precedence_over_entry_points(site_dir):
+    """Test that an entry point cannot shadow a command from app.plugins."""
+    _install_fake_distribution(site_dir, "greeter", {"square": "SquareCommand"})
+    commands = PluginLoader().load_plugins()
+    assert commands["square"].module == "app.plugins.square_plugin.square_command"
@@ -0,0 +1,157 @@
+"""Tests for hot-reloading plugin packages."""
+
+import os
+import sys
+import textwrap
+import time
+
+import pytest
+from app.plugins.plugin_loader import PluginLoader
+from app.plugins.watcher import PluginChanges, PluginWatcher
+from app.repl import REPL
+
+PLUGIN_SOURCE = textwrap.dedent(
+    '''
+    from app.commands.base import Command
+
+
+    class {class_name}(Command):
+        name = "{name}"
+        help = "{name} plugin"
+
+        def execute(self, *args) -> str:
+            return "{output}"
+    '''
+)
+
+
+def _write_plugin(package_dir, plugin, name, output):
+    """Write (or rewrite) a one-command plugin package and bump its mtime."""
+    plugin_dir = package_dir / plugin
+    plugin_dir.mkdir(exist_ok=True)
+    class_name = name.capitalize() + "Command"
+    (plugin_dir / "__init__.py").write_text(f"from .commands import {class_name}\n")
+    source = plugin_dir / "commands.py"
+    source.write_text(PLUGIN_SOURCE.format(class_name=class_name, name=name, output=output))
+    # Ensure the change is visible on filesystems with coarse timestamps
+    future = time.time_ns() + 10**9
+    os.utime(source, ns=(future, future))
+
+
+@pytest.fixture(name="package_dir")
+def fixture_package_dir(tmp_path, monkeypatch):
+    """Fixture that creates an importable plugin root with two plugins."""
+    package_dir = tmp_path / "hot_plugins"
+    package_dir.mkdir()
+    (package_dir / "__init__.py").write_text("")
+    _write_plugin(package_dir, "hello_plugin", "hello", "v1")
+    _write_plugin(package_dir, "other_plugin", "other", "other v1")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setenv("PLUGIN_MANIFEST_FILE", str(tmp_path / "manifest.json"))
+    PluginLoader._instance = None
+    yield package_dir
+    PluginLoader._instance = None
+    for module_name in list(sys.modules):
+        if module_name.startswith("hot_plugins"):
+            del sys.modules[module_name]
+
+
+def test_no_changes(package_dir):
+    """Test that polling an unchanged tree reports nothing."""
+    watcher = PluginWatcher("hot_plugins")
+    changes = watcher.reload()
+    assert not changes
+    assert str(changes) == "No plugin changes"
+
+
+def test_changed_plugin_is_reloaded(package_dir):
+    """Test that a modified, already imported plugin is reloaded in place."""
+    loader = PluginLoader()
+    watcher = PluginWatcher("hot_plugins", loader)
+    assert loader.get_command("hello")().execute() == "v1"
+    other_class = loader.get_command("other").load()
+
+    _write_plugin(package_dir, "hello_plugin", "hello", "v2")
+    changes = watcher.reload()
+
+    assert changes.changed_packages == ["hot_plugins.hello_plugin"]
+    assert changes.updated_commands == ["hello"]
+    assert loader.get_command("hello")().execute() == "v2"
+    # Unaffected plugins are neither reloaded nor re-registered
+    assert loader.get_command("other").load() is other_class
+
+
+def test_added_and_removed_plugins(package_dir):
+    """Test that new plugin packages are registered and deleted ones dropped."""
+    loader = PluginLoader()
+    watcher = PluginWatcher("hot_plugins", loader)
+
+    _write_plugin(package_dir, "bye_plugin", "bye", "goodbye")
+    changes = watcher.reload()
+    assert changes.added_packages == ["hot_plugins.bye_plugin"]
+    assert changes.added_commands == ["bye"]
+    assert loader.get_command("bye")().execute() == "goodbye"
+
+    for path in sorted((package_dir / "bye_plugin").rglob("*"), reverse=True):
+        if path.is_file():
+            path.unlink()
+        else:
+            path.rmdir()
+    (package_dir / "bye_plugin").rmdir()
+    changes = watcher.reload()
+    assert changes.removed_packages == ["hot_plugins.bye_plugin"]
+    assert changes.removed_commands == ["bye"]
+    assert loader.get_command("bye") is None
+    assert "hot_plugins.bye_plugin" not in sys.modules
+
+
+def test_auto_reload_notifies_listeners(package_dir):
+    """Test that background auto-reload picks up changes and notifies listeners."""
+    watcher = PluginWatcher("hot_plugins")
+    seen = []
+    watcher.add_listener(seen.append)
+    watcher.start(0.01)
+    try:
+        _write_plugin(package_dir, "hello_plugin", "hello", "v3")
+        deadline = time.time() + 5
+        while not seen and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        watcher.stop()
+    assert not watcher.running
+    assert seen and seen[0].updated_commands == ["hello"]
+
+
+def test_repl_applies_only_affected_entries():
+    """Test that the REPL command table is patched per command."""
+    repl = REPL()
+    add_command = repl.get_command_class("add")
+    changes = PluginChanges()
+    changes.removed_packages = ["app.plugins.square_plugin"]
+    changes.removed_commands = ["square"]
+    repl.apply_plugin_changes(changes)
+    assert repl.get_command_class("square") is None
+    assert repl.get_command_class("add") is add_command
+
+
+def test_reload_command():
+    """Test the reload command modes against the live REPL."""
+    repl = REPL()
+    reload_command = repl.get_command("reload")
+    assert reload_command.execute() == "No plugin changes"
+    assert reload_command.execute("auto", "0.5") == "Plugin auto-reload enabled (every 0.5 seconds)"
+    assert repl.plugin_watcher.running
+    assert reload_command.execute("off") == "Plugin auto-reload disabled"
+    assert not repl.plugin_watcher.running
+    assert reload_command.execute("auto", "x") == "Error: Invalid interval 'x'"
+    assert reload_command.execute("bogus").startswith("Usage:")
+
+
+def test_invalid_auto_reload_interval_is_ignored(monkeypatch):
+    """Test that an invalid PLUGIN_AUTO_RELOAD disables auto-reload instead of stopping the REPL."""
+    monkeypatch.setenv("PLUGIN_AUTO_RELOAD", "soon")
+    monkeypatch.setattr("builtins.input", lambda prompt: "exit")
+    repl = REPL()
+    repl.run()
+    assert repl.running is False
+    assert repl._plugin_watcher is None or not repl._plugin_watcher.running
@@ -0,0 +1,115 @@
+"""Tests for running CPU-bound commands in worker processes."""
+
+from concurrent.futures import CancelledError
+
+import pytest
+from app.calculator import Calculator
+from app.history_manager import HistoryManager
+from app.plugins.primes_plugin.primes_command import PrimeCountCommand, count_primes
+from app.process_runner import ProcessCommandRunner
+from app.repl import REPL
+from app.shared_history import SharedHistoryReader
+
+
+@pytest.fixture(name="history_manager")
+def fixture_history_manager():
+    """Fixture that provides a fresh HistoryManager without autosave."""
+    return HistoryManager()
+
+
+@pytest.fixture(name="runner")
+def fixture_runner(history_manager):
+    """Fixture that provides a single-worker runner."""
+    runner = ProcessCommandRunner(max_workers=1, history_manager=history_manager)
+    yield runner
+    runner.shutdown()
+
+
+def test_count_primes():
+    """Test the sieve used by the example CPU-bound plugin."""
+    assert count_primes(0) == 0
+    assert count_primes(2) == 0
+    assert count_primes(3) == 1
+    assert count_primes(100) == 25
+
+
+def test_primes_command_in_process(history_manager):
+    """Test the primes command when run directly."""
+    command = PrimeCountCommand(Calculator())
+    assert command.cpu_bound is True
+    assert command.execute("1000") == "Result: 168"
+    assert command.execute() == "Error: 'primes' requires exactly one argument"
+    assert command.execute("x") == "Error: Invalid limit 'x'"
+    assert history_manager.get_history().iloc[0]["expression"] == "primes(1000)"
+
+
+def test_worker_results_flow_into_history(runner, history_manager):
+    """Test that entries recorded in a worker are appended to the parent history."""
+    assert runner.run(PrimeCountCommand, "10000") == "Result: 1229"
+    history = history_manager.get_history()
+    assert len(history) == 1
+    assert history.iloc[0].drop("timestamp").to_dict() == {
+        "operation": "primes",
+        "expression": "primes(10000)",
+        "result": "1229",
+    }
+
+
+def test_workers_do_not_publish_the_history(tmp_path, monkeypatch):
+    """Test that only the parent publishes to HISTORY_SHARED_FILE, not the workers."""
+    path = tmp_path / "history.shm"
+    monkeypatch.setenv("HISTORY_SHARED_FILE", str(path))
+    history_manager = HistoryManager()
+    history_manager.add_entry("add", "1.0 + 2.0", 3.0)
+    runner = ProcessCommandRunner(max_workers=1, history_manager=history_manager)
+    try:
+        assert runner.run(PrimeCountCommand, "100") == "Result: 25"
+    finally:
+        runner.shutdown()
+
+    assert SharedHistoryReader(str(path)).snapshot().rows["result"].tolist() == [3.0, 25.0]
+
+
+def test_workers_do_not_record_undo(history_manager, tmp_path, monkeypatch):
+    """Test that clearing the workers' scratch history spills nothing for undo."""
+    monkeypatch.setenv("UNDO_SPILL_DIR", str(tmp_path / "undo"))
+    runner = ProcessCommandRunner(max_workers=1, history_manager=history_manager)
+    try:
+        for limit in ("100", "1000", "10000"):
+            runner.run(PrimeCountCommand, limit)
+    finally:
+        runner.shutdown()
+    assert len(history_manager.get_history()) == 3
+    assert not (tmp_path / "undo").exists()
+
+
+def test_timeout_cancels_and_restarts_pool(runner, history_manager):
+    """Test that a timed out command is killed and the pool keeps working."""
+    result = runner.run(PrimeCountCommand, "200000000", timeout=0.2)
+    assert result == "Error: 'primes' timed out after 0.2 seconds"
+    assert history_manager.get_history().empty
+    assert runner.run(PrimeCountCommand, "100") == "Result: 25"
+
+
+def test_cancel_queued_command(runner):
+    """Test that a command still waiting for a worker can be cancelled."""
+    running = runner.submit(PrimeCountCommand, "20000000")
+    queued = runner.submit(PrimeCountCommand, "100")
+    assert runner.cancel(queued) is True
+    with pytest.raises(CancelledError):
+        queued.result()
+    runner.cancel(running)
+    assert runner.run(PrimeCountCommand, "10") == "Result: 4"
+
+
+def test_repl_dispatches_cpu_bound_commands(history_manager, monkeypatch):
+    """Test that the REPL runs CPU-bound commands through the process runner."""
+    monkeypatch.setenv("PROCESS_WORKERS", "1")
+    repl = REPL()
+    try:
+        command = repl.get_command("primes")
+        assert repl.execute_command(command, ["1000"]) == "Result: 168"
+        assert repl.process_runner is not None
+        assert repl.calculator.get_history().iloc[-1]["result"] == "168"
+    finally:
+        repl.process_runner.shutdown()
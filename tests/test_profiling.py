@@ -0,0 +1,87 @@
+"""Tests for on-demand profiling of commands and sessions."""
+
+import pstats
+import tracemalloc
+
+import pytest
+
+import main
+from app.history_manager import HistoryManager
+from app.plugins.plugin_loader import PluginLoader
+from app.profiling import Profiler
+from app.repl import REPL
+
+
+def make_repl():
+    """Return a REPL with fresh singletons."""
+    HistoryManager._instance = None
+    PluginLoader._instance = None
+    return REPL()
+
+
+def test_profiler_report():
+    """Test that the report lists hot functions and allocation sites."""
+
+    def allocate():
+        return [str(i) for i in range(10_000)]
+
+    with Profiler(top=5) as profiler:
+        kept = allocate()
+
+    report = profiler.report()
+    assert "Top 5 functions by cumulative time" in report
+    assert "allocate" in report
+    assert "test_profiling.py" in report.split("allocation sites:")[1]
+    assert len(kept) == 10_000
+    assert not tracemalloc.is_tracing()
+
+
+def test_failed_stop_releases_the_profiler(monkeypatch):
+    """Test that another profiler can start after collecting results fails."""
+    profiler = Profiler()
+    profiler.start()
+    with monkeypatch.context() as patch:
+        patch.setattr(tracemalloc, "take_snapshot", lambda: 1 / 0)
+        with pytest.raises(ZeroDivisionError):
+            profiler.stop()
+    tracemalloc.stop()
+
+    with Profiler() as profiler:
+        pass
+    assert profiler.stats is not None
+
+
+def test_profile_command_saves_results(tmp_path):
+    """Test profiling a plugin command in-process and saving the results."""
+    repl = make_repl()
+    prefix = tmp_path / "profiles" / "primes"
+
+    output = repl.execute_command(
+        repl.get_command("profile"), ["--top", "3", "--save", str(prefix), "primes", "1000"]
+    )
+
+    assert output.startswith("Result: 168")
+    assert "count_primes" in output
+    assert repl.process_runner is None
+    assert pstats.Stats(f"{prefix}.pstats").total_calls > 0
+    assert tracemalloc.Snapshot.load(f"{prefix}.tracemalloc").traces is not None
+
+
+def test_profile_command_errors():
+    """Test usage errors and nested profiling."""
+    repl = make_repl()
+    profile = repl.get_command("profile")
+
+    assert profile.execute().startswith("Usage")
+    assert profile.execute("--top", "x", "add").startswith("Error")
+    assert profile.execute("nope").startswith("Error: Unknown command")
+    assert "A profiler is already active" in profile.execute("profile", "add", "1", "2")
+
+
+def test_profile_flag(capsys):
+    """Test that --profile reports on the whole run to stderr."""
+    assert main.main(["--profile", "add", "2", "3"]) == 0
+
+    captured = capsys.readouterr()
+    assert captured.out.strip() == "Result: 5.0"
+    assert "run_command" in captured.err
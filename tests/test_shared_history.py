@@ -0,0 +1,120 @@
+"""Tests for the shared-memory export of the history."""
+
+import subprocess
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+from app.history_manager import HistoryManager
+from app.shared_history import OPERATIONS, SharedHistoryPublisher, SharedHistoryReader
+
+READER_SCRIPT = """
+import sys
+from app.shared_history import SharedHistoryReader
+
+reader = SharedHistoryReader(sys.argv[1])
+snapshots = 0
+while True:
+    snapshot = reader.snapshot(timeout=10)
+    rows = snapshot.rows
+    # Every published row is complete: its result matches its operands
+    assert (rows["lhs"] + rows["rhs"] == rows["result"]).all(), "torn row"
+    snapshots += 1
+    if len(rows) >= int(sys.argv[2]):
+        break
+print(snapshots, len(rows))
+"""
+
+
+@pytest.fixture
+def manager():
+    """A fresh in-memory history."""
+    return HistoryManager()
+
+
+def test_readers_see_new_rows_and_rewrites(manager, tmp_path):
+    """Test that appended rows are visible without invalidating snapshots, unlike rewrites."""
+    path = str(tmp_path / "history.shm")
+    manager.add_entry("add", "1.0 + 2.0", 3.0)
+    manager.publish_to(SharedHistoryPublisher(path, capacity=2))
+    reader = SharedHistoryReader(path)
+    first = reader.snapshot()
+
+    manager.add_entry("divide", "1.0 / 4.0", 0.25)
+    manager.add_entries([("power", "2 ^ 3", 8), ("multiply", "2.0 * 3.0", 6.0)])
+    snapshot = reader.snapshot()
+
+    assert len(first.rows) == 1 and not reader.stale(first)
+    assert snapshot.rows["result"].tolist() == [3.0, 0.25, 8.0, 6.0]
+    assert snapshot.rows["lhs"][:2].tolist() == [1.0, 1.0]
+    assert np.isnan(snapshot.rows["lhs"][2])
+    assert [OPERATIONS[code] for code in snapshot.rows["operation"]] == ["add", "divide", "other", "multiply"]
+    assert len(manager.get_history()) == 4
+
+    manager.delete_entry(0)
+    assert reader.stale(snapshot)
+    assert reader.snapshot().rows["result"].tolist() == [0.25, 8.0, 6.0]
+
+    manager.merge_history(pd.DataFrame({"operation": ["add"], "expression": ["5.0 + 5.0"], "result": [10.0]}))
+    assert reader.snapshot().rows["result"].tolist() == [0.25, 8.0, 6.0, 10.0]
+
+
+def test_rows_read_before_a_rewrite_are_detected(manager, tmp_path):
+    """Test that snapshot rows are a view overwritten by rewrites, which stale() reports."""
+    path = str(tmp_path / "history.shm")
+    manager.add_entries([("add", "1.0 + 2.0", 3.0), ("add", "2.0 + 2.0", 4.0)])
+    manager.publish_to(SharedHistoryPublisher(path))
+    reader = SharedHistoryReader(path)
+    snapshot = reader.snapshot()
+    kept = snapshot.rows.copy()
+    assert not reader.stale(snapshot)
+
+    manager.clear_history()
+    manager.add_entries([("multiply", "5.0 * 2.0", 10.0), ("add", "1.0 + 1.0", 2.0)])
+
+    # The view shows the new rows, so values read from it must be discarded
+    assert snapshot.rows["result"].tolist() == [10.0, 2.0]
+    assert reader.stale(snapshot)
+    assert kept["result"].tolist() == [3.0, 4.0]
+
+
+def test_reader_process_gets_consistent_snapshots(manager, tmp_path):
+    """Test that another process reads only complete rows while entries are being added."""
+    path = str(tmp_path / "history.shm")
+    manager.publish_to(SharedHistoryPublisher(path, capacity=16))
+    total = 3000
+    def write(offset):
+        for i in range(offset, total, 3):
+            manager.add_entry("add", f"{float(i)} + 0.5", i + 0.5)
+
+    with subprocess.Popen(
+        [sys.executable, "-c", READER_SCRIPT, path, str(total)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    ) as reader:
+        writers = [threading.Thread(target=write, args=(offset,)) for offset in range(3)]
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join()
+        stdout, stderr = reader.communicate(timeout=60)
+
+    assert reader.returncode == 0, stderr
+    assert int(stdout.split()[1]) == total
+    assert sorted(SharedHistoryReader(path).snapshot().rows["lhs"].tolist()) == [float(i) for i in range(total)]
+
+
+def test_singleton_publishes_from_env(tmp_path, monkeypatch):
+    """Test that HISTORY_SHARED_FILE makes the history publish itself."""
+    path = tmp_path / "shm" / "history.shm"
+    monkeypatch.setenv("HISTORY_SHARED_FILE", str(path))
+
+    HistoryManager().add_entry("subtract", "5.0 - 2.0", 3.0)
+
+    assert SharedHistoryReader(str(path)).snapshot().rows["result"].tolist() == [3.0]
+    (tmp_path / "other.csv").write_bytes(b"operation,expression,result\n" * 4)
+    with pytest.raises(ValueError):
+        SharedHistoryReader(str(tmp_path / "other.csv"))
@@ -0,0 +1,100 @@
+"""Tests for application start-up cost and logging configuration."""
+
+import logging
+import os
+import threading
+
+import pytest
+from app import logging_config
+from benchmarks.bench_startup import LAZY_MODULES, STARTUP_BUDGET_MS, best_startup
+
+
+def test_startup_import_budget():
+    """Test that importing main stays within budget and skips heavy modules."""
+    timings = best_startup("main", repeat=3)
+
+    assert [name for name in LAZY_MODULES if name in timings] == []
+    assert timings["main"] < STARTUP_BUDGET_MS
+
+
+@pytest.fixture(name="config_files")
+def fixture_config_files(tmp_path, monkeypatch):
+    """Fixture that provides a logging config, .env file and cache location."""
+    config_file = tmp_path / "logging.yaml"
+    config_file.write_text(
+        "version: 1\n"
+        "disable_existing_loggers: False\n"
+        "handlers:\n"
+        "  file:\n"
+        "    class: logging.FileHandler\n"
+        "    filename: ${TEST_LOG_FILE}\n"
+        "root:\n"
+        "  level: INFO\n"
+        "  handlers: [file]\n"
+    )
+    env_file = tmp_path / ".env"
+    env_file.write_text(f"TEST_LOG_FILE={tmp_path / 'test.log'}\n")
+    monkeypatch.delenv("TEST_LOG_FILE", raising=False)
+    monkeypatch.delenv("TEST_UNDO_LIMIT", raising=False)
+    monkeypatch.setenv("LOGGING_CONFIG_CACHE", str(tmp_path / "cache.json"))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(logging_config, "_configured", threading.Event())
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield str(config_file), str(env_file)
+    for handler in root.handlers[:]:
+        if handler not in handlers:
+            handler.close()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+    os.environ.pop("TEST_LOG_FILE", None)
+    os.environ.pop("TEST_UNDO_LIMIT", None)
+
+
+def test_parsed_config_is_cached(config_files, monkeypatch):
+    """Test that unchanged files are read from the cache without parsing."""
+    config_file, env_file = config_files
+    config, env = logging_config.load_config_files(config_file, env_file)
+    assert config["handlers"]["file"]["filename"] == "${TEST_LOG_FILE}"
+
+    import yaml
+
+    with monkeypatch.context() as patch:
+        patch.setattr(yaml, "safe_load", lambda f: pytest.fail("config parsed again"))
+        assert logging_config.load_config_files(config_file, env_file) == (config, env)
+
+    # A changed .env file is parsed again
+    with open(env_file, "a", encoding="utf-8") as f:
+        f.write("TEST_LOG_FILE=other.log\n")
+    assert logging_config.load_config_files(config_file, env_file)[1] == {"TEST_LOG_FILE": "other.log"}
+
+
+def test_configure_logging_runs_once(config_files, tmp_path):
+    """Test that logging is configured once and all .env values are applied."""
+    with open(config_files[1], "a", encoding="utf-8") as f:
+        f.write("TEST_UNDO_LIMIT=7\n")
+    assert logging_config.configure_logging(*config_files) is True
+    assert os.environ["TEST_LOG_FILE"] == str(tmp_path / "test.log")
+    assert os.environ["TEST_UNDO_LIMIT"] == "7"
+    assert logging_config.configure_logging(*config_files) is False
+    assert logging_config.configure_logging(*config_files, force=True) is True
+
+
+def test_async_logging(config_files, tmp_path):
+    """Test that async logging hands records to a listener thread and drains on stop."""
+    config_file, env_file = config_files
+    with open(config_file, "a", encoding="utf-8") as f:
+        f.write("async: ${TEST_LOG_ASYNC}\n")
+    os.environ["TEST_LOG_ASYNC"] = "true"
+    try:
+        logging_config.configure_logging(config_file, env_file)
+        root = logging.getLogger()
+        assert [type(h).__name__ for h in root.handlers] == ["_ThreadQueueHandler"]
+
+        logging.getLogger("tests.async").info("queued %s", "message")
+        logging_config.stop_async_logging()
+    finally:
+        os.environ.pop("TEST_LOG_ASYNC")
+
+    assert [type(h) for h in root.handlers] == [logging.FileHandler]
+    assert "queued message" in (tmp_path / "test.log").read_text()
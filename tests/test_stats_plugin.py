@@ -0,0 +1,61 @@
+"""Tests for the streaming statistics plugin."""
+
+import numpy as np
+import pytest
+from app.plugins.stats_plugin import streaming
+from app.plugins.stats_plugin.sketches import ColumnSummary
+
+
+def test_merged_summaries_match_whole_stream():
+    """Test that summaries of partitions merge into the summary of the whole stream."""
+    values = np.random.default_rng(0).normal(1e9, 3.0, 50_000)
+    values[::100] *= -1
+    values[5] = np.nan
+    whole = ColumnSummary(histogram_range=(-2e9, 2e9), bins=4)
+    whole.update(values)
+    merged = ColumnSummary(histogram_range=(-2e9, 2e9), bins=4)
+    for part in np.array_split(values, 7):
+        summary = ColumnSummary(histogram_range=(-2e9, 2e9), bins=4)
+        for chunk in np.array_split(part, 3):
+            summary.update(chunk)
+        merged.merge(summary)
+
+    finite = values[np.isfinite(values)]
+    fractions = [0, 0.005, 0.5, 0.99, 1]
+    for summary in (whole, merged):
+        assert summary.skipped == 1 and summary.stats.count == finite.size
+        assert summary.stats.mean == pytest.approx(finite.mean(), rel=1e-12)
+        assert summary.stats.variance == pytest.approx(finite.var(ddof=1), rel=1e-6)
+        assert (summary.stats.min, summary.stats.max) == (finite.min(), finite.max())
+        assert summary.quantiles(fractions) == pytest.approx(np.quantile(finite, fractions), rel=0.01)
+        assert summary.histogram()[1].tolist() == np.histogram(finite, bins=[-2e9, -1e9, 0, 1e9, 2e9])[0].tolist()
+    assert merged.quantiles(fractions) == whole.quantiles(fractions)
+
+
+def test_stats_command_streams_partitions(repl, run, tmp_path, monkeypatch):
+    """Test the command on a file split across worker processes, recorded as one history entry."""
+    path = tmp_path / "history.csv"
+    rows = [f"add,{i} + 0,{i}" for i in range(1, 1001)] + ["divide,1 / 0,inf", "add,x + 1,oops"]
+    path.write_text("operation,expression,result\n" + "\n".join(rows) + "\n")
+    monkeypatch.setattr(streaming, "MIN_PARTITION_BYTES", 1_000)
+
+    output = run(f"stats {path} --workers 3 --bins 2 --range 0 1000 --quantiles 0.5,0.9")
+    assert output.splitlines() == [
+        f"Statistics of result in {path}: 1000 values, 2 skipped",
+        f"mean: 500.5, std: {np.arange(1, 1001).std(ddof=1):g}, variance: 83416.7",
+        "min: 1, max: 1000",
+        "quantiles (within 1%): p50=497.779, p90=907.031",
+        "histogram:",
+        "  [   0,  500): 499",
+        "  [ 500, 1000): 501",
+    ]
+    assert run(f"stats {path} expression").startswith("Error: No numeric values in column expression")
+    assert run(f"stats {path} missing").startswith("Error: Could not read")
+    assert run(f"stats {path} --bins 0") == "Error: --bins must be at least 1"
+    for bounds in ("5 1", "1 1", "0 inf"):
+        assert run(f"stats {path} --range {bounds}") == "Error: --range LOW must be less than HIGH, both finite"
+
+    history = repl.calculator.get_history()
+    assert history["operation"].tolist() == ["stats"]
+    assert history["expression"].tolist() == ["stats(history.csv:result)"]
+    assert history["result"].tolist()[0].startswith("n=1000 mean=500.5 std=")
@@ -0,0 +1,114 @@
+"""Tests for history timestamps, time windows and rollups."""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from app.history_manager import HistoryManager
+from app.time_index import TimeIndex, parse_duration
+
+MINUTE = 60_000_000_000
+
+
+@pytest.fixture
+def manager():
+    """A fresh in-memory history."""
+    return HistoryManager()
+
+
+def frame(timestamps, results):
+    return pd.DataFrame(
+        {
+            "operation": ["add"] * len(results),
+            "expression": [f"{result} + 0" for result in results],
+            "result": results,
+            "timestamp": timestamps,
+        }
+    )
+
+
+def test_time_index_windows():
+    """Test binary-search windows, including the fallback for timestamps out of order."""
+    timestamps = np.array([10, 20, 20, 30, 40], dtype=np.int64)
+    index = TimeIndex(timestamps)
+    assert index.monotonic
+    assert index.positions(timestamps, 20, 40) == slice(1, 4)
+    assert index.positions(timestamps, 41) == slice(5, 5)
+
+    timestamps = np.append(timestamps, [50, 15])
+    index.extend(timestamps)
+    assert not index.monotonic
+    assert index.positions(timestamps, 15, 30).tolist() == [1, 2, 6]
+    assert parse_duration("1.5m") == 90_000_000_000 and parse_duration("250ms") == 250_000_000
+    with pytest.raises(ValueError):
+        parse_duration("0s")
+
+
+def test_timestamps_are_kept_through_csv_and_merges(manager, tmp_path):
+    """Test that added entries get non-decreasing timestamps that survive export and import."""
+    before = time.time_ns()
+    manager.add_entry("add", "1 + 1", 2)
+    manager.add_entries([("add", "2 + 2", 4), ("add", "3 + 3", 6)])
+    timestamps = manager.get_history()["timestamp"].tolist()
+    assert before <= timestamps[0] <= timestamps[1] == timestamps[2] <= time.time_ns()
+    assert len(manager.entries_between(timestamps[1])) == 2
+
+    manager.save_history(str(tmp_path / "history.csv"))
+    manager.clear_history()
+    manager.load_history(str(tmp_path / "history.csv"))
+    assert manager.get_history()["timestamp"].tolist() == timestamps
+
+    # Files without timestamps load with 0 (unknown), outside every window
+    (tmp_path / "old.csv").write_text("operation,expression,result\nadd,5 + 5,10\n")
+    manager.merge_history(pd.read_csv(tmp_path / "old.csv"))
+    assert manager.get_history()["timestamp"].tolist() == timestamps + [0]
+    assert manager.entries_between(1)["result"].tolist() == [2, 4, 6]
+    assert manager.entries_between(None, 1)["result"].tolist() == [10]
+
+
+def test_append_only_autosave_matches_file_columns(tmp_path, monkeypatch):
+    """Test that append-only autosave writes timestamps unless the file predates them."""
+    for name, header in (("new.csv", ""), ("old.csv", "operation,expression,result\n")):
+        path = tmp_path / name
+        path.write_text(header)
+        monkeypatch.setenv("HISTORY_FILE", str(path))
+        HistoryManager._instance = None
+        HistoryManager.append_only().add_entry("add", "1 + 2", 3)
+        rows = pd.read_csv(path)
+        assert list(rows.columns)[:3] == ["operation", "expression", "result"]
+        assert ("timestamp" in rows.columns) == (name == "new.csv")
+        assert rows["result"].tolist() == [3]
+
+
+def test_rollup_command_buckets_recent_entries(manager, run):
+    """Test rollups over the whole history and over the last minutes only."""
+    now = time.time_ns() // MINUTE * MINUTE
+    manager.set_history(frame([0, now - 3 * MINUTE, now - 3 * MINUTE + 1, now - MINUTE, now], [9, 1, 3, "x", 5]))
+    lines = run("rollup 1m").splitlines()
+    assert lines[0] == "Rollup of 4 entries in 1m buckets (UTC):"
+    assert [line.split("  ", 1)[1] for line in lines[1:]] == [
+        "count=2  mean=2  min=1  max=3",
+        "count=0",
+        "count=1",
+        "count=1  mean=5  min=5  max=5",
+    ]
+    assert lines[4].startswith(time.strftime("%Y-%m-%d %H:%M:00", time.gmtime(now // 1_000_000_000)))
+
+    assert run("rollup 2m --last 150s").splitlines()[0] == "Rollup of 2 entries in 2m buckets (UTC):"
+    assert run("rollup 1s --last 1d").startswith("Error: 86401 buckets is more than 1000")
+    assert run("rollup 1m --last soon").startswith("Error: Invalid duration")
+    assert run("rollup") == "Usage: rollup <bucket, e.g. 30s, 5m, 1h> [--last DURATION]"
+    manager.clear_history()
+    assert run("rollup 1m --last 1h") == "No timestamped history entries in the last 1h"
+
+
+def test_merge_keeps_entries_with_different_timestamps(manager):
+    """Test that merged entries match on content only when a timestamp is unknown or both are equal."""
+    manager.set_history(frame([5], [5.0]))
+    assert manager.merge_history(frame([1, 2, 2, 5], [5.0, 5.0, 5.0, 5.0])) == (2, 2)
+    assert manager.get_history()["timestamp"].tolist() == [5, 1, 2]
+    assert manager.merge_history(frame([0, 0], [5.0, 6.0])) == (1, 1)
+
+    manager.set_history(frame([0], [5.0]))
+    assert manager.merge_history(frame([1, 2], [5.0, 5.0])) == (0, 2)
@@ -0,0 +1,91 @@
+"""Tests for in-process tracing spans."""
+
+import json
+
+import pytest
+from app import tracing
+from app.repl import REPL
+from app.tracing import Tracer, span, traced
+
+
+def read_trace(path):
+    """Load an unterminated Chrome trace-event array."""
+    return json.loads(path.read_text().rstrip().rstrip(",") + "]")
+
+
+@pytest.fixture
+def tracer(tmp_path, monkeypatch):
+    """Install a tracer that samples every trace."""
+    tracer = Tracer(str(tmp_path / "trace.json"), sample_rate=1.0)
+    monkeypatch.setattr(Tracer, "_instance", tracer)
+    return tracer
+
+
+def test_command_spans_are_nested(tracer, tmp_path):
+    """Test that a command produces nested spans down to the history append."""
+    repl = REPL()
+
+    assert repl.execute_command(repl.get_command("add"), ["2", "3"]) == "Result: 5.0"
+    tracer.flush()
+
+    events = {event["name"]: event for event in read_trace(tmp_path / "trace.json")}
+    chain = [
+        "REPL.execute_command",
+        "AddCommand.execute",
+        "Calculator.calculate",
+        "HistoryManager.add_entry",
+        "HistoryManager._try_save_history_to_env",
+    ]
+    for parent, child in zip(chain, chain[1:]):
+        assert events[parent]["ts"] <= events[child]["ts"]
+        assert events[child]["ts"] + events[child]["dur"] <= events[parent]["ts"] + events[parent]["dur"]
+    assert "Calculator._format_expression" in events
+    assert events["REPL.execute_command"]["args"] == {"command": "add"}
+    assert all(event["ph"] == "X" for event in events.values())
+
+
+def test_errors_are_recorded(tracer, tmp_path):
+    """Test that a span ended by an exception records the error, written when its trace ends."""
+    with tracer.trace("root"):
+        with pytest.raises(ValueError):
+            with span("failing"):
+                raise ValueError("boom")
+        assert not (tmp_path / "trace.json").exists()
+
+    events = read_trace(tmp_path / "trace.json")
+    assert [event["name"] for event in events] == ["failing", "root"]
+    assert events[0]["args"] == {"error": "boom"}
+
+
+def test_nothing_is_recorded_unsampled(tmp_path, monkeypatch):
+    """Test that spans are no-ops outside a sampled trace."""
+    tracer = Tracer(str(tmp_path / "trace.json"), sample_rate=0.0)
+    monkeypatch.setattr(Tracer, "_instance", tracer)
+
+    @traced("work")
+    def work():
+        with span("inner"):
+            return 42
+
+    with tracer.trace("root") as root:
+        assert work() == 42
+    assert root is tracing._NOOP
+    assert work() == 42
+    assert tracer.flush() == 0
+    assert not (tmp_path / "trace.json").exists()
+
+
+def test_invalid_sample_rate_disables_tracing(tmp_path, monkeypatch, caplog, run):
+    """Test that an invalid TRACE_SAMPLE_RATE is reported once and does not fail commands."""
+    monkeypatch.setattr(Tracer, "_instance", None)
+    monkeypatch.setenv("TRACE_FILE", str(tmp_path / "trace.json"))
+    monkeypatch.setenv("TRACE_SAMPLE_RATE", "often")
+
+    assert run("add 2 3") == "Result: 5.0"
+    assert run("add 1 1") == "Result: 2.0"
+
+    assert tracing.get_tracer().sample_rate == tracing.DEFAULT_SAMPLE_RATE
+    assert [r.message for r in caplog.records if "TRACE_SAMPLE_RATE" in r.message] == [
+        "Invalid TRACE_SAMPLE_RATE 'often'; using 0.0"
+    ]
+    assert not (tmp_path / "trace.json").exists()
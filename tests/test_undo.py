@@ -0,0 +1,79 @@
+"""Tests for undo and redo of history changes."""
+
+import pandas as pd
+import pytest
+from app.history_manager import HistoryManager
+
+
+@pytest.fixture
+def spill_dir(tmp_path, monkeypatch):
+    """A directory for spilled histories, autosaving to a file next to it."""
+    monkeypatch.setenv("UNDO_SPILL_DIR", str(tmp_path / "undo"))
+    monkeypatch.setenv("HISTORY_FILE", str(tmp_path / "history.csv"))
+    return tmp_path / "undo"
+
+
+def expressions(manager):
+    return manager.get_history()["expression"].tolist()
+
+
+def test_undo_and_redo_every_kind_of_change(spill_dir, tmp_path):
+    """Test reverting and redoing additions, merges, deletions and replacements, with autosave."""
+    manager = HistoryManager()
+    manager.add_entry("add", "1 + 1", 2)
+    manager.add_entries([("add", "2 + 2", 4), ("add", "3 + 3", 6)])
+    manager.delete_entry(0)
+    manager.merge_history(pd.DataFrame({"operation": ["add"], "expression": ["4 + 4"], "result": [8]}))
+    manager.clear_history()
+    assert len(list(spill_dir.iterdir())) == 1
+    assert manager.undo_counts() == (5, 0)
+
+    assert [manager.undo() for _ in range(3)] == ["clear", "merge", "delete"]
+    assert expressions(manager) == ["1 + 1", "2 + 2", "3 + 3"]
+    assert pd.read_csv(tmp_path / "history.csv")["expression"].tolist() == ["1 + 1", "2 + 2", "3 + 3"]
+    assert not list(spill_dir.iterdir())
+
+    assert manager.redo() == "delete"
+    assert expressions(manager) == ["2 + 2", "3 + 3"]
+    assert manager.undo() == "delete"
+    assert [manager.undo() for _ in range(3)] == ["add", "add", None]
+    assert expressions(manager) == []
+    assert [manager.redo() for _ in range(5)] == ["add", "add", "delete", "merge", "clear"]
+    assert manager.redo() is None
+    assert expressions(manager) == []
+    assert manager.undo() == "clear"
+    assert expressions(manager) == ["2 + 2", "3 + 3", "4 + 4"]
+    assert pd.read_csv(tmp_path / "history.csv")["result"].tolist() == [4, 6, 8]
+
+
+def test_log_is_bounded_and_new_changes_drop_redo(spill_dir, monkeypatch):
+    """Test that only UNDO_LIMIT changes are kept and forgotten spills are deleted."""
+    monkeypatch.setenv("UNDO_LIMIT", "2")
+    manager = HistoryManager()
+    for i in range(3):
+        manager.add_entry("add", f"{i} + 0", i)
+        manager.clear_history()
+    assert manager.undo_counts() == (2, 0)
+    assert len(list(spill_dir.iterdir())) == 1
+
+    assert manager.undo() == "clear"
+    assert manager.undo_counts() == (1, 1)
+    manager.add_entry("add", "9 + 0", 9)
+    assert manager.undo_counts() == (2, 0)
+    assert not list(spill_dir.iterdir())
+    assert manager.redo() is None
+    assert expressions(manager) == ["2 + 0", "9 + 0"]
+
+
+def test_undo_commands_revert_import(spill_dir, tmp_path, repl, run):
+    """Test the undo and redo commands on an import_csv replacing the history."""
+    source = tmp_path / "other.csv"
+    source.write_text("operation,expression,result\nmultiply,2 * 5,10\n")
+
+    run("add 1 2")
+    run(f"import_csv {source}")
+    assert run("undo") == "Undid set (1 more to undo)"
+    assert repl.calculator.get_history()["expression"].tolist() == ["1.0 + 2.0"]
+    assert run("redo") == "Redid set (0 more to redo)"
+    assert repl.calculator.get_history()["expression"].tolist() == ["2 * 5"]
+    assert run("redo") == "Nothing to redo"
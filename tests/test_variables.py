@@ -0,0 +1,89 @@
+"""Tests for named variables and incremental recomputation."""
+
+import pytest
+from app.calculator import Calculator
+from app.repl import REPL
+
+
+@pytest.fixture
+def calculator():
+    """A calculator with a fresh in-memory history."""
+    return Calculator()
+
+
+def test_only_downstream_variables_are_recomputed(calculator):
+    """Test that reassigning an input updates its dependents and nothing else."""
+    calculator.assign("x", None, "2")
+    calculator.assign("y", "add", "x", "3")
+    calculator.assign("z", "multiply", "y", "y")
+    calculator.assign("w", "add", "1", "1")
+    calls = []
+    evaluate = calculator.variables._evaluate
+    calculator.variables._evaluate = lambda *args: calls.append(args) or evaluate(*args)
+
+    assert calculator.assign("x", None, "5") == (5.0, 2)
+
+    assert calls == [("add", 5.0, 3.0), ("multiply", 8.0, 8.0)]
+    assert [calculator.variables.value(name) for name in ("y", "z", "w")] == [8.0, 64.0, 2.0]
+    # Only the assignments' own calculations are recorded
+    assert len(calculator.get_history()) == 3
+
+
+def test_long_chains_and_unchanged_values(calculator):
+    """Test a 10,000-variable chain, and that propagation stops at unchanged values."""
+    calculator.assign("v0", None, "1")
+    for i in range(1, 10_000):
+        calculator.variables.define(f"v{i}", ("add", (f"v{i - 1}", 1.0)), float(i + 1))
+    calculator.assign("leaf", None, "0")
+    calculator.assign("flat", "multiply", "v0", "leaf")
+    calculator.assign("after", "add", "flat", "1")
+
+    assert calculator.assign("leaf", None, "3") == (3.0, 2)
+    assert calculator.assign("v0", None, "2") == (2.0, 10_001)
+    assert calculator.variables.value("v9999") == 10_001.0
+    assert calculator.variables.value("after") == 7.0
+
+    # flat stays 0 * v0 = 0, so "after" is not recomputed
+    calculator.assign("leaf", None, "0")
+    assert calculator.assign("v0", None, "7") == (7.0, 10_000)
+    assert calculator.variables.value("after") == 1.0
+
+
+def test_errors_and_cycles(calculator):
+    """Test that failures propagate and recover, and cycles are rejected."""
+    calculator.assign("d", None, "2")
+    calculator.assign("q", "divide", "10", "d")
+    calculator.assign("r", "add", "q", "1")
+
+    calculator.assign("d", None, "0")
+    with pytest.raises(ValueError, match="Division by zero"):
+        calculator.variables.value("q")
+    with pytest.raises(ValueError, match="q has no value"):
+        calculator.resolve("r")
+
+    calculator.assign("d", None, "5")
+    assert calculator.resolve("r") == 3.0
+
+    with pytest.raises(ValueError, match="Circular reference"):
+        calculator.assign("d", "add", "r", "1")
+    with pytest.raises(ValueError, match="Unknown variable: nope"):
+        calculator.assign("e", "add", "nope", "1")
+    with pytest.raises(ValueError, match="Invalid variable name"):
+        calculator.assign("inf", None, "1")
+    assert calculator.variables.value("d") == 5.0
+
+
+def test_repl_assignments_and_commands(calculator):
+    """Test assignment syntax, variables as command arguments and the vars command."""
+    repl = REPL()
+
+    assert repl.parse_assignment("x = add 2 3") == ("x", "add", ["2", "3"])
+    assert repl.parse_assignment("add 2 3") is None
+    assert repl.assign(*repl.parse_assignment("x = add 2 3")) == "x = 5.0"
+    assert repl.assign(*repl.parse_assignment("y=multiply x 4")) == "y = 20.0"
+    assert repl.assign("x", None, ["1"]) == "x = 1.0 (1 dependent updated)"
+    assert repl.assign("x", "power", ["1", "2"]) == "Error: Invalid operation: power"
+
+    assert repl.execute_command(repl.get_command("subtract"), ["y", "x"]) == "Result: 3.0"
+    assert repl.execute_command(repl.get_command("vars"), []) == "x = 1.0\ny = x * 4.0 = 4.0"
+    assert repl.execute_command(repl.get_command("vars"), ["z"]) == "Error: Unknown variable: z"
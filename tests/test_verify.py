@@ -0,0 +1,73 @@
+"""Tests for history file verification."""
+
+import pytest
+from app.history_manager import HistoryManager
+from app.repl import REPL
+from app.verify import format_report, has_issues, main, verify_file
+
+ROWS = [
+    "add,1.0 + 2.0,3.0",
+    "divide,1.0 / 3.0,0.3333333333333333",
+    "multiply,2.0 * 3.0,7.0",
+    "subtract,inf - 1.0,inf",
+    "divide,1.0 / 0.0,nan",
+    "add,1.0 + two,3.0",
+    "multiply,2.0 x 3.0,6.0",
+    "power,2.0 ^ 3.0,8.0",
+]
+
+
+@pytest.fixture
+def history_csv(tmp_path):
+    """A history file with one row of each kind of problem."""
+    path = tmp_path / "history.csv"
+    path.write_text("\n".join(["operation,expression,result", *ROWS]) + "\n")
+    return path
+
+
+def test_issues_are_reported_by_line(history_csv):
+    """Test that mismatches, NaN/inf values and parse failures are found with their file lines."""
+    report = verify_file(str(history_csv), workers=1)
+
+    assert report["rows"] == 8
+    assert report["checked"] == 5
+    assert report["skipped"] == {"power": 1}
+    assert [issue["line"] for issue in report["mismatches"]] == [4]
+    assert report["mismatches"][0]["expected"] == 6.0
+    assert [issue["line"] for issue in report["non_finite"]] == [5, 6]
+    assert [issue["line"] for issue in report["parse_failures"]] == [7, 8]
+    assert report["parse_failures"][0]["reason"] == "unparsable right operand"
+    assert has_issues(report)
+
+
+def test_chunks_are_verified_by_worker_processes(history_csv):
+    """Test that a file split into chunks across processes gives the same report."""
+    single = verify_file(str(history_csv), workers=1)
+
+    pooled = verify_file(str(history_csv), chunk_rows=3, workers=2)
+
+    assert pooled == single
+
+
+def test_verify_command_does_not_touch_history(history_csv):
+    """Test the REPL command and that verifying leaves the history alone."""
+    repl = REPL()
+
+    output = repl.execute_command(repl.get_command("verify"), [str(history_csv), "--limit", "1"])
+
+    assert output.startswith("Verified 8 rows: 5 checked, 1 skipped (power: 1)")
+    assert "  line 4: 2.0 * 3.0 = 7.0 (expected 6.0)" in output
+    assert "  ... and 1 more" in output
+    assert HistoryManager().get_history().empty
+    assert repl.execute_command(repl.get_command("verify"), ["missing.csv"]).startswith("Error:")
+
+
+def test_main_exit_codes(history_csv, tmp_path, capsys):
+    """Test that the entry point exits non-zero on issues and on unreadable files."""
+    clean = tmp_path / "clean.csv"
+    clean.write_text("operation,expression,result\nadd,1.0 + 2.0,3.0\n")
+
+    assert main([str(clean)]) == 0
+    assert main([str(history_csv), "--workers", "1"]) == 1
+    assert main([str(tmp_path / "missing.csv")]) == 2
+    assert "Mismatches: 0" in format_report(verify_file(str(clean)))